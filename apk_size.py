@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Composição de tamanho de um APK e verificação de orçamento de tamanho
+Só o diretório central do zip é lido (via mmap): nada é descomprimido, mesmo em APKs de centenas de MB
+"""
+
+import json
+import sys
+from pathlib import Path
+
+from zip_reader import BadZipError, MappedZip
+
+# Categorias na ordem do relatório
+APK_CATEGORIES = ("dex", "resources", "native", "assets", "metadata", "other")
+
+CATEGORY_LABELS = {
+    "dex": "dex",
+    "resources": "recursos",
+    "native": "nativas",
+    "assets": "assets",
+    "metadata": "assinatura",
+    "other": "outros",
+}
+
+# Orçamento versionado com o projeto e a última composição aceita (local)
+BUDGET_FILE = "apk-size-budget.json"
+PREVIOUS_FILE = Path("build") / "apk-size-previous.json"
+
+# Crescimento tolerado em relação ao APK anterior quando o orçamento não define outro
+DEFAULT_MAX_GROWTH_PERCENT = 10.0
+# Crescimentos menores que isso não contam (categorias pequenas variam muito em percentual)
+MIN_GROWTH_BYTES = 64 * 1024
+
+
+def categorize(name):
+    """Categoria de uma entrada do APK pelo caminho"""
+    if name.startswith("classes") and name.endswith(".dex"):
+        return "dex"
+    if name.startswith("lib/"):
+        return "native"
+    if name.startswith("assets/"):
+        return "assets"
+    if name.startswith("res/") or name in ("resources.arsc", "AndroidManifest.xml"):
+        return "resources"
+    if name.startswith("META-INF/"):
+        return "metadata"
+    return "other"
+
+
+def apk_size_breakdown(path):
+    """Tamanho comprimido e descomprimido por categoria, a partir do diretório central"""
+    categories = {category: {"count": 0, "compressed": 0, "size": 0} for category in APK_CATEGORIES}
+    with MappedZip(path) as view:
+        entries = view.entries
+        file_size = len(view.buf)
+    for info in entries:
+        if info.name.endswith("/"):
+            continue
+        totals = categories[categorize(info.name)]
+        totals["count"] += 1
+        totals["compressed"] += info.compressed_size
+        totals["size"] += info.size
+    return {
+        "file_size": file_size,
+        "entries": sum(totals["count"] for totals in categories.values()),
+        "compressed": sum(totals["compressed"] for totals in categories.values()),
+        "size": sum(totals["size"] for totals in categories.values()),
+        "categories": categories,
+    }
+
+
+def is_apk(path):
+    """Verdadeiro se o arquivo é um zip legível (um APK de verdade, não um placeholder)"""
+    try:
+        with MappedZip(path) as view:
+            view.entries
+        return True
+    except (OSError, BadZipError):
+        return False
+
+
+def format_size(value):
+    for unit in ("B", "KB", "MB"):
+        if abs(value) < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GB"
+
+
+def describe_breakdown(breakdown):
+    """'dex 5.1 MB, recursos 2.0 MB, ...' (tamanho comprimido, categorias não vazias)"""
+    parts = []
+    for category in APK_CATEGORIES:
+        totals = breakdown["categories"][category]
+        if totals["count"]:
+            parts.append(f"{CATEGORY_LABELS[category]} {format_size(totals['compressed'])}")
+    return ", ".join(parts)
+
+
+def load_budget(path):
+    """Orçamento em bytes comprimidos: {"total", "categories": {categoria: bytes}, "max_growth_percent"}"""
+    with open(path, "r") as f:
+        budget = json.load(f)
+    unknown = set(budget.get("categories", {})) - set(APK_CATEGORIES)
+    if unknown:
+        raise ValueError(f"Categorias desconhecidas no orçamento: {', '.join(sorted(unknown))}")
+    return budget
+
+
+def check_budget(breakdown, budget):
+    """Limites do orçamento ultrapassados: [mensagem]"""
+    violations = []
+    total = budget.get("total")
+    if total is not None and breakdown["file_size"] > total:
+        violations.append(f"APK {format_size(breakdown['file_size'])} > orçamento {format_size(total)}")
+    for category, limit in budget.get("categories", {}).items():
+        compressed = breakdown["categories"][category]["compressed"]
+        if compressed > limit:
+            violations.append(
+                f"{CATEGORY_LABELS[category]} {format_size(compressed)} > orçamento {format_size(limit)}"
+            )
+    return violations
+
+
+def compare_breakdowns(current, previous, max_growth_percent=DEFAULT_MAX_GROWTH_PERCENT,
+                       min_growth_bytes=MIN_GROWTH_BYTES):
+    """Crescimentos acima do tolerado em relação a um APK anterior: [mensagem]"""
+    regressions = []
+    pairs = [("APK", current["file_size"], previous["file_size"])]
+    pairs.extend(
+        (CATEGORY_LABELS[category], current["categories"][category]["compressed"],
+         previous["categories"].get(category, {}).get("compressed", 0))
+        for category in APK_CATEGORIES
+    )
+    for label, now, before in pairs:
+        if now - before < min_growth_bytes:
+            continue
+        growth = (now - before) / before * 100 if before else float("inf")
+        if growth > max_growth_percent:
+            grown = f"+{growth:.1f}%" if before else "novo"
+            regressions.append(f"{label} {format_size(before)} → {format_size(now)} ({grown})")
+    return regressions
+
+
+def load_previous(project_root):
+    try:
+        with open(Path(project_root) / PREVIOUS_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_previous(project_root, breakdown):
+    path = Path(project_root) / PREVIOUS_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(breakdown, f, indent=2)
+    tmp_path.replace(path)
+
+
+def print_breakdown(breakdown, previous=None):
+    print(f"  {'categoria':<12} {'arquivos':>9} {'comprimido':>12} {'descomprimido':>14} {'anterior':>12}")
+    for category in APK_CATEGORIES:
+        totals = breakdown["categories"][category]
+        before = previous["categories"].get(category, {}).get("compressed") if previous else None
+        before_text = format_size(before) if before is not None else "-"
+        print(f"  {CATEGORY_LABELS[category]:<12} {totals['count']:>9} {format_size(totals['compressed']):>12} "
+              f"{format_size(totals['size']):>14} {before_text:>12}")
+    before_text = format_size(previous["file_size"]) if previous else "-"
+    print(f"  {'total':<12} {breakdown['entries']:>9} {format_size(breakdown['file_size']):>12} "
+          f"{format_size(breakdown['size']):>14} {before_text:>12}")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Composição de tamanho de um APK e verificação de orçamento")
+    parser.add_argument("apk", help="APK a analisar")
+    parser.add_argument("--budget", help=f"Orçamento JSON (ex.: {BUDGET_FILE})")
+    parser.add_argument("--compare", metavar="APK", help="APK anterior para detectar crescimento")
+    parser.add_argument("--max-growth", type=float, help="Crescimento tolerado em %% em relação ao anterior")
+    parser.add_argument("--json", action="store_true", help="Imprime a composição em JSON")
+    args = parser.parse_args()
+
+    try:
+        breakdown = apk_size_breakdown(args.apk)
+        previous = apk_size_breakdown(args.compare) if args.compare else None
+        budget = load_budget(args.budget) if args.budget else {}
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 2
+
+    if args.json:
+        json.dump(breakdown, sys.stdout, indent=2)
+        print()
+    else:
+        print(f"📦 {args.apk}")
+        print_breakdown(breakdown, previous)
+
+    problems = check_budget(breakdown, budget)
+    if previous is not None:
+        max_growth = args.max_growth
+        if max_growth is None:
+            max_growth = budget.get("max_growth_percent", DEFAULT_MAX_GROWTH_PERCENT)
+        problems.extend(compare_breakdowns(breakdown, previous, max_growth))
+    if problems:
+        print("❌ TAMANHO DO APK FORA DO ORÇAMENTO:")
+        for problem in problems:
+            print(f"  • {problem}")
+        return 1
+    if budget or previous is not None:
+        print("✅ Tamanho do APK dentro do orçamento")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
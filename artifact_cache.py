@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Cache em disco de resultados por artefato (jar, aar, dex) fora do projeto
+Cada artefato é identificado pelo hash do conteúdo; caminho, tamanho e mtime evitam re-hashear
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import threading
+from pathlib import Path
+
+# Incrementar sempre que o formato ou os analisadores mudarem
+ARTIFACT_CACHE_VERSION = 1
+ARTIFACT_CACHE_FILE = Path("build") / "artifact-cache.json"
+
+
+def artifact_hash(path):
+    """blake2b do arquivo inteiro, lido via mmap (sem copiar para a memória do processo)"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest.update(mapped)
+        except ValueError:
+            pass  # arquivo vazio
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    """Resultados por (hash do artefato, tipo de análise), persistidos entre execuções"""
+
+    def __init__(self, project_root, enabled=True):
+        self.project_root = Path(project_root)
+        self.enabled = enabled
+        self.cache_file = self.project_root / ARTIFACT_CACHE_FILE
+        self.hits = 0
+        self.misses = 0
+        self._paths = {}  # caminho -> [tamanho, mtime_ns, hash]
+        self._results = {}  # "hash:tipo" -> resultado
+        self._loaded = False
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        # Lido do disco no primeiro uso (execuções sem a etapa de DEX não pagam a leitura)
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    if self.enabled:
+                        self._paths, self._results = self._load()
+                    self._loaded = True
+
+    def _load(self):
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}, {}
+        if data.get("version") != ARTIFACT_CACHE_VERSION:
+            return {}, {}
+        return data.get("paths", {}), data.get("results", {})
+
+    def digest(self, path):
+        """Hash do artefato; artefatos de cache do Gradle não mudam, então o stat basta na maioria das vezes"""
+        self._ensure_loaded()
+        path = str(path)
+        st = os.stat(path)
+        with self._lock:
+            known = self._paths.get(path)
+        if known is not None and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+            return known[2]
+        digest = artifact_hash(path)
+        if self.enabled:
+            with self._lock:
+                self._paths[path] = [st.st_size, st.st_mtime_ns, digest]
+                self._dirty = True
+        return digest
+
+    def get(self, path, kind):
+        """Resultado já calculado para o artefato, ou None"""
+        if not self.enabled:
+            return None
+        key = f"{self.digest(path)}:{kind}"
+        with self._lock:
+            result = self._results.get(key)
+        if result is not None:
+            self.hits += 1
+        return result
+
+    def put(self, path, kind, result):
+        if not self.enabled:
+            return
+        key = f"{self.digest(path)}:{kind}"
+        with self._lock:
+            self._results[key] = result
+            self._dirty = True
+
+    def lookup(self, path, kind, analyze):
+        """Resultado de `analyze(path)`, calculado só se o artefato ainda não foi visto"""
+        result = self.get(path, kind)
+        if result is None:
+            self.misses += 1
+            result = analyze(path)
+            self.put(path, kind, result)
+        return result
+
+    def save(self):
+        """Grava em disco, mesclando com o que outro processo possa ter salvo"""
+        if not self.enabled or not self._loaded:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            paths, results = self._load()
+            paths.update(self._paths)
+            results.update(self._results)
+            # Caminhos que sumiram (versões antigas removidas do cache do Gradle)
+            paths = {path: record for path, record in paths.items() if os.path.exists(path)}
+            live = {record[2] for record in paths.values()}
+            results = {key: value for key, value in results.items() if key.split(":", 1)[0] in live}
+            self._paths, self._results = paths, results
+            self._dirty = False
+            try:
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = self.cache_file.with_name(f"{self.cache_file.name}.{os.getpid()}.tmp")
+                with open(tmp_file, 'w') as f:
+                    json.dump({"version": ARTIFACT_CACHE_VERSION, "paths": paths, "results": results},
+                              f, separators=(',', ':'))
+                os.replace(tmp_file, self.cache_file)
+            except OSError as e:
+                print(f"⚠️  Não foi possível salvar o cache de artefatos: {e}")
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_artifact_cache(project_root, enabled=True):
+    """Retorna o cache de artefatos compartilhado da raiz informada"""
+    key = (str(Path(project_root)), enabled)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = ArtifactCache(project_root, enabled=enabled)
+            _caches[key] = cache
+        return cache
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Modo em lote: verifica vários projetos (variantes e forks do Email Assistant) de uma vez
+Cada projeto roda build e testes em um processo de um único pool limitado; cada um mantém
+seus próprios relatórios e um relatório combinado é gravado à medida que os projetos terminam
+"""
+
+import contextlib
+import os
+import sys
+import time
+from pathlib import Path
+
+from project_index import BUILD_DIR, SKIPPED_DIRS
+from report_sinks import REPORT_FORMATS, ReportSchema, make_sinks, parse_report_spec, report_timestamp
+
+# Arquivos que marcam a raiz de um projeto Gradle com módulo app
+PROJECT_MARKERS = ("settings.gradle", "settings.gradle.kts", "app/build.gradle", "app/build.gradle.kts")
+
+# Profundidade máxima da busca por projetos em --discover
+DEFAULT_DISCOVER_DEPTH = 3
+
+# Projetos por processo antes de reciclá-lo (os caches em memória são por raiz e crescem)
+TASKS_PER_WORKER = 8
+
+# Campos do relatório combinado
+BATCH_SCHEMA = ReportSchema("batch", "projects", "project", "passed")
+
+LOG_FILE = Path("build") / "batch.log"
+
+
+def is_project(directory):
+    directory = Path(directory)
+    return any((directory / marker).is_file() for marker in PROJECT_MARKERS)
+
+
+def discover_projects(directory, max_depth=DEFAULT_DISCOVER_DEPTH):
+    """Raízes de projeto sob `directory` (não desce dentro de um projeto já encontrado)"""
+    found = []
+    pending = [(Path(directory), 0)]
+    while pending:
+        current, depth = pending.pop()
+        if is_project(current):
+            found.append(current)
+            continue
+        if depth >= max_depth:
+            continue
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False) and entry.name not in SKIPPED_DIRS \
+                            and entry.name != BUILD_DIR \
+                            and not entry.name.startswith("."):
+                        pending.append((Path(entry.path), depth + 1))
+        except OSError:
+            continue
+    return sorted(found)
+
+
+def _summarize(results, name_key, status_key):
+    failures = [f"{result[name_key]}: {result.get('message', '')}" for result in results if not result[status_key]]
+    return {"total": len(results), "failed": len(failures), "failures": failures}
+
+
+def check_project(root, use_cache=True):
+    """Build e testes de integração de um projeto, com a saída em <raiz>/build/batch.log
+
+    Executado nos processos do pool; as etapas rodam em série (o paralelismo é entre projetos).
+    """
+    from build_test import BuildTester
+    from test_integration import EmailAssistantTester
+
+    root = Path(root)
+    start = time.perf_counter()
+    log_path = root / LOG_FILE
+    build_tester = BuildTester(root, use_cache=use_cache, jobs=1)
+    integration_tester = EmailAssistantTester(root, use_cache=use_cache, jobs=1)
+    error = None
+    try:
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(log_path, "w", encoding="utf-8") as log, contextlib.redirect_stdout(log):
+            build_tester.run_build_simulation()
+            integration_tester.run_all_tests()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+
+    build = _summarize(build_tester.build_results, "step", "success")
+    integration = _summarize(integration_tester.test_results, "test", "passed")
+    passed = error is None and build["total"] > 0 and not build["failed"] and not integration["failed"]
+    if error is not None:
+        message = f"Erro inesperado: {error}"
+    elif passed:
+        message = f"{build['total']} etapas e {integration['total']} testes OK"
+    else:
+        message = "; ".join((build["failures"] + integration["failures"])[:3])
+    return {
+        "project": str(root),
+        "passed": passed,
+        "message": message,
+        "build": build,
+        "integration": integration,
+        "reports": [str(root / "build_test_report.json"), str(root / "integration_test_report.json")],
+        "log": str(log_path),
+        "metrics": {"wall_time_s": round(time.perf_counter() - start, 6)},
+    }
+
+
+def _pool_context():
+    import multiprocessing
+
+    # forkserver evita herdar estado de threads do processo principal
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else None)
+
+
+def run_batch(roots, jobs=None, use_cache=True, reports=None, report_stem="batch_report"):
+    """Verifica `roots` em um pool de `jobs` processos; retorna os resultados na ordem de `roots`"""
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    roots = [Path(root).resolve() for root in roots]
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(roots) or 1))
+
+    sinks = make_sinks(reports, report_stem)
+    timestamp = report_timestamp()
+    for sink in sinks:
+        sink.open(BATCH_SCHEMA, timestamp)
+
+    print(f"📦 Verificando {len(roots)} projeto(s) com {jobs} processo(s)")
+    start = time.perf_counter()
+    results = {}
+    pool_options = {"max_workers": jobs, "mp_context": _pool_context()}
+    if sys.version_info >= (3, 11):
+        pool_options["max_tasks_per_child"] = TASKS_PER_WORKER
+    with ProcessPoolExecutor(**pool_options) as pool:
+        futures = {pool.submit(check_project, str(root), use_cache): root for root in roots}
+        for done, future in enumerate(as_completed(futures), 1):
+            root = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # O processo do projeto morreu (ex.: falta de memória): os outros continuam
+                result = {"project": str(root), "passed": False, "message": f"Erro inesperado: {e}",
+                          "metrics": {"wall_time_s": 0.0}}
+            results[root] = result
+            status = "✅" if result["passed"] else "❌"
+            print(f"{status} [{done}/{len(roots)}] {root} ({result['metrics']['wall_time_s']:.2f}s)")
+            if not result["passed"]:
+                print(f"    {result['message']}")
+            for sink in sinks:
+                sink.write(result)
+
+    elapsed = time.perf_counter() - start
+    ordered = [results[root] for root in roots]
+    passed = sum(1 for result in ordered if result["passed"])
+    summary = {
+        "total_projects": len(ordered),
+        "passed_projects": passed,
+        "failed_projects": len(ordered) - passed,
+        "workers": jobs,
+        "elapsed_s": round(elapsed, 3),
+        "projects_per_s": round(len(ordered) / elapsed, 3) if elapsed else 0.0,
+    }
+    for sink in sinks:
+        sink.close(summary)
+        print(f"📄 Relatório combinado salvo em: {sink.path}")
+
+    print(f"\n📊 {passed}/{len(ordered)} projeto(s) OK em {elapsed:.2f}s "
+          f"({summary['projects_per_s']:.2f} projetos/s)")
+    return ordered
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Verifica vários projetos do Email Assistant em lote")
+    parser.add_argument("roots", nargs="*", help="Raízes de projeto a verificar")
+    parser.add_argument("--discover", action="append", metavar="DIR",
+                        help="Procura projetos sob o diretório (pode repetir)")
+    parser.add_argument("--depth", type=int, default=DEFAULT_DISCOVER_DEPTH, help="Profundidade máxima da busca")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Projetos verificados em paralelo (padrão: número de CPUs)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignora o cache incremental de verificações por arquivo")
+    parser.add_argument("--report", action="append", metavar="FORMATO[:CAMINHO]",
+                        help=f"Relatório combinado adicional ({', '.join(REPORT_FORMATS)}); pode repetir")
+    parser.add_argument("--output", default="batch_report", help="Caminho base do relatório combinado (sem extensão)")
+    args = parser.parse_args()
+    for spec in args.report or ():
+        try:
+            parse_report_spec(spec)
+        except ValueError as e:
+            parser.error(str(e))
+
+    roots = [Path(root) for root in args.roots]
+    for directory in args.discover or ():
+        roots.extend(discover_projects(directory, args.depth))
+    # Mesmo projeto informado duas vezes (direto e por descoberta) roda uma vez
+    roots = list(dict.fromkeys(root.resolve() for root in roots))
+    if not roots:
+        parser.error("nenhum projeto informado ou encontrado")
+
+    results = run_batch(roots, jobs=args.jobs, use_cache=not args.no_cache, reports=args.report,
+                        report_stem=args.output)
+    return 0 if all(result["passed"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Suíte de benchmarks do BuildTester e do EmailAssistantTester
+Gera projetos sintéticos, mede cada etapa (tempo, arquivos/s, pico de RSS) e compara com baselines JSON
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from synthetic_project import PRESETS, generate_project
+
+BASELINE_DIR = BENCH_DIR / "baselines"
+
+# Uma etapa só é regressão se ficar mais lenta que a baseline nas duas medidas
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_MIN_DELTA = 0.05
+RSS_MIN_DELTA_MB = 32
+
+
+def _peak_rss_mb():
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _step_files(tester, name, index):
+    """Arquivos lidos pela etapa, segundo os tipos de entrada declarados em STEP_INPUTS"""
+    from watch_mode import change_kinds
+
+    inputs = set(tester.STEP_INPUTS.get(name, ()))
+    if not inputs:
+        return 0
+    return sum(1 for entry in index.files() if inputs.intersection(change_kinds(entry.rel, True)))
+
+
+def measure(root):
+    """Executa todas as etapas uma vez, em sequência e sem cache; roda em um processo próprio"""
+    from build_test import BuildTester
+    from parse_cache import get_parse_cache
+    from project_index import get_project_index
+    from test_integration import EmailAssistantTester
+
+    steps = {}
+    index = get_project_index(root)
+    start = time.perf_counter()
+    index.build()
+    elapsed = time.perf_counter() - start
+    steps["ProjectIndex.build"] = {
+        "seconds": elapsed,
+        "files": index.count(),
+        "files_per_s": index.count() / elapsed if elapsed else 0.0,
+        "peak_rss_mb": _peak_rss_mb(),
+        "passed": True,
+    }
+
+    for cls in (BuildTester, EmailAssistantTester):
+        tester = cls(root, use_cache=False, jobs=1)
+        order = getattr(tester, "BUILD_STEPS", None) or tester.TESTS
+        for name, _ in order:
+            # Sem as análises das etapas anteriores: o cache de análises é do processo inteiro, e uma nova
+            # geração do índice refaz os índices memorizados (recursos, símbolos, layouts) fora da medição
+            get_parse_cache().clear()
+            index.refresh()
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                records = tester.run_steps([name])
+                elapsed = time.perf_counter() - start
+            files = _step_files(tester, name, index)
+            steps[f"{cls.__name__}.{name}"] = {
+                "seconds": elapsed,
+                "files": files,
+                "files_per_s": files / elapsed if files and elapsed else 0.0,
+                "peak_rss_mb": _peak_rss_mb(),
+                "passed": all(result.get("success", result.get("passed")) for result in records),
+            }
+
+    return {"steps": steps, "peak_rss_mb": _peak_rss_mb()}
+
+
+def run_measurements(root, repeat):
+    """Mede `repeat` vezes, cada uma em um processo novo (caches em memória e RSS zerados)"""
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, str(Path(__file__).resolve()), "--measure", str(root)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        runs.append(json.loads(output))
+
+    # Menor tempo entre as repetições (menos ruído); pico de RSS é o maior observado
+    steps = {}
+    for name in runs[0]["steps"]:
+        samples = [run["steps"][name] for run in runs]
+        best = min(samples, key=lambda sample: sample["seconds"])
+        steps[name] = dict(best, peak_rss_mb=max(sample["peak_rss_mb"] for sample in samples),
+                           passed=all(sample["passed"] for sample in samples))
+    return {"steps": steps, "peak_rss_mb": max(run["peak_rss_mb"] for run in runs)}
+
+
+def compare(current, baseline, tolerance, min_delta):
+    """Lista as regressões de tempo por etapa e de pico de RSS em relação à baseline"""
+    regressions = []
+    for name, base in baseline["steps"].items():
+        step = current["steps"].get(name)
+        if step is None:
+            continue
+        limit = base["seconds"] * (1 + tolerance)
+        if step["seconds"] > limit and step["seconds"] - base["seconds"] > min_delta:
+            regressions.append(f"{name}: {base['seconds']:.3f}s → {step['seconds']:.3f}s")
+
+    base_rss = baseline.get("peak_rss_mb")
+    if base_rss:
+        rss = current["peak_rss_mb"]
+        if rss > base_rss * (1 + tolerance) and rss - base_rss > RSS_MIN_DELTA_MB:
+            regressions.append(f"pico de RSS: {base_rss:.0f} MB → {rss:.0f} MB")
+    return regressions
+
+
+def print_table(size, result, baseline=None):
+    print(f"\n📊 {size}: {result['files']} arquivos (gerados em {result['generate_seconds']:.2f}s)")
+    print(f"  {'etapa':<58} {'tempo':>9} {'arquivos/s':>12} {'RSS MB':>8} {'baseline':>9}")
+    for name, step in result["steps"].items():
+        base = baseline["steps"].get(name) if baseline else None
+        base_text = f"{base['seconds']:.3f}s" if base else "-"
+        rate = f"{step['files_per_s']:.0f}" if step["files_per_s"] else "-"
+        status = "" if step["passed"] else "  ❌"
+        print(f"  {name:<58} {step['seconds']:>8.3f}s {rate:>12} {step['peak_rss_mb']:>8.0f} {base_text:>9}{status}")
+    print(f"  {'pico de RSS':<58} {result['peak_rss_mb']:>28.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do BuildTester e EmailAssistantTester")
+    parser.add_argument("--size", action="append", choices=sorted(PRESETS),
+                        help="Tamanho do projeto sintético (pode repetir; padrão: small)")
+    parser.add_argument("--root", help="Usa um projeto já gerado em vez de gerar um temporário")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetições por tamanho (vale o menor tempo)")
+    parser.add_argument("--baseline-dir", default=str(BASELINE_DIR), help="Diretório das baselines JSON")
+    parser.add_argument("--save-baseline", action="store_true", help="Grava os resultados como nova baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Aumento relativo tolerado")
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA,
+                        help="Aumento absoluto mínimo (s) para contar como regressão")
+    parser.add_argument("--measure", metavar="ROOT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        json.dump(measure(args.measure), sys.stdout)
+        return 0
+
+    sizes = args.size or ["small"]
+    baseline_dir = Path(args.baseline_dir)
+    failed = False
+
+    for size in sizes:
+        with tempfile.TemporaryDirectory(prefix=f"bench-{size}-") as tmp:
+            root = Path(args.root) if args.root else Path(tmp)
+            start = time.perf_counter()
+            if not args.root:
+                generate_project(root, **PRESETS[size])
+            generate_seconds = time.perf_counter() - start
+
+            result = run_measurements(root, args.repeat)
+            result.update({
+                "size": size,
+                "files": result["steps"]["ProjectIndex.build"]["files"],
+                "generate_seconds": generate_seconds,
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+            })
+
+        baseline_path = baseline_dir / f"{size}.json"
+        baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else None
+        print_table(size, result, baseline)
+
+        if args.save_baseline:
+            baseline_dir.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(result, indent=2) + "\n")
+            print(f"💾 Baseline salva em {baseline_path}")
+        elif baseline is None:
+            print(f"ℹ️  Sem baseline em {baseline_path} (use --save-baseline)")
+        else:
+            regressions = compare(result, baseline, args.tolerance, args.min_delta)
+            if regressions:
+                failed = True
+                print("❌ REGRESSÕES DE DESEMPENHO:")
+                for regression in regressions:
+                    print(f"  • {regression}")
+            else:
+                print("✅ Nenhuma regressão em relação à baseline")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
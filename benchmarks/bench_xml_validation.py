@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Benchmark do validador de XML em streaming
+Gera layouts e drawables com o gerador de projetos sintéticos e mede arquivos/s com 1, 4 e N processos
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from synthetic_project import generate_xml_resources
+from xml_validator import validate_xml_files
+
+
+def run(paths, workers):
+    start = time.perf_counter()
+    results = validate_xml_files(paths, workers=workers)
+    elapsed = time.perf_counter() - start
+    assert all(result["valid"] for _, result in results)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do validador de XML")
+    parser.add_argument("--files", type=int, default=5000, help="Quantidade de arquivos XML gerados")
+    parser.add_argument("--children", type=int, default=40, help="Views por layout")
+    args = parser.parse_args()
+
+    cpu_count = os.cpu_count() or 1
+    worker_counts = sorted({1, 4, cpu_count})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        layouts = args.files // 2
+        paths = generate_xml_resources(tmp, layouts, args.files - layouts, children=args.children)
+        total_bytes = sum(os.path.getsize(path) for path in paths)
+        print(f"📁 {len(paths)} arquivos XML ({total_bytes / 1e6:.1f} MB)")
+
+        run(paths, 1)  # aquecer o cache de páginas
+        for workers in worker_counts:
+            elapsed = run(paths, workers)
+            print(f"  • {workers:>3} processo(s): {len(paths) / elapsed:>10.0f} arquivos/s ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Gerador de projetos Android sintéticos no formato do Email Assistant (com.emailassistant)
+Produz a estrutura mínima que os scripts de teste esperam e a infla até o tamanho pedido
+"""
+
+import argparse
+from pathlib import Path
+
+PACKAGE = "com.emailassistant"
+SOURCE_DIR = "app/src/main/java/com/emailassistant"
+RES_DIR = "app/src/main/res"
+
+# Tamanhos usados pela suíte de benchmarks
+PRESETS = {
+    "small": {"kotlin_files": 100, "layouts": 200, "drawables": 200, "dependencies": 50},
+    "medium": {"kotlin_files": 10000, "layouts": 2000, "drawables": 3000, "dependencies": 500},
+    "large": {"kotlin_files": 100000, "layouts": 5000, "drawables": 5000, "dependencies": 2000},
+}
+
+# Arquivos por pacote de feature gerado
+FILES_PER_PACKAGE = 100
+
+# Views por layout gerado (cada uma usa a string label_<i>)
+LAYOUT_CHILDREN = 40
+
+LAYOUT_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<LinearLayout xmlns:android="http://schemas.android.com/apk/res/android"
+    android:layout_width="match_parent"
+    android:layout_height="match_parent"
+    android:orientation="vertical">
+{children}
+</LinearLayout>
+"""
+
+CHILD_TEMPLATE = """    <TextView
+        android:id="@+id/text_{i}"
+        android:layout_width="wrap_content"
+        android:layout_height="wrap_content"
+        android:text="@string/label_{i}" />"""
+
+DRAWABLE_TEMPLATE = """<vector xmlns:android="http://schemas.android.com/apk/res/android"
+    android:width="24dp" android:height="24dp"
+    android:viewportWidth="24" android:viewportHeight="24">
+    <path android:fillColor="#FF000000" android:pathData="M12,2L2,22h20z{extra}" />
+</vector>
+"""
+
+SHAPE_TEMPLATE = """<shape xmlns:android="http://schemas.android.com/apk/res/android" android:shape="oval">
+    <solid android:color="@color/primary" />
+</shape>
+"""
+
+# Classe gerada: strings com chaves, templates e comentários exercitam o analisador léxico
+KOTLIN_TEMPLATE = """package {package}
+
+import com.emailassistant.R
+import javax.inject.Inject
+import kotlinx.coroutines.flow.MutableStateFlow
+import kotlinx.coroutines.flow.StateFlow
+
+/**
+ * Componente gerado {name} (não contém {{ chaves }} reais neste comentário)
+ */
+class {name} @Inject constructor() {{
+
+    private val _state = MutableStateFlow("idle")
+    val state: StateFlow<String> = _state
+
+    fun load(id: Int): String {{
+        val label = "item {{$id}} de ${{id * 2}}"
+        return label.trim()
+    }}
+
+    fun update(value: String) {{
+        // chave em comentário: {{
+        _state.value = \"\"\"
+            valor: ${{value.length}} }}
+        \"\"\".trimIndent()
+    }}
+
+    suspend fun refresh(): List<String> = listOf("a", "b", "c").map {{ it.uppercase() }}
+
+    fun resources() = listOf<Int>({resources})
+
+    companion object {{
+        const val TAG = "{name}"
+    }}
+}}
+"""
+
+ROOT_BUILD_GRADLE = """// Top-level build file where you can add configuration options common to all sub-projects/modules.
+buildscript {
+    ext.kotlin_version = "1.9.10"
+    ext.hilt_version = "2.48"
+    ext.retrofit_version = "2.9.0"
+    ext.room_version = "2.5.0"
+    ext.lifecycle_version = "2.7.0"
+    ext.coroutines_version = "1.7.3"
+
+    repositories {
+        google()
+        mavenCentral()
+    }
+    dependencies {
+        classpath "com.android.tools.build:gradle:8.1.2"
+        classpath "org.jetbrains.kotlin:kotlin-gradle-plugin:$kotlin_version"
+        classpath "com.google.dagger:hilt-android-gradle-plugin:$hilt_version"
+    }
+}
+
+plugins {
+    id 'com.android.application' version '8.1.2' apply false
+    id 'org.jetbrains.kotlin.android' version '1.9.10' apply false
+    id 'com.google.dagger.hilt.android' version '2.48' apply false
+}
+"""
+
+APP_BUILD_GRADLE = """plugins {{
+    id 'com.android.application'
+    id 'org.jetbrains.kotlin.android'
+    id 'kotlin-kapt'
+    id 'dagger.hilt.android.plugin'
+}}
+
+android {{
+    namespace '{package}'
+    compileSdk 34
+
+    defaultConfig {{
+        applicationId "{package}"
+        minSdk 24
+        targetSdk 34
+        versionCode 1
+        versionName "1.0.0"
+    }}
+
+    buildTypes {{
+        release {{
+            minifyEnabled true
+            proguardFiles getDefaultProguardFile('proguard-android-optimize.txt'), 'proguard-rules.pro'
+        }}
+    }}
+}}
+
+dependencies {{
+    implementation 'androidx.core:core-ktx:1.12.0'
+    implementation 'androidx.appcompat:appcompat:1.6.1'
+    implementation 'com.google.android.material:material:1.10.0'
+    implementation "androidx.lifecycle:lifecycle-viewmodel-ktx:$lifecycle_version"
+    implementation "com.google.dagger:hilt-android:$hilt_version"
+    kapt "com.google.dagger:hilt-compiler:$hilt_version"
+    implementation "com.squareup.retrofit2:retrofit:$retrofit_version"
+    implementation 'com.squareup.okhttp3:okhttp:4.12.0'
+    implementation "androidx.room:room-runtime:$room_version"
+    implementation 'androidx.constraintlayout:constraintlayout:2.1.4'
+    implementation "org.jetbrains.kotlinx:kotlinx-coroutines-android:$coroutines_version"
+{extra}
+    testImplementation 'junit:junit:4.13.2'
+}}
+"""
+
+MANIFEST = """<?xml version="1.0" encoding="utf-8"?>
+<manifest xmlns:android="http://schemas.android.com/apk/res/android">
+    <uses-permission android:name="android.permission.RECORD_AUDIO" />
+    <uses-permission android:name="android.permission.INTERNET" />
+    <uses-permission android:name="android.permission.ACCESS_NETWORK_STATE" />
+    <application
+        android:name=".EmailAssistantApplication"
+        android:label="@string/app_name"
+        android:theme="@style/Theme.EmailAssistant">
+        <activity android:name=".ui.main.MainActivity" android:exported="true">
+            <intent-filter>
+                <action android:name="android.intent.action.MAIN" />
+                <category android:name="android.intent.category.LAUNCHER" />
+            </intent-filter>
+        </activity>
+        <activity android:name=".ui.setup.SetupActivity" />
+        <activity android:name=".ui.auth.AuthActivity" />
+    </application>
+</manifest>
+"""
+
+# Classes que os testes de estrutura e arquitetura procuram: (caminho, declaração)
+CORE_CLASSES = [
+    ("EmailAssistantApplication.kt", "@HiltAndroidApp\nclass EmailAssistantApplication : Application()"),
+    ("ui/main/MainActivity.kt", "@AndroidEntryPoint\nclass MainActivity : AppCompatActivity()"),
+    ("ui/main/MainViewModel.kt", "@HiltViewModel\nclass MainViewModel @Inject constructor() : ViewModel()"),
+    ("ui/setup/SetupActivity.kt", "@AndroidEntryPoint\nclass SetupActivity : AppCompatActivity()"),
+    ("ui/setup/SetupViewModel.kt", "@HiltViewModel\nclass SetupViewModel @Inject constructor() : ViewModel()"),
+    ("ui/auth/AuthActivity.kt", "@AndroidEntryPoint\nclass AuthActivity : AppCompatActivity()"),
+    ("ui/auth/AuthViewModel.kt", "@HiltViewModel\nclass AuthViewModel @Inject constructor() : ViewModel()"),
+    ("data/repository/impl/EmailRepositoryImpl.kt", "class EmailRepositoryImpl @Inject constructor()"),
+    ("data/repository/impl/SpeechRepositoryImpl.kt", "class SpeechRepositoryImpl @Inject constructor()"),
+    ("data/repository/impl/AIAnalysisRepositoryImpl.kt", "class AIAnalysisRepositoryImpl @Inject constructor()"),
+    ("di/NetworkModule.kt", "@Module\n@InstallIn(SingletonComponent::class)\nobject NetworkModule"),
+    ("di/DatabaseModule.kt", "@Module\n@InstallIn(SingletonComponent::class)\nobject DatabaseModule"),
+    ("di/RepositoryModule.kt", "@Module\n@InstallIn(SingletonComponent::class)\nabstract class RepositoryModule"),
+]
+
+CORE_DRAWABLES = ["ic_settings", "ic_mic_active", "ic_arrow_back"]
+
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def generate_xml_resources(res_root, layouts, drawables, children=LAYOUT_CHILDREN):
+    """Cria `layouts` layouts e `drawables` vetores em res_root/layout e res_root/drawable"""
+    layout_dir = Path(res_root) / "layout"
+    drawable_dir = Path(res_root) / "drawable"
+    layout_dir.mkdir(parents=True, exist_ok=True)
+    drawable_dir.mkdir(parents=True, exist_ok=True)
+
+    layout_text = LAYOUT_TEMPLATE.format(children="\n".join(CHILD_TEMPLATE.format(i=i) for i in range(children)))
+    paths = []
+    for n in range(layouts):
+        path = layout_dir / f"screen_{n}.xml"
+        path.write_text(layout_text)
+        paths.append(str(path))
+    for n in range(drawables):
+        path = drawable_dir / f"ic_generated_{n}.xml"
+        path.write_text(DRAWABLE_TEMPLATE.format(extra="L1,1" * (n % 50)))
+        paths.append(str(path))
+    return paths
+
+
+def generate_kotlin_sources(source_root, count, layouts=0, drawables=0):
+    """Cria `count` classes Kotlin em pacotes feature.fN; cada uma usa um layout e um drawable gerados"""
+    paths = []
+    for n in range(count):
+        group = n // FILES_PER_PACKAGE
+        name = f"Generated{n}"
+        path = Path(source_root) / "feature" / f"f{group}" / f"{name}.kt"
+        if n % FILES_PER_PACKAGE == 0:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        resources = []
+        if layouts:
+            resources.append(f"R.layout.screen_{n % layouts}")
+        if drawables:
+            resources.append(f"R.drawable.ic_generated_{n % drawables}")
+        path.write_text(KOTLIN_TEMPLATE.format(
+            package=f"{PACKAGE}.feature.f{group}", name=name, resources=", ".join(resources)
+        ))
+        paths.append(str(path))
+    return paths
+
+
+def _dependency_lines(count):
+    lines = []
+    for n in range(count):
+        lines.append(f"    implementation 'com.example.generated{n // 50}:lib-{n}:1.{n % 10}.0'")
+    return "\n".join(lines)
+
+
+def generate_project(root, kotlin_files=100, layouts=200, drawables=200, dependencies=50):
+    """Cria um projeto completo (passa em todas as verificações) com os tamanhos informados"""
+    root = Path(root)
+    source_root = root / SOURCE_DIR
+    res_root = root / RES_DIR
+
+    # Gradle Wrapper e arquivos de build
+    _write(root / "gradlew", "#!/bin/sh\nexec java -classpath gradle/wrapper/gradle-wrapper.jar org.gradle.wrapper.GradleWrapperMain \"$@\"\n")
+    (root / "gradlew").chmod(0o755)
+    _write(root / "gradle/wrapper/gradle-wrapper.properties",
+           "distributionUrl=https\\://services.gradle.org/distributions/gradle-8.4-bin.zip\n")
+    _write(root / "settings.gradle", "rootProject.name = \"EmailAssistant\"\ninclude ':app'\n")
+    _write(root / "build.gradle", ROOT_BUILD_GRADLE)
+    _write(root / "app/build.gradle", APP_BUILD_GRADLE.format(package=PACKAGE, extra=_dependency_lines(dependencies)))
+    _write(root / "app/src/main/AndroidManifest.xml", MANIFEST)
+
+    # Classes exigidas pelos testes de estrutura e arquitetura
+    for rel, declaration in CORE_CLASSES:
+        package = ".".join([PACKAGE] + rel.split("/")[:-1])
+        body = "    fun start() {}\n"
+        if rel.endswith("Activity.kt"):
+            body += f"    fun layout() = R.layout.activity_{rel.split('/')[1]}\n"
+        _write(source_root / rel, f"package {package}\n\nimport {PACKAGE}.R\n\n{declaration} {{\n{body}}}\n")
+
+    # Recursos exigidos
+    labels = "".join(f'    <string name="label_{i}">Rótulo {i}</string>\n' for i in range(LAYOUT_CHILDREN))
+    _write(res_root / "values/strings.xml",
+           '<?xml version="1.0" encoding="utf-8"?>\n<resources>\n    <string name="app_name">Email Assistant</string>\n'
+           f'{labels}</resources>\n')
+    _write(res_root / "values/colors.xml",
+           '<?xml version="1.0" encoding="utf-8"?>\n<resources>\n    <color name="primary">#FF6200EE</color>\n</resources>\n')
+    _write(res_root / "values/themes.xml",
+           '<?xml version="1.0" encoding="utf-8"?>\n<resources>\n'
+           '    <style name="Theme.EmailAssistant" parent="Theme.Material3.DayNight.NoActionBar">\n'
+           '        <item name="colorPrimary">@color/primary</item>\n    </style>\n</resources>\n')
+    screen_drawables = {"main": ["voice_button_background", "ic_mic_active"], "setup": ["ic_settings"], "auth": ["ic_arrow_back"]}
+    for screen, drawable_names in screen_drawables.items():
+        images = "".join(
+            f'\n    <ImageView android:layout_width="24dp" android:layout_height="24dp" android:src="@drawable/{name}" />'
+            for name in drawable_names
+        )
+        _write(res_root / f"layout/activity_{screen}.xml", LAYOUT_TEMPLATE.format(children=CHILD_TEMPLATE.format(i=0) + images))
+    for name in CORE_DRAWABLES:
+        _write(res_root / f"drawable/{name}.xml", DRAWABLE_TEMPLATE.format(extra=""))
+    _write(res_root / "drawable/voice_button_background.xml", SHAPE_TEMPLATE)
+
+    generate_kotlin_sources(source_root, kotlin_files, layouts, drawables)
+    generate_xml_resources(res_root, layouts, drawables)
+    return root
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera um projeto Android sintético no formato do Email Assistant")
+    parser.add_argument("root", help="Diretório de destino")
+    parser.add_argument("--size", choices=sorted(PRESETS), default="small", help="Tamanho predefinido")
+    parser.add_argument("--kotlin-files", type=int, help="Quantidade de arquivos .kt (sobrepõe o tamanho)")
+    parser.add_argument("--layouts", type=int, help="Quantidade de layouts (sobrepõe o tamanho)")
+    parser.add_argument("--drawables", type=int, help="Quantidade de drawables (sobrepõe o tamanho)")
+    parser.add_argument("--dependencies", type=int, help="Dependências extras no app/build.gradle (sobrepõe o tamanho)")
+    args = parser.parse_args()
+
+    sizes = dict(PRESETS[args.size])
+    for key in sizes:
+        value = getattr(args, key)
+        if value is not None:
+            sizes[key] = value
+    generate_project(args.root, **sizes)
+    print(f"📁 Projeto gerado em {args.root}: {sizes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Cache incremental em disco dos resultados das verificações por arquivo
+Cada entrada é indexada pelo caminho relativo e validada por mtime, tamanho e hash do conteúdo
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from parse_cache import get_parse_cache
+from project_index import get_project_index
+
+# Incrementar sempre que o formato ou os analisadores mudarem
+CACHE_VERSION = 6
+CACHE_FILE = Path("build") / "check-cache.json"
+
+# Arquivos modificados nesta janela em torno da gravação do cache são sempre
+# re-hasheados (o mtime pode não ter mudado entre duas escritas rápidas)
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def content_hash(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class CheckCache:
+    """Resultados das verificações por arquivo, persistidos entre execuções"""
+
+    def __init__(self, project_root, enabled=True):
+        self.project_root = Path(project_root)
+        self.enabled = enabled
+        self.cache_file = self.project_root / CACHE_FILE
+        self.hits = 0
+        self.misses = 0
+        # Carregado do disco no primeiro uso (etapas que não usam o cache não pagam a leitura)
+        self._loaded = None
+        self._dirty = set()
+        self._lock = threading.Lock()
+
+    @property
+    def _files(self):
+        if self._loaded is None:
+            with self._lock:
+                if self._loaded is None:
+                    self._loaded = self._load() if self.enabled else {}
+        return self._loaded
+
+    def _load(self):
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != CACHE_VERSION:
+            return {}
+        return data.get("files", {})
+
+    def facts(self, entry, kind, index=None):
+        """Retorna os fatos de `kind` para o arquivo, reutilizando o cache quando válido"""
+        # Os analisadores (lexer Kotlin, parser de recursos) só são carregados por quem os usa
+        from file_checks import get_analyzer
+
+        index = index or get_project_index(self.project_root)
+        if not self.enabled:
+            # Sem cache em disco, cada arquivo ainda é analisado uma vez só por execução
+            self.misses += 1
+            return get_parse_cache().parsed(index, entry, f"facts:{kind}", get_analyzer(kind))
+
+        # Com o cache em disco, os fatos ficam nos registros que serão gravados (fora do limite --memory-cap)
+        result = self.cached(entry, kind)
+        if result is not None:
+            return result
+
+        data = index.read_bytes(entry)
+        digest = content_hash(data)
+        record = self._files.get(entry.rel)
+
+        if record is not None and record.get("hash") == digest and kind in record:
+            self.hits += 1
+            result = record[kind]
+        else:
+            self.misses += 1
+            result = get_analyzer(kind)(data)
+
+        self.store(entry, kind, result, digest)
+        return result
+
+    def cached(self, entry, kind):
+        """Retorna os fatos apenas se mtime e tamanho confirmam o cache (sem ler o arquivo)"""
+        if not self.enabled:
+            return None
+        record = self._files.get(entry.rel)
+        if record is not None and kind in record and self._stat_matches(record, entry):
+            self.hits += 1
+            return record[kind]
+        return None
+
+    def store(self, entry, kind, result, digest):
+        """Registra fatos calculados fora do cache (ex.: em outro processo)"""
+        if not self.enabled or digest is None:
+            return
+        files = self._files
+        with self._lock:
+            record = files.get(entry.rel)
+            if record is None or record.get("hash") != digest:
+                record = {"hash": digest}
+            record = dict(record, size=entry.size, mtime_ns=entry.mtime_ns, seen_ns=time.time_ns())
+            if entry.oid is not None:
+                record["oid"] = entry.oid
+            record[kind] = result
+            files[entry.rel] = record
+            self._dirty.add(entry.rel)
+
+    @staticmethod
+    def _stat_matches(record, entry):
+        if entry.oid is not None:
+            # Arquivo vindo de um objeto git: o id do blob já identifica o conteúdo
+            return record.get("oid") == entry.oid
+        if record.get("size") != entry.size or record.get("mtime_ns") != entry.mtime_ns:
+            return False
+        # Arquivo "racy": modificado logo antes de ser registrado, confirmar pelo hash
+        return entry.mtime_ns < record.get("seen_ns", 0) - RACY_WINDOW_NS
+
+    def save(self, live_paths=None):
+        """Grava o cache em disco, mesclando com o que outro processo possa ter salvo"""
+        if not self.enabled or self._loaded is None:
+            return
+
+        with self._lock:
+            live = set(live_paths) if live_paths is not None else None
+            stale = set(self._loaded) - live if live is not None else set()
+            if not self._dirty and not stale:
+                return
+
+            files = self._load()
+            for rel in self._dirty:
+                files[rel] = self._loaded[rel]
+            if live is not None:
+                files = {rel: record for rel, record in files.items() if rel in live}
+            self._loaded = files
+            self._dirty = set()
+
+            try:
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = self.cache_file.with_name(f"{self.cache_file.name}.{os.getpid()}.tmp")
+                with open(tmp_file, 'w') as f:
+                    json.dump({"version": CACHE_VERSION, "files": files}, f, separators=(',', ':'))
+                os.replace(tmp_file, self.cache_file)
+            except OSError as e:
+                print(f"⚠️  Não foi possível salvar o cache de verificações: {e}")
+
+    def clear(self):
+        """Remove o cache persistido"""
+        with self._lock:
+            self._loaded = {}
+            self._dirty = set()
+            try:
+                self.cache_file.unlink()
+            except FileNotFoundError:
+                pass
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_check_cache(project_root, enabled=True):
+    """Retorna o cache compartilhado da raiz informada"""
+    key = (str(Path(project_root)), enabled)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = CheckCache(project_root, enabled=enabled)
+            _caches[key] = cache
+        return cache
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Registro das verificações dos scripts de teste do Email Assistant
+Cada verificação declara nome, dependências, entradas e tags; --only/--skip escolhem por nome ou tag
+"""
+
+
+class CheckSpec:
+    """Uma verificação: método do tester, etapas de que depende, tipos de entrada que lê e tags
+
+    `sharded` marca as verificações por arquivo que --shard K/N divide entre máquinas.
+    """
+
+    __slots__ = ("name", "after", "inputs", "tags", "sharded")
+
+    def __init__(self, name, after=(), inputs=(), tags=(), sharded=False):
+        self.name = name
+        self.after = tuple(after)
+        self.inputs = tuple(inputs)
+        self.tags = tuple(tags)
+        self.sharded = sharded
+
+    def __repr__(self):
+        return f"CheckSpec({self.name!r}, tags={self.tags})"
+
+
+def _tokens(values):
+    # --only a,b --only c -> ["a", "b", "c"]
+    return [token.strip() for value in values or () for token in value.split(",") if token.strip()]
+
+
+def _match(checks, token):
+    names = [check.name for check in checks if check.name == token or token in check.tags]
+    if not names:
+        known_tags = sorted({tag for check in checks for tag in check.tags})
+        raise ValueError(
+            f"Verificação ou tag desconhecida: {token} (tags: {', '.join(known_tags)}; use --list-checks)"
+        )
+    return names
+
+
+def select_checks(checks, only=None, skip=None):
+    """Nomes escolhidos por --only e --skip, na ordem do registro (None quando nada foi filtrado)"""
+    only_tokens = _tokens(only)
+    skip_tokens = _tokens(skip)
+    if not only_tokens and not skip_tokens:
+        return None
+    selected = {check.name for check in checks}
+    if only_tokens:
+        selected = {name for token in only_tokens for name in _match(checks, token)}
+    for token in skip_tokens:
+        selected.difference_update(_match(checks, token))
+    return [check.name for check in checks if check.name in selected]
+
+
+def format_checks(checks):
+    """Linhas de --list-checks"""
+    width = max(len(check.name) for check in checks)
+    lines = [f"  {'verificação':<{width}}  {'tags':<28} entradas"]
+    for check in checks:
+        lines.append(f"  {check.name:<{width}}  {', '.join(check.tags):<28} {', '.join(check.inputs) or '-'}")
+    return lines
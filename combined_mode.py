@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Modo combinado: simulação de build e testes de integração do Email Assistant num único processo
+As duas suítes compartilham o índice de arquivos, os caches e o cache de análises em memória, então
+manifest, build.gradle, layouts e fontes Kotlin são lidos e analisados no máximo uma vez por execução
+"""
+
+import sys
+
+from parse_cache import DEFAULT_MAX_BYTES, format_summary, get_parse_cache
+
+MEGABYTE = 1024 * 1024
+
+
+def run_combined(project_root=None, use_cache=True, jobs=None, reports=None, history=True,
+                 max_bytes=DEFAULT_MAX_BYTES):
+    """Build e testes de integração em sequência; retorna (sucesso, estatísticas do cache de análises)"""
+    from build_test import BuildTester
+    from test_integration import EmailAssistantTester
+
+    cache = get_parse_cache()
+    cache.resize(max_bytes)
+    build_tester = BuildTester(project_root, use_cache=use_cache, jobs=jobs, reports=reports, history=history)
+    integration_tester = EmailAssistantTester(project_root, use_cache=use_cache, jobs=jobs, reports=reports,
+                                              history=history)
+
+    build_ok = build_tester.run_build_simulation()
+    print()
+    integration_ok = integration_tester.run_all_tests()
+
+    summary = cache.summary()
+    print()
+    print("\n".join(format_summary(summary)))
+    return build_ok and integration_ok, summary
+
+
+def main():
+    import argparse
+
+    from project_index import DEFAULT_PROJECT_ROOT
+    from report_sinks import REPORT_FORMATS
+
+    parser = argparse.ArgumentParser(description="Build e testes de integração num único processo")
+    parser.add_argument("--root", help=f"Raiz do projeto a verificar (padrão: {DEFAULT_PROJECT_ROOT})")
+    parser.add_argument("--no-cache", action="store_true", help="Ignora o cache incremental de verificações por arquivo")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Etapas executadas em paralelo (padrão: número de CPUs)")
+    parser.add_argument("--report", action="append", metavar="FORMATO",
+                        help=f"Relatório adicional de cada suíte, no caminho padrão dela ({', '.join(REPORT_FORMATS)}); "
+                             "pode repetir")
+    parser.add_argument("--no-history", action="store_true", help="Não grava as execuções no histórico (build/run-history.sqlite)")
+    parser.add_argument("--memory-cap", type=int, default=DEFAULT_MAX_BYTES // MEGABYTE, metavar="MB",
+                        help=f"Memória máxima do cache de análises: manifests, modelos do Gradle e, com --no-cache, "
+                             f"fatos por arquivo (padrão: {DEFAULT_MAX_BYTES // MEGABYTE} MB)")
+    args = parser.parse_args()
+    if args.memory_cap <= 0:
+        parser.error("--memory-cap deve ser positivo")
+    if any(":" in spec for spec in args.report or ()):
+        # Um caminho explícito seria o mesmo para as duas suítes
+        parser.error("no modo combinado, --report aceita só o formato")
+
+    success, _ = run_combined(args.root, use_cache=not args.no_cache, jobs=args.jobs, reports=args.report,
+                              history=not args.no_history, max_bytes=args.memory_cap * MEGABYTE)
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
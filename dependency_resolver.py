@@ -0,0 +1,723 @@
+#!/usr/bin/env python3
+"""
+Resolução transitiva de dependências a partir dos caches locais (Gradle e Maven), sem rede
+Lê os metadados Gradle (.module) ou o POM de cada versão, monta o grafo completo com a regra do Gradle
+(a versão mais nova pedida vence) e aponta conflitos, duplicatas e o tamanho total dos artefatos
+"""
+
+import functools
+import json
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from gradle_cache import LocalArtifactRepository, select_artifact
+
+# Tipos no cache de artefatos (incrementar quando o formato analisado mudar)
+POM_CACHE_KIND = "pom-2"
+MODULE_CACHE_KIND = "gradle-module-2"
+
+# Abaixo disso o custo de subir processos supera o ganho
+MIN_METADATA_FOR_POOL = 32
+
+# Escopos do POM que entram no classpath de execução
+RUNTIME_SCOPES = ("compile", "runtime")
+
+# Plataformas Kotlin preferidas entre as variantes de um .module (as demais só se não houver estas)
+PREFERRED_PLATFORMS = ("androidJvm", "jvm")
+
+# Limite de passadas da resolução de conflitos (cada passada só pode aumentar versões)
+MAX_RESOLUTION_PASSES = 50
+
+_PROPERTY = re.compile(r"\$\{([^}]+)\}")
+_VERSION_SPLIT = re.compile(r"[.\-_+]|(?<=\d)(?=\D)|(?<=\D)(?=\d)")
+
+# Qualificadores especiais na ordem do Gradle (outros textos ficam entre "dev" e "rc")
+_QUALIFIER_RANK = {"dev": 0, "rc": 2, "snapshot": 3, "final": 4, "ga": 5, "release": 6, "sp": 7}
+
+
+def _compare_parts(left, right):
+    for a, b in zip(left, right):
+        if a == b:
+            continue
+        a_num, b_num = a.isdigit(), b.isdigit()
+        if a_num and b_num:
+            return -1 if int(a) < int(b) else 1 if int(a) > int(b) else 0
+        if a_num != b_num:
+            return 1 if a_num else -1
+        a_rank = _QUALIFIER_RANK.get(a.lower(), 1)
+        b_rank = _QUALIFIER_RANK.get(b.lower(), 1)
+        if a_rank != b_rank:
+            return -1 if a_rank < b_rank else 1
+        return -1 if a < b else 1
+    if len(left) == len(right):
+        return 0
+    # Parte extra numérica é versão maior (1.2.1 > 1.2); não numérica é menor (1.2-rc1 < 1.2)
+    longer, sign = (left, 1) if len(left) > len(right) else (right, -1)
+    return sign if longer[min(len(left), len(right))].isdigit() else -sign
+
+
+def compare_versions(left, right):
+    """Comparação de versões como no Gradle: -1, 0 ou 1"""
+    return _compare_parts([part for part in _VERSION_SPLIT.split(left) if part],
+                          [part for part in _VERSION_SPLIT.split(right) if part])
+
+
+version_key = functools.cmp_to_key(compare_versions)
+
+
+def newest(versions):
+    return max(versions, key=version_key) if versions else None
+
+
+def matches_request(version, request):
+    """Verdadeiro se `version` satisfaz um pedido dinâmico ('1.+', '[1.0,2.0)', 'latest.release')"""
+    if request in ("+", "latest.release", "latest.integration"):
+        return True
+    if request.endswith("+"):
+        return version.startswith(request[:-1])
+    if request[:1] in "[(" and request[-1:] in "])" and "," in request:
+        low, high = (part.strip() for part in request[1:-1].split(",", 1))
+        if low and compare_versions(version, low) < (0 if request[0] == "[" else 1):
+            return False
+        if high and compare_versions(version, high) > (0 if request[-1] == "]" else -1):
+            return False
+        return True
+    return version == request
+
+
+def is_dynamic(request):
+    return request.endswith("+") or request.startswith("latest.") or \
+        (request[:1] in "[(" and request[-1:] in "])")
+
+
+def range_floor(request):
+    """Versão mínima de um intervalo Maven ('[1.0,2.0)' -> '1.0'; '[1.2]' -> '1.2')"""
+    if request[:1] in "[(" and request[-1:] in "])":
+        return request[1:-1].split(",", 1)[0].strip() or None
+    return None
+
+
+# --- Leitura de metadados (executada também nos processos do pool) ---
+
+def _text(element, tag, ns):
+    found = element.find(ns + tag)
+    return found.text.strip() if found is not None and found.text else None
+
+
+def _pom_dependency(element, ns):
+    exclusions = [
+        [_text(exclusion, "groupId", ns) or "*", _text(exclusion, "artifactId", ns) or "*"]
+        for exclusion in element.findall(f"{ns}exclusions/{ns}exclusion")
+    ]
+    return [
+        _text(element, "groupId", ns), _text(element, "artifactId", ns), _text(element, "version", ns),
+        _text(element, "scope", ns) or "compile", (_text(element, "optional", ns) or "false") == "true",
+        _text(element, "type", ns) or "jar", _text(element, "classifier", ns), exclusions,
+    ]
+
+
+def parse_pom(data):
+    """POM em forma serializável, sem herança nem propriedades resolvidas"""
+    root = ET.fromstring(data)
+    ns = root.tag[:root.tag.index("}") + 1] if root.tag.startswith("{") else ""
+    parent = root.find(f"{ns}parent")
+    properties = {}
+    props = root.find(f"{ns}properties")
+    if props is not None:
+        for prop in props:
+            if isinstance(prop.tag, str):
+                properties[prop.tag[len(ns):]] = (prop.text or "").strip()
+    dependencies = root.find(f"{ns}dependencies")
+    management = root.find(f"{ns}dependencyManagement/{ns}dependencies")
+    relocation = root.find(f"{ns}distributionManagement/{ns}relocation")
+    return {
+        "kind": "pom",
+        "group": _text(root, "groupId", ns),
+        "artifact": _text(root, "artifactId", ns),
+        "version": _text(root, "version", ns),
+        "packaging": _text(root, "packaging", ns) or "jar",
+        "parent": [_text(parent, "groupId", ns), _text(parent, "artifactId", ns), _text(parent, "version", ns)]
+        if parent is not None else None,
+        "properties": properties,
+        "dependencies": [_pom_dependency(dep, ns) for dep in dependencies.findall(f"{ns}dependency")]
+        if dependencies is not None else [],
+        "management": [_pom_dependency(dep, ns) for dep in management.findall(f"{ns}dependency")]
+        if management is not None else [],
+        "relocation": [_text(relocation, "groupId", ns), _text(relocation, "artifactId", ns),
+                       _text(relocation, "version", ns)] if relocation is not None else None,
+    }
+
+
+def _variant_rank(variant):
+    # Menor é melhor: variantes de execução de biblioteca, plataforma Android/JVM primeiro
+    attributes = variant.get("attributes", {})
+    usage = attributes.get("org.gradle.usage", "")
+    category = attributes.get("org.gradle.category", "library")
+    if category not in ("library", "platform", "enforced-platform") or "runtime" not in usage:
+        return None
+    platform = attributes.get("org.jetbrains.kotlin.platform.type")
+    platform_rank = PREFERRED_PLATFORMS.index(platform) if platform in PREFERRED_PLATFORMS else \
+        (len(PREFERRED_PLATFORMS) if platform is None else len(PREFERRED_PLATFORMS) + 1)
+    return (platform_rank, 0 if usage == "java-runtime" else 1, variant.get("name", ""))
+
+
+def parse_gradle_module(data):
+    """Variante de execução de um .module (metadados Gradle) em forma serializável"""
+    document = json.loads(data)
+    ranked = sorted(
+        (rank, index) for index, variant in enumerate(document.get("variants", ()))
+        for rank in [_variant_rank(variant)] if rank is not None
+    )
+    if not ranked:
+        return {"kind": "module", "variant": None, "dependencies": [], "files": [], "available_at": None}
+    variant = document["variants"][ranked[0][1]]
+    dependencies = []
+    for dep in variant.get("dependencies", ()):
+        version = dep.get("version", {})
+        strict = version.get("strictly")
+        dependencies.append([
+            dep.get("group"), dep.get("module"), strict or version.get("requires") or version.get("prefers"),
+            bool(strict), [[item.get("group") or "*", item.get("module") or "*"] for item in dep.get("excludes", ())],
+        ])
+    available = variant.get("available-at")
+    return {
+        "kind": "module",
+        "variant": variant.get("name"),
+        "dependencies": dependencies,
+        "files": [[item.get("name"), item.get("size")] for item in variant.get("files", ())],
+        "available_at": [available.get("group"), available.get("module"), available.get("version")]
+        if available else None,
+    }
+
+
+def parse_metadata_file(path):
+    """.pom ou .module -> metadados analisados"""
+    with open(path, "rb") as f:
+        data = f.read()
+    return parse_gradle_module(data) if str(path).endswith(".module") else parse_pom(data)
+
+
+def _parse_chunk(paths):
+    # Executado nos processos do pool
+    results = []
+    for path in paths:
+        try:
+            results.append((path, parse_metadata_file(path), None))
+        except (OSError, ValueError, ET.ParseError, AttributeError, KeyError) as e:
+            results.append((path, None, str(e)))
+    return results
+
+
+def parse_metadata_files(paths, cache=None, workers=None):
+    """{caminho: metadados} e {caminho: erro}; arquivos já vistos (mesmo hash) vêm do cache"""
+    results = {}
+    errors = {}
+    pending = []
+    for path in paths:
+        kind = MODULE_CACHE_KIND if path.endswith(".module") else POM_CACHE_KIND
+        cached = cache.get(path, kind) if cache is not None else None
+        if cached is not None:
+            results[path] = cached
+        else:
+            pending.append(path)
+
+    workers = max(1, workers or os.cpu_count() or 1)
+    if workers == 1 or len(pending) < MIN_METADATA_FOR_POOL:
+        computed = _parse_chunk(pending)
+    else:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # forkserver evita herdar locks das threads do agendador de etapas
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else None)
+        # Metadados são pequenos e parecidos: lotes fixos amortizam a ida e volta ao processo
+        chunk_size = max(8, len(pending) // (workers * 4))
+        chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+        computed = []
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            for chunk_results in pool.map(_parse_chunk, chunks):
+                computed.extend(chunk_results)
+
+    for path, result, error in computed:
+        if error is not None:
+            errors[path] = error
+            continue
+        if cache is not None:
+            cache.misses += 1
+            cache.put(path, MODULE_CACHE_KIND if path.endswith(".module") else POM_CACHE_KIND, result)
+        results[path] = result
+    return results, errors
+
+
+# --- Resolução ---
+
+def _is_excluded(group, name, excluded):
+    """Se (grupo, nome) casa com alguma exclusão (grupo, nome), com '*' valendo qualquer um"""
+    return any(ex_group in ("*", group) and ex_name in ("*", name) for ex_group, ex_name in excluded)
+
+
+class ResolvedModule:
+    """Uma versão de módulo no grafo: dependências de execução, artefato e tamanho"""
+
+    __slots__ = ("group", "name", "version", "dependencies", "artifact", "size", "source", "error")
+
+    def __init__(self, group, name, version):
+        self.group = group
+        self.name = name
+        self.version = version
+        self.dependencies = []  # [(grupo, nome, pedido, estrito, ((grupo, nome) excluídos abaixo dela))]
+        self.artifact = None
+        self.size = None
+        self.source = None  # "module", "pom" ou None (fora do cache local)
+        self.error = None
+
+    @property
+    def module(self):
+        return f"{self.group}:{self.name}"
+
+    def __repr__(self):
+        return f"ResolvedModule({self.module}:{self.version})"
+
+
+class DependencyResolver:
+    """Resolve o grafo transitivo a partir dos metadados encontrados nos repositórios locais
+
+    Cada diretório em `roots` pode ter o layout do cache do Gradle (files-2.1) ou de um repositório
+    Maven; um diretório local faz o papel de um repositório remoto.
+    """
+
+    def __init__(self, repository=None, cache=None, workers=None):
+        self.repository = repository if repository is not None else LocalArtifactRepository()
+        self.cache = cache
+        self.workers = workers
+        self._files = {}  # (grupo, nome, versão) -> arquivos locais
+        self._raw = {}  # caminho do metadado -> metadados analisados
+        self._errors = {}
+        self._modules = {}  # (grupo, nome, versão) -> ResolvedModule
+        self._versions = {}
+
+    def _version_files(self, group, name, version):
+        key = (group, name, version)
+        files = self._files.get(key)
+        if files is None:
+            files = self.repository.files(group, name, version)
+            self._files[key] = files
+        return files
+
+    def _metadata_path(self, group, name, version):
+        files = self._version_files(group, name, version)
+        for suffix in (".module", ".pom"):
+            for path in files:
+                if path.name == f"{name}-{version}{suffix}":
+                    return str(path)
+        return None
+
+    def _pom_path(self, group, name, version):
+        for path in self._version_files(group, name, version):
+            if path.name == f"{name}-{version}.pom":
+                return str(path)
+        return None
+
+    def available_versions(self, group, name):
+        key = (group, name)
+        versions = self._versions.get(key)
+        if versions is None:
+            versions = self.repository.versions(group, name)
+            self._versions[key] = versions
+        return versions
+
+    def select_version(self, group, name, request):
+        """Versão concreta de um pedido (dinâmicos escolhem a mais nova presente no cache local)"""
+        if not request or not is_dynamic(request):
+            return request
+        candidates = [version for version in self.available_versions(group, name) if matches_request(version, request)]
+        return newest(candidates) or range_floor(request)
+
+    def _load(self, paths):
+        # Lê em paralelo os metadados ainda não analisados nesta execução
+        pending = sorted({path for path in paths if path and path not in self._raw and path not in self._errors})
+        if pending:
+            results, errors = parse_metadata_files(pending, cache=self.cache, workers=self.workers)
+            self._raw.update(results)
+            self._errors.update(errors)
+
+    def _pom_chain(self, pom):
+        """O POM e seus pais, do filho para o ancestral mais distante (pais lidos em ondas)"""
+        chain = [pom]
+        seen = set()
+        while chain[-1].get("parent"):
+            group, artifact, version = chain[-1]["parent"]
+            if (group, artifact, version) in seen:
+                break
+            seen.add((group, artifact, version))
+            path = self._pom_path(group, artifact, version)
+            if path is None:
+                break
+            self._load([path])
+            parent = self._raw.get(path)
+            if parent is None:
+                break
+            chain.append(parent)
+        return chain
+
+    def _effective_pom(self, pom):
+        """Dependências de execução do POM com herança, propriedades e dependencyManagement aplicados"""
+        chain = self._pom_chain(pom)
+        properties = {}
+        for item in reversed(chain):
+            properties.update(item["properties"])
+        group = pom["group"] or (pom["parent"] or [None])[0]
+        version = pom["version"] or (pom["parent"] or [None, None, None])[2]
+        properties.update({
+            "project.groupId": group, "pom.groupId": group, "groupId": group,
+            "project.artifactId": pom["artifact"], "project.version": version,
+            "pom.version": version, "version": version,
+        })
+        if pom["parent"]:
+            properties.update({"project.parent.version": pom["parent"][2], "project.parent.groupId": pom["parent"][0]})
+
+        def interpolate(value, depth=0):
+            if not value or "${" not in value or depth > 5:
+                return value
+            return interpolate(_PROPERTY.sub(lambda m: properties.get(m.group(1)) or m.group(0), value), depth + 1)
+
+        management = {}
+        for item in chain:
+            for dep in item["management"]:
+                dep_group, dep_name, dep_version = (interpolate(value) for value in dep[:3])
+                if dep[3] == "import" and dep[5] == "pom":
+                    for key, value in self._bom_versions(dep_group, dep_name, dep_version).items():
+                        management.setdefault(key, value)
+                else:
+                    management.setdefault((dep_group, dep_name), dep_version)
+
+        dependencies = []
+        seen = set()
+        for item in chain:
+            for dep in item["dependencies"]:
+                dep_group, dep_name = interpolate(dep[0]), interpolate(dep[1])
+                scope, optional, dep_type, classifier = dep[3], dep[4], dep[5], dep[6]
+                if scope not in RUNTIME_SCOPES or optional or classifier or dep_type not in ("jar", "aar", "bundle"):
+                    continue
+                if (dep_group, dep_name) in seen:
+                    continue
+                seen.add((dep_group, dep_name))
+                request = interpolate(dep[2]) or management.get((dep_group, dep_name))
+                exclusions = tuple((interpolate(group), interpolate(name)) for group, name in dep[7])
+                dependencies.append((dep_group, dep_name, request, False, exclusions))
+        return dependencies
+
+    def _bom_versions(self, group, name, version):
+        """{(grupo, nome): versão} do dependencyManagement de um BOM (platform() ou import)"""
+        path = self._pom_path(group, name, version) if group and name and version else None
+        if path is None:
+            return {}
+        self._load([path])
+        pom = self._raw.get(path)
+        if pom is None:
+            return {}
+        chain = self._pom_chain(pom)
+        properties = {}
+        for item in reversed(chain):
+            properties.update(item["properties"])
+        properties.update({"project.version": version, "project.groupId": group, "version": version})
+        versions = {}
+        for item in chain:
+            for dep in item["management"]:
+                dep_version = _PROPERTY.sub(lambda m: properties.get(m.group(1)) or m.group(0), dep[2] or "")
+                dep_group = _PROPERTY.sub(lambda m: properties.get(m.group(1)) or m.group(0), dep[0] or "")
+                versions.setdefault((dep_group, dep[1]), dep_version or None)
+        return versions
+
+    def _build_modules(self, keys):
+        """Cria os ResolvedModule das versões pedidas, lendo os metadados de todas de uma vez"""
+        keys = [key for key in keys if key not in self._modules]
+        paths = {key: self._metadata_path(*key) for key in keys}
+        self._load(paths.values())
+        for key in keys:
+            module = ResolvedModule(*key)
+            self._modules[key] = module
+            artifact = select_artifact(self._version_files(*key))
+            if artifact is not None:
+                module.artifact = str(artifact)
+                module.size = artifact.stat().st_size
+            path = paths[key]
+            if path is None:
+                continue
+            raw = self._raw.get(path)
+            if raw is None:
+                module.error = self._errors.get(path)
+                continue
+            module.source = raw["kind"]
+            if raw["kind"] == "module":
+                module.dependencies = [
+                    (group, name, request, strict, tuple(tuple(item) for item in excludes))
+                    for group, name, request, strict, excludes in raw["dependencies"]
+                ]
+                if raw["available_at"]:
+                    # Projeto multiplataforma: a variante Android/JVM é publicada em outro módulo
+                    module.dependencies.append((*raw["available_at"], False, ()))
+                sizes = [size for _, size in raw["files"] if size is not None]
+                if module.size is None and sizes:
+                    module.size = sum(sizes)
+            else:
+                if raw.get("relocation"):
+                    group, name, version = raw["relocation"]
+                    module.dependencies = [(group or key[0], name or key[1], version or key[2], False, ())]
+                else:
+                    module.dependencies = self._effective_pom(raw)
+
+    def resolve(self, roots, constraints=None):
+        """Grafo a partir de `roots` [(grupo, nome, pedido)]; a versão mais nova pedida de cada módulo vence
+
+        `constraints` {(grupo, nome): versão} preenche pedidos sem versão (platform()/BOM).
+        """
+        constraints = dict(constraints or {})
+        roots = [(group, name, request or constraints.get((group, name))) for group, name, request in roots]
+        selected = {}
+        strict = {}
+        for _ in range(MAX_RESOLUTION_PASSES):
+            requests = {}
+            strict = {}
+            edges = {}
+            queue = [(group, name, request, False, None, frozenset()) for group, name, request in roots]
+            # Módulo visitado -> exclusões acumuladas no caminho até ele; chegar por um caminho com menos
+            # exclusões visita de novo (como no Gradle, só fica de fora o que todos os caminhos excluem)
+            visited = {}
+            while queue:
+                # Uma onda por nível: todos os metadados do nível são lidos juntos (em paralelo)
+                level = {}
+                for group, name, request, is_strict, parent, excluded in queue:
+                    if not group or not name:
+                        continue
+                    request = request or constraints.get((group, name))
+                    version = self.select_version(group, name, request) if request else None
+                    items = requests.setdefault((group, name), [])
+                    if (request, version, parent) not in items:
+                        items.append((request, version, parent))
+                    if is_strict and version:
+                        strict.setdefault((group, name), set()).add(version)
+                    chosen = selected.get((group, name), version)
+                    if not chosen:
+                        continue
+                    key = (group, name, chosen)
+                    previous = visited.get(key)
+                    narrowed = excluded if previous is None else previous & excluded
+                    if narrowed != previous:
+                        visited[key] = narrowed
+                        level[key] = True
+                self._build_modules(list(level))
+                queue = []
+                for key in level:
+                    module = self._modules[key]
+                    excluded = visited[key]
+                    # <exclusions> de uma aresta valem para toda a árvore abaixo dela
+                    kept = [dep for dep in module.dependencies if not _is_excluded(dep[0], dep[1], excluded)]
+                    edges[key] = kept
+                    queue.extend((group, name, request, is_strict, key, excluded.union(excludes))
+                                 for group, name, request, is_strict, excludes in kept)
+
+            new_selected = {}
+            for module_key, items in requests.items():
+                versions = [version for _, version, _ in items if version]
+                forced = strict.get(module_key)
+                # Versão estrita (strictly) prevalece sobre pedidos mais novos
+                new_selected[module_key] = newest(list(forced)) if forced else newest(versions)
+            if new_selected == selected:
+                break
+            selected = new_selected
+
+        return DependencyGraph(self, roots, selected, requests, strict, edges)
+
+
+class DependencyGraph:
+    """Resultado da resolução: módulos selecionados, conflitos, duplicatas e tamanho total"""
+
+    def __init__(self, resolver, roots, selected, requests, strict, edges):
+        self.roots = roots
+        self.selected = selected
+        self.requests = requests
+        self.strict = strict
+        self.edges = edges
+        self.modules = [
+            resolver._modules.get((group, name, version)) or ResolvedModule(group, name, version)
+            for (group, name), version in sorted(selected.items()) if version
+        ]
+        self.unversioned = sorted(f"{group}:{name}" for (group, name), version in selected.items() if not version)
+        self.metadata_errors = dict(resolver._errors)
+
+    @property
+    def direct(self):
+        return {(group, name) for group, name, _ in self.roots}
+
+    @property
+    def missing(self):
+        """Módulos sem metadados no cache local (o grafo abaixo deles é desconhecido)"""
+        return [module for module in self.modules if module.source is None]
+
+    @property
+    def total_size(self):
+        return sum(module.size or 0 for module in self.modules)
+
+    def conflicts(self):
+        """[(módulo, versões pedidas, versão escolhida, problema)] para módulos pedidos em mais de uma versão"""
+        found = []
+        for key, items in sorted(self.requests.items()):
+            versions = sorted({version for _, version, _ in items if version}, key=version_key)
+            if len(versions) < 2:
+                continue
+            chosen = self.selected.get(key)
+            problem = None
+            forced = self.strict.get(key)
+            if forced and len(forced) > 1:
+                problem = f"versões estritas incompatíveis: {', '.join(sorted(forced, key=version_key))}"
+            elif forced and compare_versions(chosen, versions[-1]) < 0:
+                problem = f"rebaixado por strictly para {chosen} (pedido até {versions[-1]})"
+            found.append((f"{key[0]}:{key[1]}", versions, chosen, problem))
+        return found
+
+    def duplicates(self, cache=None):
+        """Artefatos idênticos (mesmo conteúdo) publicados sob coordenadas diferentes"""
+        by_content = {}
+        for module in self.modules:
+            if module.artifact is None:
+                continue
+            if cache is not None:
+                digest = cache.digest(module.artifact)
+            else:
+                from artifact_cache import artifact_hash
+                digest = artifact_hash(module.artifact)
+            by_content.setdefault(digest, []).append(f"{module.module}:{module.version}")
+        return sorted(names for names in by_content.values() if len(names) > 1)
+
+    def paths_to(self, group, name):
+        """Quem pede o módulo: [(pedido, versão, pai)]"""
+        return self.requests.get((group, name), [])
+
+
+def direct_dependencies(model, resolver):
+    """Coordenadas diretas empacotadas do modelo Gradle e as versões vindas de platform()/BOMs"""
+    from dex_count import NOT_PACKAGED_PREFIXES
+
+    roots = []
+    constraints = {}
+    for dep in model.dependencies:
+        if dep.kind != "module" or dep.is_test or dep.configuration.startswith(NOT_PACKAGED_PREFIXES):
+            continue
+        version = dep.version if dep.version and "$" not in dep.version else None
+        if dep.platform:
+            if dep.group and version:
+                for key, value in resolver._bom_versions(dep.group, dep.name, version).items():
+                    constraints.setdefault(key, value)
+            continue
+        if dep.group:
+            roots.append((dep.group, dep.name, version))
+    return roots, constraints
+
+
+def resolve_project(model, repository=None, cache=None, workers=None):
+    """Grafo transitivo das dependências empacotadas do módulo app"""
+    resolver = DependencyResolver(repository, cache=cache, workers=workers)
+    roots, constraints = direct_dependencies(model, resolver)
+    return resolver.resolve(roots, constraints)
+
+
+def describe_graph(graph, cache=None):
+    from apk_size import format_size
+
+    transitive = len(graph.modules) - len(graph.direct & set(graph.selected))
+    parts = [f"{len(graph.modules)} módulos ({len(graph.direct)} diretos, {transitive} transitivos)"]
+    conflicts = graph.conflicts()
+    if conflicts:
+        parts.append(f"{len(conflicts)} conflitos de versão resolvidos")
+    duplicates = graph.duplicates(cache)
+    if duplicates:
+        parts.append(f"{len(duplicates)} artefatos duplicados")
+    parts.append(f"{format_size(graph.total_size)} em artefatos")
+    if graph.missing:
+        parts.append(f"{len(graph.missing)} sem metadados no cache local")
+    return ", ".join(parts)
+
+
+def main():
+    import argparse
+    import time
+
+    from apk_size import format_size
+    from artifact_cache import get_artifact_cache
+    from gradle_cache import default_repositories
+    from gradle_model import load_project_models
+    from project_index import DEFAULT_PROJECT_ROOT, get_project_index
+
+    parser = argparse.ArgumentParser(description="Resolve as dependências do app a partir dos caches locais")
+    parser.add_argument("--root", default=str(DEFAULT_PROJECT_ROOT), help="Raiz do projeto Android")
+    parser.add_argument("--repo", action="append", metavar="DIR",
+                        help="Repositório local (layout Maven ou files-2.1 do Gradle); pode repetir. "
+                             "Padrão: caches do Gradle e ~/.m2")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Processos para ler os metadados")
+    parser.add_argument("--no-cache", action="store_true", help="Não usa nem grava o cache de metadados")
+    parser.add_argument("--tree", action="store_true", help="Lista todos os módulos resolvidos")
+    parser.add_argument("--json", action="store_true", help="Imprime o resultado em JSON")
+    args = parser.parse_args()
+
+    index = get_project_index(args.root)
+    _, model = load_project_models(index)
+    if model is None:
+        print("❌ build.gradle do módulo app não encontrado")
+        return 2
+    repository = LocalArtifactRepository(args.repo if args.repo else default_repositories())
+    cache = get_artifact_cache(args.root, enabled=not args.no_cache)
+
+    start = time.perf_counter()
+    graph = resolve_project(model, repository, cache=cache, workers=args.jobs)
+    elapsed = time.perf_counter() - start
+    cache.save()
+
+    conflicts = graph.conflicts()
+    problems = [f"{module}: {problem}" for module, _, _, problem in conflicts if problem]
+    if args.json:
+        json.dump({
+            "modules": [
+                {"module": module.module, "version": module.version, "size": module.size,
+                 "artifact": module.artifact, "metadata": module.source}
+                for module in graph.modules
+            ],
+            "conflicts": [
+                {"module": module, "requested": versions, "selected": chosen, "problem": problem}
+                for module, versions, chosen, problem in conflicts
+            ],
+            "duplicates": graph.duplicates(cache),
+            "missing": [f"{module.module}:{module.version}" for module in graph.missing],
+            "unversioned": graph.unversioned,
+            "total_size": graph.total_size,
+            "elapsed_s": round(elapsed, 6),
+        }, sys.stdout, indent=2)
+        print()
+        return 1 if problems else 0
+
+    print(f"📦 {describe_graph(graph, cache)} em {elapsed * 1000:.0f} ms")
+    if args.tree:
+        for module in graph.modules:
+            size = format_size(module.size) if module.size is not None else "-"
+            marker = "" if module.source else "  (sem metadados no cache local)"
+            print(f"  {module.module}:{module.version}  {size}{marker}")
+    if conflicts:
+        print("⚖️  Conflitos de versão (a mais nova vence):")
+        for module, versions, chosen, problem in conflicts:
+            print(f"  • {module}: {', '.join(versions)} → {chosen}" + (f"  ❌ {problem}" if problem else ""))
+    for names in graph.duplicates(cache):
+        print(f"  ⚠️  Mesmo artefato em: {', '.join(names)}")
+    if graph.unversioned:
+        print(f"  ⚠️  Sem versão resolvida: {', '.join(graph.unversioned)}")
+    if graph.metadata_errors:
+        for path, error in sorted(graph.metadata_errors.items())[:5]:
+            print(f"  ⚠️  {Path(path).name}: {error}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
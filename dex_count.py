@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Contagem de referências de métodos para o limite de 64K do DEX
+Lê o cabeçalho de arquivos .dex (method_ids_size) e o constant pool de arquivos .class,
+dentro de jars e AARs mapeados em memória, sem extrair nada
+"""
+
+import base64
+import hashlib
+import os
+import struct
+import zlib
+from pathlib import Path
+
+from zip_reader import BadZipError, MappedZip
+
+# Um DEX endereça métodos com índices de 16 bits
+DEX_METHOD_LIMIT = 65536
+
+# Tipo de análise no cache de artefatos
+ARTIFACT_KIND = "dex_methods-2"
+
+# Abaixo disso o custo de subir processos supera o ganho
+MIN_ARTIFACTS_FOR_POOL = 8
+
+# Configurações cujas dependências não entram no DEX
+NOT_PACKAGED_PREFIXES = ("compileOnly", "kapt", "ksp", "annotationProcessor", "lintChecks", "lintPublish")
+
+_DEX_MAGIC = b"dex\n"
+_DEX_HEADER_SIZE = 0x70
+_DEX_METHOD_IDS_SIZE = 0x58
+_CLASS_MAGIC = b"\xca\xfe\xba\xbe"
+
+# Tamanho (após a tag) das entradas de tamanho fixo do constant pool
+_CONSTANT_SIZES = {3: 4, 4: 4, 5: 8, 6: 8, 7: 2, 8: 2, 9: 4, 10: 4, 11: 4, 12: 4, 15: 3, 16: 2, 17: 4, 18: 4, 19: 2, 20: 2}
+_CONSTANT_UTF8 = 1
+_CONSTANT_CLASS = 7
+_CONSTANT_METHODREF = 10
+_CONSTANT_INTERFACE_METHODREF = 11
+_CONSTANT_NAME_AND_TYPE = 12
+
+_U2 = struct.Struct(">H").unpack_from
+_U2U2 = struct.Struct(">HH").unpack_from
+_U4 = struct.Struct(">I").unpack_from
+# method_ids_size (0x58), method_ids_off (ignorado) e class_defs_size (0x60)
+_DEX_COUNTS = struct.Struct("<I4xI").unpack_from
+
+
+def dex_header_counts(header):
+    """(method_ids_size, class_defs_size) do cabeçalho de um .dex (bastam os primeiros 0x70 bytes)"""
+    if len(header) < _DEX_HEADER_SIZE or bytes(header[:4]) != _DEX_MAGIC:
+        raise ValueError("Cabeçalho DEX inválido")
+    method_ids, class_defs = _DEX_COUNTS(header, _DEX_METHOD_IDS_SIZE)
+    return method_ids, class_defs
+
+
+def class_method_refs(data, refs):
+    """Adiciona a `refs` os métodos declarados e referenciados por um .class, como (classe, nome, descritor)"""
+    data = bytes(data)
+    if data[:4] != _CLASS_MAGIC:
+        raise ValueError("Arquivo .class inválido")
+    count = _U2(data, 8)[0]
+    utf8 = {}
+    classes = {}
+    name_and_types = {}
+    method_refs = []
+    pos = 10
+    i = 1
+    while i < count:
+        tag = data[pos]
+        if tag == _CONSTANT_UTF8:
+            length = _U2(data, pos + 1)[0]
+            utf8[i] = data[pos + 3:pos + 3 + length]
+            pos += 3 + length
+        elif tag == _CONSTANT_CLASS:
+            classes[i] = _U2(data, pos + 1)[0]
+            pos += 3
+        elif tag == _CONSTANT_NAME_AND_TYPE:
+            name_and_types[i] = _U2U2(data, pos + 1)
+            pos += 5
+        elif tag == _CONSTANT_METHODREF or tag == _CONSTANT_INTERFACE_METHODREF:
+            method_refs.append(_U2U2(data, pos + 1))
+            pos += 5
+        else:
+            pos += 1 + _CONSTANT_SIZES[tag]
+            if tag == 5 or tag == 6:
+                i += 1  # long e double ocupam duas posições
+        i += 1
+
+    for class_index, nat_index in method_refs:
+        name_index, descriptor_index = name_and_types[nat_index]
+        refs.add((utf8[classes[class_index]], utf8[name_index], utf8[descriptor_index]))
+
+    # access_flags, this_class, super_class e interfaces
+    this_class = utf8[classes[_U2(data, pos + 2)[0]]]
+    pos += 8 + 2 * _U2(data, pos + 6)[0]
+    # Campos: só pular (3 u2 + atributos)
+    fields = _U2(data, pos)[0]
+    pos += 2
+    for _ in range(fields):
+        pos = _skip_attributes(data, pos + 6)
+    # Métodos declarados também ocupam um method_id
+    methods = _U2(data, pos)[0]
+    pos += 2
+    for _ in range(methods):
+        name_index, descriptor_index = _U2U2(data, pos + 2)
+        refs.add((this_class, utf8[name_index], utf8[descriptor_index]))
+        pos = _skip_attributes(data, pos + 6)
+
+
+def ref_hashes(refs):
+    """Hashes de 64 bits das referências (classe, nome, descritor), comparáveis entre artefatos e processos"""
+    return {
+        int.from_bytes(hashlib.blake2b(b"%s.%s:%s" % ref, digest_size=8).digest(), "little")
+        for ref in refs
+    }
+
+
+def pack_refs(hashes):
+    """Hashes em base64 (formato guardado no cache de artefatos)"""
+    hashes = sorted(hashes)
+    return base64.b64encode(struct.pack(f"<{len(hashes)}Q", *hashes)).decode("ascii")
+
+
+def unpack_refs(text):
+    data = base64.b64decode(text)
+    return set(struct.unpack(f"<{len(data) // 8}Q", data))
+
+
+def _skip_attributes(data, pos):
+    # pos aponta para attributes_count
+    count = _U2(data, pos)[0]
+    pos += 2
+    for _ in range(count):
+        pos += 6 + _U4(data, pos + 2)[0]
+    return pos
+
+
+def _count_zip(view, refs, totals):
+    for info in view.entries:
+        name = info.name
+        if name.endswith(".class"):
+            # module-info e versões alternativas de jars multi-release não viram classes no DEX
+            if name.endswith("module-info.class") or name.startswith("META-INF/"):
+                continue
+            class_method_refs(view.read(info), refs)
+            totals["classes"] += 1
+        elif name.endswith(".dex"):
+            method_ids, class_defs = dex_header_counts(view.read(info, _DEX_HEADER_SIZE))
+            totals["dex_methods"] += method_ids
+            totals["classes"] += class_defs
+        elif name.endswith(".jar") and (name == "classes.jar" or name.startswith("libs/")):
+            # Jars dentro do AAR: armazenados viram uma fatia do mapeamento, comprimidos são inflados
+            _count_zip(view.open_nested(info), refs, totals)
+
+
+def count_artifact_methods(path):
+    """Métodos de um jar, aar, apk ou .dex: {"methods", "classes", "refs", "dex_methods"}
+
+    "refs" são os hashes (pack_refs) das referências vindas de .class, para somar artefatos sem contar
+    duas vezes o mesmo método; "dex_methods" vêm de .dex já prontos, dos quais só se lê o total.
+    """
+    path = str(path)
+    totals = {"classes": 0, "dex_methods": 0}
+    refs = set()
+    if path.endswith(".dex"):
+        with open(path, "rb") as f:
+            method_ids, class_defs = dex_header_counts(f.read(_DEX_HEADER_SIZE))
+        return {"methods": method_ids, "classes": class_defs, "refs": "", "dex_methods": method_ids}
+    error = None
+    with MappedZip(path) as view:
+        try:
+            _count_zip(view, refs, totals)
+        except (ValueError, KeyError, IndexError, struct.error, zlib.error) as e:
+            # Tratado antes de fechar o mapeamento: o traceback prende fatias das entradas armazenadas
+            # (ex.: classes.jar de um AAR), e fechar com elas vivas é um BufferError
+            error = f"{type(e).__name__}: {e}"
+    if error is not None:
+        raise BadZipError(error)
+    return {
+        "methods": len(refs) + totals["dex_methods"],
+        "classes": totals["classes"],
+        "refs": pack_refs(ref_hashes(refs)),
+        "dex_methods": totals["dex_methods"],
+    }
+
+
+def _count_artifacts_chunk(paths):
+    # Executado nos processos do pool
+    results = []
+    for path in paths:
+        try:
+            results.append((path, count_artifact_methods(path), None))
+        except (OSError, ValueError, KeyError, IndexError, struct.error, zlib.error, BufferError) as e:
+            results.append((path, None, str(e)))
+    return results
+
+
+def count_artifacts(paths, cache=None, workers=None):
+    """{caminho: resultado} e {caminho: erro}; artefatos já vistos (mesmo hash) vêm do cache"""
+    results = {}
+    errors = {}
+    pending = []
+    for path in paths:
+        cached = cache.get(path, ARTIFACT_KIND) if cache is not None else None
+        if cached is not None:
+            results[path] = cached
+        else:
+            pending.append(path)
+
+    workers = max(1, workers or os.cpu_count() or 1)
+    if workers == 1 or len(pending) < MIN_ARTIFACTS_FOR_POOL:
+        computed = _count_artifacts_chunk(pending)
+    else:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # forkserver evita herdar locks das threads do agendador de etapas
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else None)
+        # Um artefato por tarefa: os tamanhos variam muito (de kB a dezenas de MB)
+        computed = []
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            for chunk_results in pool.map(_count_artifacts_chunk, [[path] for path in pending]):
+                computed.extend(chunk_results)
+
+    for path, result, error in computed:
+        if error is not None:
+            errors[path] = error
+            continue
+        if cache is not None:
+            cache.misses += 1
+            cache.put(path, ARTIFACT_KIND, result)
+        results[path] = result
+    return results, errors
+
+
+def count_class_tree(directory):
+    """Árvore de .class compilados (saída do kotlinc/javac): {"refs": hashes, "classes", "errors": {caminho: erro}}"""
+    refs = set()
+    classes = 0
+    errors = {}
+    for dirpath, _, filenames in os.walk(directory):
+        for filename in filenames:
+            if filename.endswith(".class") and filename != "module-info.class":
+                path = os.path.join(dirpath, filename)
+                file_refs = set()
+                try:
+                    with open(path, "rb") as f:
+                        class_method_refs(f.read(), file_refs)
+                except (OSError, ValueError, KeyError, IndexError, struct.error) as e:
+                    errors[path] = str(e)
+                    continue
+                refs |= file_refs
+                classes += 1
+    return {"refs": ref_hashes(refs), "classes": classes, "errors": errors}
+
+
+def compiled_app_outputs(module_dir, variant="debug"):
+    """Saídas de compilação do módulo, se já houve um build real: {"classes": [dirs], "dex": [arquivos]}"""
+    build_dir = Path(module_dir) / "build"
+    class_dirs = [
+        build_dir / "tmp" / "kotlin-classes" / variant,
+        *sorted((build_dir / "intermediates" / "javac" / variant).glob("*/classes")),
+        build_dir / "intermediates" / "javac" / variant / "classes",
+    ]
+    dex_files = sorted((build_dir / "intermediates" / "dex" / variant).glob("**/*.dex"))
+    return {"classes": [d for d in class_dirs if d.is_dir()], "dex": dex_files}
+
+
+def packaged_dependencies(model):
+    """Dependências de módulo com versão conhecida que entram no APK"""
+    deps = []
+    for dep in model.dependencies:
+        if dep.kind != "module" or dep.is_test or dep.platform:
+            continue
+        if dep.configuration.startswith(NOT_PACKAGED_PREFIXES):
+            continue
+        if not dep.group or not dep.version or "$" in dep.version:
+            continue
+        deps.append(dep)
+    return deps
+
+
+def library_method_counts(graph, cache=None, workers=None, app_refs=()):
+    """Conta os métodos dos módulos do grafo transitivo (dependency_resolver) encontrados no cache local
+
+    Retorna {"methods", "artifacts", "shared", "missing": [módulos], "errors": {caminho: erro}}.
+    "methods" são os que as bibliotecas acrescentam ao DEX: como os method_ids são únicos no DEX
+    inteiro, uma referência presente em vários artefatos ou já em `app_refs` (hashes de ref_hashes)
+    conta uma vez; "shared" é quanto a soma por artefato excederia isso. Módulos sem metadados
+    locais são "missing"; os que têm metadados mas nenhum artefato (BOMs, a raiz de um projeto
+    multiplataforma) não entram no DEX.
+    """
+    artifacts = {}
+    missing = []
+    for module in graph.modules:
+        if module.artifact is not None:
+            artifacts[module.artifact] = module
+        elif module.source is None:
+            missing.append(f"{module.module}:{module.version}")
+    results, errors = count_artifacts(sorted(artifacts), cache=cache, workers=workers)
+    app_refs = set(app_refs)
+    refs = set(app_refs)
+    dex_methods = 0
+    for result in results.values():
+        refs |= unpack_refs(result["refs"])
+        dex_methods += result["dex_methods"]
+    methods = len(refs) - len(app_refs) + dex_methods
+    return {
+        "methods": methods,
+        "artifacts": len(results),
+        "shared": sum(result["methods"] for result in results.values()) - methods,
+        "missing": missing,
+        "errors": errors,
+    }
+
+
+def describe_artifact_errors(errors, limit=3):
+    items = [f"{Path(path).name} ({error})" for path, error in sorted(errors.items())[:limit]]
+    if len(errors) > limit:
+        items.append(f"e mais {len(errors) - limit}")
+    return ", ".join(items)
+
@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+Custo de desenhar os drawables de res/drawable* e res/mipmap* do Email Assistant
+Vetores: tamanho do pathData, número de comandos, viewport e aninhamento de <group>
+Imagens: dimensões lidas só do cabeçalho (PNG, JPEG, WebP, GIF), sem decodificar, e bytes por densidade
+"""
+
+import io
+import json
+import re
+import struct
+import sys
+import threading
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from resource_index import res_location
+
+ANDROID_NS = "http://schemas.android.com/apk/res/android"
+
+# Limites padrão: pathData longo e vetores grandes são os do lint (VectorPath e VectorRaster: o vetor
+# vira um bitmap do tamanho em dp); imagens maiores que uma tela ou que decodificam em bitmaps enormes
+DEFAULT_THRESHOLDS = {
+    "max_path_length": 800,
+    "max_vector_dp": 200,
+    "max_commands": 1000,
+    "max_group_depth": 5,
+    "max_image_dp": 600,
+    "max_bitmap_kb": 4096,
+}
+# Limites versionados com o projeto: {"max_path_length", ..., "drawables": {nome: {...}}}
+BUDGET_FILE = "drawable-budget.json"
+
+# Fator de escala de cada densidade em relação a mdpi (sem qualificador, o Android assume mdpi)
+DENSITY_FACTORS = {
+    "ldpi": 0.75, "mdpi": 1.0, "tvdpi": 1.33, "hdpi": 1.5,
+    "xhdpi": 2.0, "xxhdpi": 3.0, "xxxhdpi": 4.0,
+}
+# Densidades que o Android não redimensiona
+UNSCALED_DENSITIES = {"nodpi", "anydpi"}
+# Maior densidade de aparelho: a memória de um bitmap é medida depois do redimensionamento para ela
+MAX_DEVICE_FACTOR = DENSITY_FACTORS["xxxhdpi"]
+# Tolerância entre o tamanho em dp das cópias de uma mesma imagem em densidades diferentes
+DENSITY_TOLERANCE = 0.1
+
+DRAWABLE_TYPES = {"drawable", "mipmap"}
+_PATH_COMMAND = re.compile(r"[MmLlHhVvCcSsQqTtAaZz]")
+_DIMENSION = re.compile(r"\s*([\d.]+)\s*(dp|dip|px)?\s*$")
+
+
+def _android(name):
+    return f"{{{ANDROID_NS}}}{name}"
+
+
+def _dimension(value):
+    """'24dp' -> 24.0; referências (@dimen/...) e unidades desconhecidas -> None"""
+    m = _DIMENSION.match(value or "")
+    if m is None:
+        return None
+    try:
+        return float(m.group(1))
+    except ValueError:
+        return None
+
+
+def scan_vector_drawable(data):
+    """Métricas de um drawable XML; só <vector> tem paths (os demais registram apenas a tag raiz)"""
+    facts = {
+        "root": None, "width": None, "height": None, "viewport": None, "paths": 0, "path_chars": 0,
+        "max_path_chars": 0, "commands": 0, "group_depth": 0, "path_refs": 0, "error": None,
+    }
+    try:
+        groups = 0
+        for event, elem in ET.iterparse(io.BytesIO(data), events=("start", "end")):
+            tag = elem.tag if isinstance(elem.tag, str) else ""
+            if event == "end":
+                if tag == "group":
+                    groups -= 1
+                elem.clear()
+                continue
+            if facts["root"] is None:
+                facts["root"] = tag
+                if tag != "vector":
+                    break
+                facts["width"] = _dimension(elem.get(_android("width")))
+                facts["height"] = _dimension(elem.get(_android("height")))
+                viewport = (_dimension(elem.get(_android("viewportWidth"))),
+                            _dimension(elem.get(_android("viewportHeight"))))
+                facts["viewport"] = list(viewport) if None not in viewport else None
+            elif tag == "group":
+                groups += 1
+                facts["group_depth"] = max(facts["group_depth"], groups)
+            elif tag in ("path", "clip-path"):
+                path_data = elem.get(_android("pathData")) or ""
+                facts["paths"] += 1
+                if path_data.startswith("@"):
+                    # @string/...: o tamanho real não aparece no arquivo
+                    facts["path_refs"] += 1
+                    continue
+                facts["path_chars"] += len(path_data)
+                facts["max_path_chars"] = max(facts["max_path_chars"], len(path_data))
+                facts["commands"] += len(_PATH_COMMAND.findall(path_data))
+    except ET.ParseError as e:
+        facts["error"] = str(e)
+    return facts
+
+
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def _jpeg_size(data):
+    position = 2
+    while position + 9 <= len(data):
+        if data[position] != 0xFF:
+            return None
+        marker = data[position + 1]
+        if marker == 0xFF:
+            position += 1  # bytes de preenchimento
+            continue
+        if marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7:
+            position += 2
+            continue
+        if marker in _JPEG_SOF:
+            height, width = struct.unpack(">HH", data[position + 5:position + 9])
+            return width, height
+        if marker == 0xD9:
+            return None
+        position += 2 + struct.unpack(">H", data[position + 2:position + 4])[0]
+    return None
+
+
+def _webp_size(data):
+    chunk = data[12:16]
+    if chunk == b"VP8 " and len(data) >= 30:
+        width, height = struct.unpack("<HH", data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and len(data) >= 25:
+        bits = int.from_bytes(data[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X" and len(data) >= 30:
+        return int.from_bytes(data[24:27], "little") + 1, int.from_bytes(data[27:30], "little") + 1
+    return None
+
+
+def scan_image_header(data):
+    """Formato e dimensões em pixels a partir do cabeçalho: {"format", "width", "height", "error"}"""
+    image_format = size = None
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        image_format = "png"
+        size = struct.unpack(">II", data[16:24]) if data[12:16] == b"IHDR" and len(data) >= 24 else None
+    elif data[:3] == b"\xff\xd8\xff":
+        image_format = "jpeg"
+        size = _jpeg_size(data)
+    elif data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        image_format = "webp"
+        size = _webp_size(data)
+    elif data[:6] in (b"GIF87a", b"GIF89a"):
+        image_format = "gif"
+        size = struct.unpack("<HH", data[6:10]) if len(data) >= 10 else None
+
+    if image_format is None:
+        return {"format": None, "width": None, "height": None, "error": "formato de imagem não reconhecido"}
+    if size is None:
+        return {"format": image_format, "width": None, "height": None, "error": "cabeçalho truncado"}
+    return {"format": image_format, "width": size[0], "height": size[1], "error": None}
+
+
+def density_of(qualifier):
+    """Densidade do qualificador ('night-xxhdpi' -> 'xxhdpi'); sem densidade -> None (tratado como mdpi)"""
+    for part in qualifier.split("-") if qualifier else ():
+        if part in DENSITY_FACTORS or part in UNSCALED_DENSITIES:
+            return part
+    return None
+
+
+class VectorCost:
+    """Métricas de um drawable vetorial"""
+
+    def __init__(self, name, rel, facts):
+        self.name = name
+        self.rel = rel
+        self.width = facts["width"]
+        self.height = facts["height"]
+        self.viewport = facts["viewport"]
+        self.paths = facts["paths"]
+        self.path_chars = facts["path_chars"]
+        self.max_path_chars = facts["max_path_chars"]
+        self.commands = facts["commands"]
+        self.group_depth = facts["group_depth"]
+        self.path_refs = facts["path_refs"]
+
+    @property
+    def size_dp(self):
+        return max(self.width or 0, self.height or 0)
+
+    def to_dict(self):
+        return {
+            "file": self.rel,
+            "kind": "vector",
+            "width_dp": self.width,
+            "height_dp": self.height,
+            "viewport": self.viewport,
+            "paths": self.paths,
+            "path_chars": self.path_chars,
+            "max_path_chars": self.max_path_chars,
+            "commands": self.commands,
+            "group_depth": self.group_depth,
+        }
+
+
+class RasterAsset:
+    """Dimensões de uma imagem e o que ela ocupa depois de decodificada"""
+
+    def __init__(self, name, rel, density, size, facts):
+        self.name = name
+        self.rel = rel
+        self.density = density
+        self.bytes = size
+        self.format = facts["format"]
+        self.width = facts["width"]
+        self.height = facts["height"]
+        self.nine_patch = rel.endswith(".9.png")
+
+    @property
+    def scale(self):
+        """Quanto o Android amplia a imagem no aparelho de maior densidade"""
+        if self.density in UNSCALED_DENSITIES:
+            return 1.0
+        return MAX_DEVICE_FACTOR / DENSITY_FACTORS.get(self.density or "mdpi")
+
+    @property
+    def size_dp(self):
+        """Maior lado em dp (nodpi: em pixels)"""
+        factor = DENSITY_FACTORS.get(self.density or "mdpi", 1.0)
+        # A borda de 1px de um 9-patch não é desenhada
+        border = 2 if self.nine_patch else 0
+        return max(self.width - border, self.height - border) / factor
+
+    @property
+    def bitmap_bytes(self):
+        """Bytes do bitmap ARGB_8888 decodificado no aparelho de maior densidade"""
+        return int(self.width * self.scale) * int(self.height * self.scale) * 4
+
+    def to_dict(self):
+        return {
+            "file": self.rel,
+            "kind": self.format,
+            "density": self.density or "mdpi",
+            "width": self.width,
+            "height": self.height,
+            "bytes": self.bytes,
+            "size_dp": round(self.size_dp, 1),
+            "bitmap_kb": self.bitmap_bytes // 1024,
+        }
+
+
+class DrawableAnalyzer:
+    """Drawables do projeto por nome ('drawable/ic_mic_active', 'mipmap/ic_launcher[xxhdpi]')"""
+
+    def __init__(self):
+        self.vectors = {}  # nome -> VectorCost
+        self.rasters = {}  # nome -> RasterAsset
+        self.other_xml = 0  # shape, selector, layer-list... (sem custo de path)
+        self.errors = {}
+
+    @staticmethod
+    def _key(resource_type, qualifier, name):
+        key = f"{resource_type}/{name}"
+        return f"{key}[{qualifier}]" if qualifier else key
+
+    def add_xml(self, rel, resource_type, qualifier, name, facts):
+        if facts["error"]:
+            self.errors[rel] = facts["error"]
+            return
+        if facts["root"] != "vector":
+            self.other_xml += 1
+            return
+        key = self._key(resource_type, qualifier, name)
+        # O primeiro em ordem de caminho vence (src/main antes de src/release)
+        self.vectors.setdefault(key, VectorCost(key, rel, facts))
+
+    def add_image(self, entry, resource_type, qualifier, name, facts):
+        if facts["error"]:
+            self.errors[entry.rel] = facts["error"]
+            return
+        key = self._key(resource_type, qualifier, name)
+        self.rasters.setdefault(key, RasterAsset(key, entry.rel, density_of(qualifier), entry.size, facts))
+
+    def densities(self):
+        """Imagens, bytes no APK e pixels por densidade"""
+        totals = {}
+        for asset in self.rasters.values():
+            bucket = totals.setdefault(asset.density or "mdpi", {"images": 0, "bytes": 0, "pixels": 0})
+            bucket["images"] += 1
+            bucket["bytes"] += asset.bytes
+            bucket["pixels"] += asset.width * asset.height
+        return dict(sorted(totals.items(), key=lambda item: DENSITY_FACTORS.get(item[0], 0)))
+
+    def inconsistent_densities(self):
+        """Imagens cujas cópias em outras densidades não têm o mesmo tamanho em dp: [(nome, {densidade: dp})]"""
+        variants = {}
+        for asset in self.rasters.values():
+            if asset.density in UNSCALED_DENSITIES:
+                continue
+            base = asset.name.split("[", 1)[0]
+            variants.setdefault(base, {})[asset.density or "mdpi"] = asset.size_dp
+        found = []
+        for base, sizes in sorted(variants.items()):
+            if len(sizes) < 2:
+                continue
+            smallest, largest = min(sizes.values()), max(sizes.values())
+            if largest > smallest * (1 + DENSITY_TOLERANCE):
+                found.append((base, sizes))
+        return found
+
+    def to_dict(self):
+        assets = {name: cost.to_dict() for name, cost in self.vectors.items()}
+        assets.update({name: asset.to_dict() for name, asset in self.rasters.items()})
+        return {"densities": self.densities(), "assets": dict(sorted(assets.items()))}
+
+
+def build_drawable_analyzer(index, cache):
+    analyzer = DrawableAnalyzer()
+    entries = index.files("xml") + index.files("image")
+    for entry in sorted(entries, key=lambda entry: entry.rel):
+        location = res_location(entry.rel)
+        if location is None or location[0] not in DRAWABLE_TYPES:
+            continue
+        resource_type, qualifier, name = location
+        if entry.bucket == "xml":
+            analyzer.add_xml(entry.rel, resource_type, qualifier, name, cache.facts(entry, "vector", index))
+        else:
+            analyzer.add_image(entry, resource_type, qualifier, name, cache.facts(entry, "image", index))
+    return analyzer
+
+
+_analyzers = {}
+_analyzers_lock = threading.Lock()
+
+
+def get_drawable_analyzer(index, cache):
+    """Drawables compartilhados pelas etapas (refeitos quando o índice de arquivos muda)"""
+    root = str(index.project_root)
+    with _analyzers_lock:
+        generation, analyzer = _analyzers.get(root, (None, None))
+        if analyzer is None or generation != index.generation:
+            analyzer = build_drawable_analyzer(index, cache)
+            _analyzers[root] = (index.generation, analyzer)
+        return analyzer
+
+
+def parse_budget(data):
+    """Limites de drawable-budget.json sobre os padrões"""
+    budget = json.loads(data)
+    known = set(DEFAULT_THRESHOLDS) | {"drawables"}
+    unknown = set(budget) - known
+    for overrides in budget.get("drawables", {}).values():
+        unknown |= set(overrides) - set(DEFAULT_THRESHOLDS)
+    if unknown:
+        raise ValueError(f"Chaves desconhecidas no orçamento de drawables: {', '.join(sorted(unknown))}")
+    return budget
+
+
+def load_budget(path):
+    with open(path, "rb") as f:
+        return parse_budget(f.read())
+
+
+def thresholds_for(name, budget):
+    """Limites de um drawable; sobrescritas valem pelo nome do recurso ('ic_mic_active') ou pela chave completa"""
+    limits = dict(DEFAULT_THRESHOLDS)
+    limits.update({key: value for key, value in budget.items() if key in DEFAULT_THRESHOLDS})
+    base = name.split("[", 1)[0]
+    overrides = budget.get("drawables", {})
+    limits.update(overrides.get(base.rpartition("/")[2], {}))
+    limits.update(overrides.get(base, {}))
+    limits.update(overrides.get(name, {}))
+    return limits
+
+
+def check_thresholds(analyzer, budget):
+    """Drawables caros de desenhar ou grandes demais para a densidade: [mensagem]"""
+    violations = []
+    for name, cost in analyzer.vectors.items():
+        limits = thresholds_for(name, budget)
+        if cost.max_path_chars > limits["max_path_length"]:
+            violations.append(f"{name}: pathData com {cost.max_path_chars} caracteres > {limits['max_path_length']}")
+        if cost.commands > limits["max_commands"]:
+            violations.append(f"{name}: {cost.commands} comandos de path > {limits['max_commands']}")
+        if cost.group_depth > limits["max_group_depth"]:
+            violations.append(f"{name}: {cost.group_depth} níveis de <group> > {limits['max_group_depth']}")
+        if cost.size_dp > limits["max_vector_dp"]:
+            violations.append(f"{name}: vetor de {cost.size_dp:g}dp > {limits['max_vector_dp']}dp")
+    for name, asset in analyzer.rasters.items():
+        limits = thresholds_for(name, budget)
+        if asset.size_dp > limits["max_image_dp"]:
+            violations.append(f"{name}: {asset.width}x{asset.height}px em {asset.density or 'mdpi'} "
+                              f"({asset.size_dp:.0f}dp) > {limits['max_image_dp']}dp")
+        if asset.bitmap_bytes > limits["max_bitmap_kb"] * 1024:
+            violations.append(f"{name}: bitmap de {asset.bitmap_bytes // 1024} KB em xxxhdpi "
+                              f"> {limits['max_bitmap_kb']} KB")
+    return violations
+
+
+def describe_warnings(analyzer, limit=5):
+    """Avisos que não falham o build: imagens sem densidade e cópias com tamanhos diferentes entre densidades"""
+    items = []
+    unqualified = sorted(name for name, asset in analyzer.rasters.items() if asset.density is None)
+    if unqualified:
+        items.append(f"{len(unqualified)} imagem(ns) sem densidade, ampliada(s) em telas densas "
+                     f"({', '.join(unqualified[:limit])}{', ...' if len(unqualified) > limit else ''})")
+    for base, sizes in analyzer.inconsistent_densities()[:limit]:
+        described = ", ".join(f"{density} {size:.0f}dp" for density, size in sizes.items())
+        items.append(f"{base} com tamanhos diferentes por densidade ({described})")
+    unmeasured = sum(1 for cost in analyzer.vectors.values() if cost.path_refs)
+    if unmeasured:
+        items.append(f"{unmeasured} vetor(es) com pathData em @string (não medido)")
+    return "; ".join(items)
+
+
+def main():
+    import argparse
+
+    from check_cache import get_check_cache
+    from project_index import DEFAULT_PROJECT_ROOT, get_project_index
+
+    parser = argparse.ArgumentParser(description="Custo de desenhar os drawables e imagens do projeto")
+    parser.add_argument("--root", default=str(DEFAULT_PROJECT_ROOT), help="Raiz do projeto Android")
+    parser.add_argument("--budget", help=f"Limites em JSON (padrão: {BUDGET_FILE} na raiz, se existir)")
+    parser.add_argument("--top", type=int, default=20, help="Quantos vetores e imagens mostrar, do mais caro ao mais barato")
+    parser.add_argument("--no-cache", action="store_true", help="Não usa nem grava o cache de verificações")
+    parser.add_argument("--json", action="store_true", help="Imprime as métricas de todos os drawables em JSON")
+    args = parser.parse_args()
+
+    budget_file = Path(args.budget) if args.budget else Path(args.root) / BUDGET_FILE
+    try:
+        budget = load_budget(budget_file) if args.budget or budget_file.exists() else {}
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 2
+
+    index = get_project_index(args.root)
+    cache = get_check_cache(args.root, enabled=not args.no_cache)
+    analyzer = get_drawable_analyzer(index, cache)
+    cache.save()
+    violations = check_thresholds(analyzer, budget)
+
+    if args.json:
+        report = analyzer.to_dict()
+        report.update({"violations": violations, "errors": analyzer.errors})
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        vectors = sorted(analyzer.vectors.values(), key=lambda cost: (-cost.commands, cost.name))
+        print(f"🎨 {len(vectors)} vetores, {len(analyzer.rasters)} imagens, {analyzer.other_xml} outros drawables XML")
+        if vectors:
+            print(f"  {'vetor':<44} {'dp':>9} {'viewport':>11} {'paths':>6} {'comandos':>9} {'maior path':>11} {'grupos':>7}")
+            for cost in vectors[:args.top]:
+                size = f"{cost.width or 0:g}x{cost.height or 0:g}"
+                viewport = f"{cost.viewport[0]:g}x{cost.viewport[1]:g}" if cost.viewport else "-"
+                print(f"  {cost.name:<44} {size:>9} {viewport:>11} {cost.paths:>6} {cost.commands:>9} "
+                      f"{cost.max_path_chars:>11} {cost.group_depth:>7}")
+            if len(vectors) > args.top:
+                print(f"  ... e mais {len(vectors) - args.top}")
+        rasters = sorted(analyzer.rasters.values(), key=lambda asset: (-asset.bitmap_bytes, asset.name))
+        if rasters:
+            print(f"  {'imagem':<44} {'pixels':>11} {'dp':>7} {'KB':>8} {'bitmap KB':>10}")
+            for asset in rasters[:args.top]:
+                print(f"  {asset.name:<44} {f'{asset.width}x{asset.height}':>11} {asset.size_dp:>7.0f} "
+                      f"{asset.bytes / 1024:>8.1f} {asset.bitmap_bytes // 1024:>10}")
+            if len(rasters) > args.top:
+                print(f"  ... e mais {len(rasters) - args.top}")
+            print("  Por densidade:")
+            for density, totals in analyzer.densities().items():
+                print(f"    {density:<8} {totals['images']:>5} imagens {totals['bytes'] / 1024:>10.1f} KB "
+                      f"{totals['pixels']:>12} pixels")
+        warnings = describe_warnings(analyzer, limit=args.top)
+        if warnings:
+            print(f"⚠️  {warnings}")
+        for violation in violations:
+            print(f"❌ {violation}")
+        for rel, error in sorted(analyzer.errors.items()):
+            print(f"❌ {rel}: {error}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Verificações por arquivo usadas pelos scripts de teste do Email Assistant
+Cada analisador recebe o conteúdo bruto do arquivo e devolve um dicionário serializável em JSON
+"""
+
+from importlib import import_module
+
+# Módulo e função de cada analisador; o módulo só é importado quando o tipo é usado pela primeira vez
+ANALYZERS = {
+    "kotlin": ("kotlin_lexer", "analyze_kotlin"),
+    "xml": ("xml_validator", "validate_xml_bytes"),
+    "resources": ("resource_index", "scan_resource_xml"),
+    "strings": ("translation_coverage", "scan_string_resources"),
+    "layout": ("layout_analysis", "scan_layout"),
+    "vector": ("drawable_analysis", "scan_vector_drawable"),
+    "image": ("drawable_analysis", "scan_image_header"),
+}
+
+_resolved = {}
+
+
+def get_analyzer(kind):
+    """Função analisadora de `kind`, importando o módulo dela na primeira chamada"""
+    analyzer = _resolved.get(kind)
+    if analyzer is None:
+        module, name = ANALYZERS[kind]
+        analyzer = _resolved[kind] = getattr(import_module(module), name)
+    return analyzer
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Fonte de arquivos a partir do banco de objetos do git, sem checkout
+A árvore vem de `git ls-tree` e o conteúdo de um único processo `git cat-file --batch` persistente;
+no modo diff só os blobs alterados entre dois commits passam pelas verificações por arquivo
+"""
+
+import subprocess
+import threading
+from pathlib import Path
+
+from project_index import MODULE_MARKERS, FileEntry, ProjectIndex, bucket_for, is_skipped_path, set_project_index
+
+
+class GitError(RuntimeError):
+    pass
+
+
+def _git(repo, *args):
+    result = subprocess.run(["git", "-C", str(repo), *args], capture_output=True)
+    if result.returncode != 0:
+        raise GitError(result.stderr.decode("utf-8", "replace").strip() or f"git {args[0]} falhou")
+    return result.stdout
+
+
+def tree_spec(revision, subdir=""):
+    """'<rev>:<subdir>': a árvore do projeto dentro do commit (a raiz quando subdir é vazio)"""
+    return f"{revision}:{subdir.strip('/')}"
+
+
+def split_revision(spec):
+    """'HEAD' -> ('HEAD', ''); 'HEAD:apps/email' -> ('HEAD', 'apps/email')"""
+    revision, _, subdir = spec.partition(":")
+    return revision or "HEAD", subdir.strip("/")
+
+
+class GitObjectReader:
+    """Lê blobs por um `git cat-file --batch` que fica aberto (uma ida e volta por blob, sem novo processo)"""
+
+    def __init__(self, repo):
+        self.repo = Path(repo)
+        self._process = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        self._process = subprocess.Popen(
+            ["git", "-C", str(self.repo), "cat-file", "--batch"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        )
+
+    def read(self, oid):
+        """Conteúdo do objeto `oid`"""
+        with self._lock:
+            if self._process is None:
+                self._start()
+            stdin, stdout = self._process.stdin, self._process.stdout
+            stdin.write(oid.encode() + b"\n")
+            stdin.flush()
+            header = stdout.readline().split()
+            if len(header) != 3:
+                raise GitError(f"Objeto não encontrado: {oid}")
+            size = int(header[2])
+            data = stdout.read(size)
+            stdout.read(1)  # quebra de linha após o conteúdo
+            return data
+
+    def close(self):
+        with self._lock:
+            if self._process is not None:
+                self._process.stdin.close()
+                self._process.wait()
+                self._process.stdout.close()
+                self._process = None
+
+
+def changed_paths(repo, base_tree, tree):
+    """{caminho: status} dos blobs alterados entre duas árvores (A, M, T ou D)"""
+    output = _git(repo, "diff-tree", "-r", "-z", "--no-renames", base_tree, tree)
+    fields = output.split(b"\0")
+    changes = {}
+    # Cada mudança é ":<modo> <modo> <oid> <oid> <status>" seguido do caminho
+    for i in range(0, len(fields) - 1, 2):
+        meta, path = fields[i], fields[i + 1]
+        if not meta.startswith(b":"):
+            continue
+        changes[path.decode("utf-8", "surrogateescape")] = meta.split()[-1].decode()[:1]
+    return changes
+
+
+class GitTreeIndex(ProjectIndex):
+    """Mesma interface do ProjectIndex, mas os arquivos são blobs de uma árvore git"""
+
+    on_disk = False
+
+    def __init__(self, project_root, repo, tree, base_tree=None):
+        super().__init__(project_root)
+        self.repo = Path(repo)
+        self.tree = tree
+        self.base_tree = base_tree
+        self.changes = {}
+        self._reader = GitObjectReader(repo)
+
+    def build(self):
+        """Lista a árvore com `git ls-tree` (só objetos de árvore são lidos, nenhum blob)"""
+        output = _git(self.repo, "ls-tree", "-r", "-z", "--long", self.tree)
+        blobs = []
+        for record in output.split(b"\0"):
+            if not record:
+                continue
+            meta, _, path = record.partition(b"\t")
+            mode, kind, oid, size = meta.split()
+            # Submódulos e links simbólicos não são arquivos do projeto
+            if kind != b"blob" or mode == b"120000":
+                continue
+            blobs.append((path.decode("utf-8", "surrogateescape"), oid.decode(), int(size)))
+
+        # Raízes de módulo vêm da própria árvore: build/ só é ignorado ao lado de um build.gradle
+        module_dirs = {
+            rel.rpartition("/")[0] for rel, _, _ in blobs if rel.rpartition("/")[2] in MODULE_MARKERS
+        }
+        entries = []
+        dirs = {""}
+        for rel, oid, size in blobs:
+            parts = rel.split("/")
+            if is_skipped_path(parts[:-1], lambda prefix: "/".join(prefix) in module_dirs):
+                continue
+            dirs.update("/".join(parts[:i]) for i in range(1, len(parts)))
+            entries.append(FileEntry(
+                str(self.project_root / rel), rel, size, 0, bucket_for(parts[-1]), oid
+            ))
+
+        entries.sort(key=lambda entry: entry.rel)
+        by_bucket = {}
+        for entry in entries:
+            by_bucket.setdefault(entry.bucket, []).append(entry)
+
+        self._by_rel = {entry.rel: entry for entry in entries}
+        self._by_bucket = by_bucket
+        self._dirs = dirs
+        self._entries = entries
+        if self.base_tree is not None:
+            self.changes = changed_paths(self.repo, self.base_tree, self.tree)
+            self.changed = {rel for rel, status in self.changes.items() if status != "D"}
+        self.generation += 1
+
+    def update(self, rels):
+        # Uma árvore git não muda; não há nada para atualizar
+        return []
+
+    def read_bytes(self, entry_or_rel):
+        """Conteúdo do blob, lido pelo processo cat-file persistente"""
+        return self._reader.read(self._resolve(entry_or_rel).oid)
+
+    def close(self):
+        self._reader.close()
+
+
+def change_kinds_for(index):
+    """Tipos de entrada afetados pela diferença (para escolher as etapas a executar)"""
+    from watch_mode import change_kinds
+
+    kinds = set()
+    for rel, status in index.changes.items():
+        kinds.update(change_kinds(rel, status in ("A", "D")))
+    return kinds
+
+
+def attach_git_source(project_root, spec, base=None, repo=None):
+    """Faz os testers de `project_root` lerem a árvore `spec` ('<rev>[:<subdir>]') do repositório
+
+    Com `base`, só os arquivos alterados desde `base` passam pelas verificações por arquivo.
+    """
+    project_root = Path(project_root)
+    repo = Path(repo) if repo is not None else project_root
+    revision, subdir = split_revision(spec)
+    base_tree = tree_spec(base, subdir) if base else None
+    index = GitTreeIndex(project_root, repo, tree_spec(revision, subdir), base_tree)
+    index.build()
+    set_project_index(project_root, index)
+    return index
+
+
+def select_steps(tester, index):
+    """Etapas afetadas pela diferença (todas quando não há base)"""
+    if index.base_tree is None:
+        return None
+    from watch_mode import affected_steps
+
+    return affected_steps(tester, change_kinds_for(index))
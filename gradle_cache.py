@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Localização de artefatos de dependências nos caches locais (Gradle e Maven)
+Nada é baixado: só o que já está em ~/.gradle/caches/modules-2 ou ~/.m2/repository é considerado
+"""
+
+import os
+from pathlib import Path
+
+# Classificadores que não vão para o APK
+_SKIPPED_SUFFIXES = ("-sources.jar", "-javadoc.jar", "-tests.jar")
+
+# Preferência quando o módulo publica mais de um formato
+ARTIFACT_EXTENSIONS = (".aar", ".jar")
+
+
+def gradle_user_home():
+    return Path(os.environ.get("GRADLE_USER_HOME") or Path.home() / ".gradle")
+
+
+def default_repositories():
+    """Raízes dos caches locais existentes, na ordem de busca"""
+    roots = [
+        gradle_user_home() / "caches" / "modules-2" / "files-2.1",
+        Path.home() / ".m2" / "repository",
+    ]
+    return [root for root in roots if root.is_dir()]
+
+
+def select_artifact(candidates):
+    """Artefato binário entre os arquivos de uma versão (aar antes de jar), ou None"""
+    for extension in ARTIFACT_EXTENSIONS:
+        for path in candidates:
+            if path.name.endswith(extension) and not path.name.endswith(_SKIPPED_SUFFIXES):
+                return path
+    return None
+
+
+class LocalArtifactRepository:
+    """Busca group:name:version nos layouts files-2.1 do Gradle (<grupo>/<nome>/<versão>/<sha1>/) e do Maven"""
+
+    def __init__(self, roots=None):
+        self.roots = [Path(root) for root in roots] if roots is not None else default_repositories()
+
+    def _version_dirs(self, group, name, version):
+        for root in self.roots:
+            gradle_dir = root / group / name / version
+            if gradle_dir.is_dir():
+                # Um subdiretório por hash de arquivo
+                with os.scandir(gradle_dir) as it:
+                    children = sorted(item.path for item in it if item.is_dir())
+                yield from children
+            maven_dir = root.joinpath(*group.split(".")) / name / version
+            if maven_dir.is_dir():
+                yield maven_dir
+
+    def files(self, group, name, version):
+        """Todos os arquivos conhecidos da versão (aar, jar, pom, module...)"""
+        found = []
+        for directory in self._version_dirs(group, name, version):
+            with os.scandir(directory) as it:
+                found.extend(Path(item.path) for item in it if item.is_file())
+        return found
+
+    def find_artifact(self, group, name, version):
+        """Artefato binário da versão (aar antes de jar), ou None se não estiver no cache"""
+        if not group or not version:
+            return None
+        return select_artifact(self.files(group, name, version))
+
+    def versions(self, group, name):
+        """Versões do módulo presentes em algum cache local"""
+        found = set()
+        for root in self.roots:
+            for module_dir in (root / group / name, root.joinpath(*group.split(".")) / name):
+                if module_dir.is_dir():
+                    found.update(child.name for child in module_dir.iterdir() if child.is_dir())
+        return sorted(found)
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Modelo estruturado dos arquivos de build Gradle (Groovy e KTS)
+Extrai o bloco android {}, plugins e dependências com configuração e versão
+"""
+
+import re
+
+from parse_cache import get_parse_cache
+
+# Comentários e strings (strings são mantidas, comentários viram espaço preservando as linhas)
+_COMMENT_OR_STRING = re.compile(r'''
+    //[^\n]*
+  | /\*.*?\*/
+  | """.*?"""
+  | \'\'\'.*?\'\'\'
+  | "(?:\\.|[^"\\\n])*"
+  | '(?:\\.|[^'\\\n])*'
+''', re.VERBOSE | re.DOTALL)
+
+_STRUCTURE_TOKEN = re.compile(r'''
+    """.*?"""
+  | \'\'\'.*?\'\'\'
+  | "(?:\\.|[^"\\\n])*"
+  | '(?:\\.|[^'\\\n])*'
+  | [{}()\[\];\n]
+''', re.VERBOSE | re.DOTALL)
+
+_STRING_LITERAL = re.compile(r'''"((?:\\.|[^"\\\n])*)"|'((?:\\.|[^'\\\n])*)\'''')
+_NAMED_BLOCK = re.compile(r'''^(?:\w+)\s*\(\s*["']([\w.-]+)["']\s*\)$''')
+_LAST_WORD = re.compile(r'([\w.]+)\s*$')
+_CONFIGURATION = re.compile(r'^(\w+)\s*(?:\(|\s|$)')
+_ASSIGNMENT = re.compile(r'''^(\w+)\s*(?:=\s*|\(\s*|\s+)(.+?)\s*\)?$''', re.DOTALL)
+_VARIABLE = re.compile(r'\$\{?([\w.]+)\}?')
+_EXT_PROPERTY = re.compile(r'''^(?:ext\.|extra\[["']|val\s+|def\s+|set\(["'])?(\w+)(?:["']\]?)?\s*(?:=|,)\s*["']([^"']*)["']''')
+_PLUGIN_ID = re.compile(r'''^(?:id\s*\(?\s*["']([\w.-]+)["']|kotlin\s*\(\s*["']([\w.-]+)["']|alias\s*\(\s*([\w.]+)\s*\)|`?([\w-]+)`?$)''')
+_APPLY_PLUGIN = re.compile(r'''^apply\s+plugin\s*:\s*["']([\w.-]+)["']''')
+_PLUGIN_VERSION = re.compile(r'''\bversion\s*\(?\s*["']([^"']+)["']''')
+_MAP_NOTATION = re.compile(r'''(group|name|version)\s*[:=]\s*["']([^"']+)["']''')
+_PROJECT_DEP = re.compile(r'''project\s*\(\s*(?:path\s*[:=]\s*)?["']([^"']+)["']''')
+_CATALOG_DEP = re.compile(r'''\b(libs\.[\w.]+)''')
+
+# Nomes antigos e novos dos campos do bloco android {}
+ANDROID_FIELD_ALIASES = {
+    "compileSdkVersion": "compileSdk",
+    "minSdkVersion": "minSdk",
+    "targetSdkVersion": "targetSdk",
+}
+
+# Configurações que não entram no APK
+TEST_CONFIGURATION_PREFIXES = ("test", "androidTest")
+
+# Palavras que abrem blocos sem serem configurações de dependência
+_NOT_CONFIGURATIONS = {"exclude", "because", "constraints", "version", "force", "transitive"}
+
+
+class Dependency:
+    """Coordenada declarada em um bloco dependencies {}"""
+
+    __slots__ = ("configuration", "group", "name", "version", "kind", "platform", "raw", "line")
+
+    def __init__(self, configuration, group, name, version, kind, platform, raw, line):
+        self.configuration = configuration
+        self.group = group
+        self.name = name
+        self.version = version
+        self.kind = kind
+        self.platform = platform
+        self.raw = raw
+        self.line = line
+
+    @property
+    def module(self):
+        return f"{self.group}:{self.name}" if self.group else self.name
+
+    @property
+    def is_test(self):
+        return self.configuration.startswith(TEST_CONFIGURATION_PREFIXES)
+
+    def to_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __repr__(self):
+        version = f":{self.version}" if self.version else ""
+        return f"Dependency({self.configuration} {self.module}{version})"
+
+
+class GradleBuildModel:
+    """Plugins, campos do android {} e dependências de um arquivo de build"""
+
+    def __init__(self, path, properties=None):
+        self.path = path
+        self.plugins = {}
+        self.android = {}
+        self.dependencies = []
+        self.classpath = []
+        self.properties = dict(properties or {})
+        self._lookup = None
+
+    def android_field(self, name):
+        """Valor de um campo do android {} pelo nome curto (ex.: minSdk em defaultConfig)"""
+        if name in self.android:
+            return self.android[name]
+        for key, value in self.android.items():
+            if key.rsplit(".", 1)[-1] == name:
+                return value
+        return None
+
+    def has_plugin(self, fragment):
+        fragment = fragment.lower()
+        return any(fragment in plugin_id.lower() for plugin_id in self.plugins)
+
+    def _build_lookup(self):
+        # Índice único: nome do artefato, grupo e grupo:nome apontam para as dependências
+        lookup = {}
+        for dep in self.dependencies:
+            if dep.is_test:
+                continue
+            keys = {dep.name, dep.module}
+            if dep.group:
+                keys.add(dep.group)
+            for key in keys:
+                lookup.setdefault(key, []).append(dep)
+        return lookup
+
+    def find_dependency(self, key):
+        """Procura uma dependência (não de teste) por nome, grupo ou grupo:nome"""
+        if self._lookup is None:
+            self._lookup = self._build_lookup()
+        return self._lookup.get(key, [])
+
+    def missing_dependencies(self, keys):
+        """Chaves que não correspondem a nenhuma dependência declarada"""
+        return [key for key in keys if not self.find_dependency(key)]
+
+
+def strip_comments(text):
+    """Remove comentários mantendo strings e quebras de linha"""
+    def replace(m):
+        token = m.group()
+        if token.startswith("/"):
+            newlines = token.count("\n")
+            return "\n" * newlines if newlines else " "
+        return token
+    return _COMMENT_OR_STRING.sub(replace, text)
+
+
+def _block_name(head):
+    head = head.strip()
+    m = _NAMED_BLOCK.match(head)
+    if m:
+        return m.group(1)
+    m = _LAST_WORD.search(head)
+    return m.group(1) if m else head
+
+
+def iter_statements(text):
+    """Percorre o arquivo gerando (caminho_de_blocos, instrução, linha, abre_bloco)"""
+    code = strip_comments(text)
+    path = []
+    start = 0
+    depth = 0  # parênteses/colchetes abertos na instrução atual
+    counted = [0, 1]  # posição até onde as linhas já foram contadas e a linha correspondente
+
+    def statement(end, opens_block=False):
+        raw = code[start:end]
+        stripped = raw.strip()
+        if not stripped:
+            return None
+        offset = start + len(raw) - len(raw.lstrip())
+        counted[1] += code.count("\n", counted[0], offset)
+        counted[0] = offset
+        return tuple(path), " ".join(stripped.split()), counted[1], opens_block
+
+    for m in _STRUCTURE_TOKEN.finditer(code):
+        token = m.group()
+        if token in "([":
+            depth += 1
+        elif token in ")]":
+            depth = max(0, depth - 1)
+        elif token == "{":
+            item = statement(m.start(), opens_block=True)
+            if item:
+                yield item
+            path.append(_block_name(code[start:m.start()]) if item else "")
+            start = m.end()
+            depth = 0
+        elif token == "}":
+            item = statement(m.start())
+            if item:
+                yield item
+            if path:
+                path.pop()
+            start = m.end()
+            depth = 0
+        elif token in "\n;" and not depth:
+            item = statement(m.start())
+            if item:
+                yield item
+            start = m.end()
+
+    item = statement(len(code))
+    if item:
+        yield item
+
+
+def _resolve(value, properties):
+    if value is None:
+        return None
+    return _VARIABLE.sub(lambda m: properties.get(m.group(1).split(".")[-1], m.group(0)), value)
+
+
+def _strip_quotes(value):
+    m = _STRING_LITERAL.fullmatch(value.strip())
+    if m:
+        return m.group(1) if m.group(1) is not None else m.group(2)
+    return value.strip()
+
+
+def _parse_dependency(statement, line, properties):
+    m = _CONFIGURATION.match(statement)
+    if not m or m.group(1) in _NOT_CONFIGURATIONS:
+        return None
+    configuration = m.group(1)
+    platform = "platform(" in statement or "enforcedPlatform(" in statement
+
+    project = _PROJECT_DEP.search(statement)
+    if project:
+        return Dependency(configuration, None, project.group(1), None, "project", platform, statement, line)
+
+    for literal in _STRING_LITERAL.finditer(statement):
+        value = literal.group(1) if literal.group(1) is not None else literal.group(2)
+        parts = value.split("@")[0].split(":")
+        if len(parts) >= 2 and parts[0] and parts[1]:
+            version = parts[2] if len(parts) > 2 and parts[2] else None
+            return Dependency(
+                configuration, parts[0], parts[1], _resolve(version, properties),
+                "module", platform, statement, line
+            )
+
+    fields = dict(_MAP_NOTATION.findall(statement))
+    if "name" in fields:
+        return Dependency(
+            configuration, fields.get("group"), fields["name"], _resolve(fields.get("version"), properties),
+            "module", platform, statement, line
+        )
+
+    catalog = _CATALOG_DEP.search(statement)
+    if catalog:
+        # Alias do version catalog: libs.hilt.android -> hilt-android
+        alias = catalog.group(1)[len("libs."):]
+        return Dependency(configuration, None, alias.replace(".", "-"), None, "catalog", platform, statement, line)
+
+    if "fileTree(" in statement or "files(" in statement:
+        return Dependency(configuration, None, statement, None, "files", platform, statement, line)
+    return None
+
+
+def parse_gradle(text, path=None, properties=None):
+    """Constrói o modelo de um arquivo build.gradle ou build.gradle.kts"""
+    model = GradleBuildModel(path, properties)
+    statements = list(iter_statements(text))
+
+    # Propriedades (ext/val) primeiro, para resolver versões declaradas depois
+    for block, statement, _, _ in statements:
+        if not block or block[-1] in ("ext", "buildscript"):
+            m = _EXT_PROPERTY.match(statement)
+            if m:
+                model.properties[m.group(1)] = m.group(2)
+
+    for block, statement, line, opens_block in statements:
+        if block and block[0] == "plugins" and len(block) == 1:
+            m = _PLUGIN_ID.match(statement)
+            if m:
+                plugin_id = next(group for group in m.groups() if group)
+                if m.group(2):
+                    plugin_id = f"org.jetbrains.kotlin.{plugin_id}"
+                version = _PLUGIN_VERSION.search(statement)
+                model.plugins[plugin_id] = version.group(1) if version else None
+        elif not block:
+            m = _APPLY_PLUGIN.match(statement)
+            if m:
+                model.plugins.setdefault(m.group(1), None)
+        elif block[0] == "android":
+            m = None if opens_block else _ASSIGNMENT.match(statement)
+            if m:
+                key = ANDROID_FIELD_ALIASES.get(m.group(1), m.group(1))
+                field = ".".join(block[1:] + (key,))
+                model.android.setdefault(field, _resolve(_strip_quotes(m.group(2)), model.properties))
+        elif block[-1] == "dependencies":
+            dep = _parse_dependency(statement, line, model.properties)
+            if dep is None:
+                continue
+            if block[0] == "buildscript" or dep.configuration == "classpath":
+                model.classpath.append(dep)
+            else:
+                model.dependencies.append(dep)
+
+    return model
+
+
+def get_gradle_model(index, rel, properties=None):
+    """Modelo do arquivo `rel`, construído uma vez por execução (invalidado por mtime/tamanho ou blob)"""
+    entry = index.get(rel)
+    if entry is None:
+        return None
+    kind = f"gradle:{sorted((properties or {}).items())!r}"
+    return get_parse_cache().parsed(
+        index, entry, kind, lambda data: parse_gradle(data.decode("utf-8"), path=rel, properties=properties)
+    )
+
+
+def load_project_models(index):
+    """Modelos do build.gradle raiz e do módulo app (o app herda as propriedades ext da raiz)"""
+    root = get_gradle_model(index, "build.gradle") or get_gradle_model(index, "build.gradle.kts")
+    properties = root.properties if root else None
+    app = get_gradle_model(index, "app/build.gradle", properties) or \
+        get_gradle_model(index, "app/build.gradle.kts", properties)
+    return root, app
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Analisador léxico de Kotlin para os scripts de teste do Email Assistant
+Uma única passada por arquivo que ignora comentários, strings, strings brutas e templates
+"""
+
+import re
+
+# Início de tudo o que não é código: strings, caracteres, comentários e `identificadores`
+_NON_CODE = re.compile(r'''"""|"|'(?:\\.|[^'\\\n])*'|//[^\n]*|/\*|`[^`\n]*`''')
+
+# Dentro de ${...} também é preciso acompanhar as chaves
+_TEMPLATE_TOKEN = re.compile(r'''"""|"|'(?:\\.|[^'\\\n])*'|//[^\n]*|/\*|\{|\}''')
+
+_STRING_STOP = re.compile(r'\\.|"|\$\{|\n')
+_RAW_STRING_STOP = re.compile(r'"""|\$\{')
+_BLOCK_COMMENT_STOP = re.compile(r'/\*|\*/')
+
+_BRACE = re.compile(r'[{}]')
+# Sem \b inicial para o motor de regex poder usar o prefixo literal; a borda é conferida à parte
+_FUN = re.compile(r'fun\b(\s+interface\b)?')
+_PACKAGE = re.compile(r'^[ \t]*package\b', re.MULTILINE)
+_IMPORT = re.compile(r'^[ \t]*import\b', re.MULTILINE)
+
+# Shebang e anotações @file: podem preceder o package (comentários já foram removidos)
+_PACKAGE_FIRST = re.compile(r'\s*(?:#![^\n]*\s*)?(?:@file:\w+(?:\([^)]*\))?\s*)*package\b')
+
+
+def _skip_block_comment(text, pos):
+    """Avança até o fim de um comentário de bloco (que em Kotlin pode ser aninhado)"""
+    depth = 1
+    while depth:
+        m = _BLOCK_COMMENT_STOP.search(text, pos)
+        if m is None:
+            return len(text)
+        depth += 1 if m.group() == "/*" else -1
+        pos = m.end()
+    return pos
+
+
+def _skip_template(text, pos):
+    """Avança até o '}' que fecha um ${...}, respeitando strings e chaves internas"""
+    depth = 0
+    while True:
+        m = _TEMPLATE_TOKEN.search(text, pos)
+        if m is None:
+            return len(text)
+        token = m.group()
+        pos = m.end()
+        if token == "{":
+            depth += 1
+        elif token == "}":
+            if not depth:
+                return pos
+            depth -= 1
+        elif token == '"' or token == '"""':
+            pos = _skip_string(text, pos, raw=token == '"""')
+        elif token == "/*":
+            pos = _skip_block_comment(text, pos)
+
+
+def _skip_string(text, pos, raw):
+    """Avança até o fim da string, incluindo os templates ${...} aninhados"""
+    stop = _RAW_STRING_STOP if raw else _STRING_STOP
+    while True:
+        m = stop.search(text, pos)
+        if m is None:
+            return len(text)
+        token = m.group()
+        if token == "${":
+            pos = _skip_template(text, m.end())
+        elif token == '"""':
+            end = m.end()
+            # Aspas extras antes do fechamento pertencem ao conteúdo
+            while end < len(text) and text[end] == '"':
+                end += 1
+            return end
+        elif token == '"':
+            return m.end()
+        elif token == "\n":
+            # String simples não atravessa linhas: tratar como não terminada
+            return m.start()
+        else:
+            pos = m.end()
+
+
+def strip_non_code(text):
+    """Remove strings e comentários mantendo as quebras de linha (e portanto os números de linha)"""
+    pieces = []
+    pos = 0
+    search = _NON_CODE.search
+    while True:
+        m = search(text, pos)
+        if m is None:
+            pieces.append(text[pos:])
+            break
+        start = m.start()
+        pieces.append(text[pos:start])
+        token = m.group()
+        if token == '"' or token == '"""':
+            end = _skip_string(text, m.end(), raw=token == '"""')
+        elif token == "/*":
+            end = _skip_block_comment(text, m.end())
+        else:
+            end = m.end()
+        newlines = text.count("\n", start, end)
+        pieces.append("\n" * newlines if newlines else " ")
+        pos = end
+    return "".join(pieces)
+
+
+def _keywords(pattern, code):
+    """Ocorrências de `pattern` que começam numa borda de identificador"""
+    for m in pattern.finditer(code):
+        start = m.start()
+        if not start or not (code[start - 1].isalnum() or code[start - 1] in "_$"):
+            yield m
+
+
+def _count_functions(code):
+    # "fun interface" declara uma interface funcional, não uma função
+    return sum(1 for m in _keywords(_FUN, code) if m.group(1) is None)
+
+
+def line_of(text, pos):
+    """Número da linha (1-based) de uma posição"""
+    return text.count("\n", 0, pos) + 1
+
+
+def _imbalance_line(code):
+    """Linha da primeira chave sem par (fechamento sobrando ou abertura nunca fechada)"""
+    opens = []
+    for m in _BRACE.finditer(code):
+        if m.group() == "{":
+            opens.append(m.start())
+        elif opens:
+            opens.pop()
+        else:
+            return line_of(code, m.start())
+    return line_of(code, opens[0]) if opens else None
+
+
+def analyze_kotlin_source(text):
+    """Analisa um arquivo Kotlin e retorna chaves, ordem package/imports, funções e referências a recursos"""
+    from resource_index import scan_kotlin_references
+    from symbol_index import scan_kotlin_symbols
+
+    code = strip_non_code(text)
+
+    open_braces = code.count("{")
+    close_braces = code.count("}")
+    imbalance_line = _imbalance_line(code) if open_braces != close_braces else None
+
+    package = _PACKAGE.search(code)
+    first_import = _IMPORT.search(code)
+    resource_refs, binding_refs = scan_kotlin_references(code)
+
+    return {
+        "empty": not text.strip(),
+        "package_first": _PACKAGE_FIRST.match(code) is not None,
+        "package_before_imports": first_import is None or (
+            package is not None and package.start() < first_import.start()
+        ),
+        "open_braces": open_braces,
+        "close_braces": close_braces,
+        "balanced": open_braces == close_braces,
+        "imbalance_line": imbalance_line,
+        "fun_count": _count_functions(code),
+        "resource_refs": resource_refs,
+        "binding_refs": binding_refs,
+        "symbols": scan_kotlin_symbols(code),
+    }
+
+
+def analyze_kotlin(data):
+    """Versão para bytes usada pelo cache de verificações"""
+    return analyze_kotlin_source(data.decode('utf-8'))
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Custo de inflar e desenhar os layouts de res/layout* do Email Assistant
+Cada XML vira uma lista de nós (fatos em cache); a árvore de views é montada resolvendo os <include>
+e dela saem profundidade, número de views, pesos aninhados, aninhamento inútil, fundos empilhados e um custo
+"""
+
+import io
+import json
+import sys
+import threading
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from resource_index import res_location
+
+ANDROID_NS = "http://schemas.android.com/apk/res/android"
+
+# Limites padrão (os mesmos do lint: TooDeepLayout e TooManyViews) e do custo por layout
+DEFAULT_THRESHOLDS = {"max_depth": 10, "max_views": 80, "max_score": 150}
+# Limites versionados com o projeto: {"max_depth", "max_views", "max_score", "layouts": {nome: {...}}}
+BUDGET_FILE = "layout-budget.json"
+
+# Peso de cada métrica no custo: views e níveis custam medida/desenho, pesos aninhados medem os filhos
+# duas vezes por nível, contêineres inúteis são um nível a mais e fundos empilhados são overdraw
+COST_WEIGHTS = {"views": 1, "depth": 3, "nested_weights": 15, "redundant": 5, "stacked_backgrounds": 4}
+
+# Tags que não viram views
+NON_VIEW_TAGS = {"requestFocus", "tag", "data", "variable", "import"}
+# Contêineres genéricos do framework, os únicos que o lint (UselessParent/UselessLeaf) acusa: os demais
+# (AppBarLayout, CardView, TextInputLayout, SwipeRefreshLayout, ScrollView...) têm um filho por projeto
+PLAIN_CONTAINERS = {"FrameLayout", "LinearLayout", "RelativeLayout", "TableLayout", "TableRow", "GridLayout"}
+_FULL_SIZE = {"match_parent", "fill_parent"}
+
+
+def _android(name):
+    return f"{{{ANDROID_NS}}}{name}"
+
+
+def _simple_tag(tag):
+    return tag.rsplit(".", 1)[-1]
+
+
+def scan_layout(data):
+    """Nós de um layout em pré-ordem: {"tag", "parent", "id", "background", "weight", "full", "include"}"""
+    nodes = []
+    error = None
+    try:
+        stack = []
+        skipping = 0  # dentro de <data> do data binding
+        for event, elem in ET.iterparse(io.BytesIO(data), events=("start", "end")):
+            tag = elem.tag if isinstance(elem.tag, str) else ""
+            if event == "end":
+                if skipping:
+                    skipping -= 1
+                elif tag not in NON_VIEW_TAGS and not (tag == "layout" and not stack):
+                    stack.pop()
+                elem.clear()
+                continue
+            if skipping or tag == "data":
+                skipping += 1
+                continue
+            if tag in NON_VIEW_TAGS or (tag == "layout" and not stack):
+                continue
+            weight = elem.get(_android("layout_weight"))
+            try:
+                weighted = bool(weight) and float(weight) != 0
+            except ValueError:
+                weighted = True  # @integer/...: presumir peso
+            include = None
+            if tag == "include":
+                include = (elem.get("layout") or "").rpartition("/")[2] or None
+            nodes.append({
+                "tag": tag,
+                "parent": stack[-1] if stack else -1,
+                "id": _android("id") in elem.attrib,
+                "background": _android("background") in elem.attrib,
+                "weight": weighted,
+                "full": elem.get(_android("layout_width")) in _FULL_SIZE
+                and elem.get(_android("layout_height")) in _FULL_SIZE,
+                "include": include,
+            })
+            stack.append(len(nodes) - 1)
+    except ET.ParseError as e:
+        error = str(e)
+    return {"nodes": nodes, "error": error}
+
+
+class LayoutCost:
+    """Métricas de um layout com os <include> resolvidos"""
+
+    def __init__(self, name, rel):
+        self.name = name
+        self.rel = rel
+        self.views = 0
+        self.depth = 0
+        self.includes = 0
+        self.nested_weights = []  # contêineres com peso dentro de outro com peso
+        self.redundant = []  # contêineres com um único filho ou vazios
+        self.stacked_backgrounds = 0  # fundos em match_parent sobre outro fundo
+        self.max_overdraw = 0  # maior número de fundos num mesmo caminho da árvore
+        self.missing_includes = []
+        self.cycles = []
+
+    @property
+    def score(self):
+        return (
+            COST_WEIGHTS["views"] * self.views
+            + COST_WEIGHTS["depth"] * self.depth
+            + COST_WEIGHTS["nested_weights"] * len(self.nested_weights)
+            + COST_WEIGHTS["redundant"] * len(self.redundant)
+            + COST_WEIGHTS["stacked_backgrounds"] * self.stacked_backgrounds
+        )
+
+    def to_dict(self):
+        return {
+            "file": self.rel,
+            "score": self.score,
+            "views": self.views,
+            "depth": self.depth,
+            "includes": self.includes,
+            "nested_weights": len(self.nested_weights),
+            "redundant": len(self.redundant),
+            "stacked_backgrounds": self.stacked_backgrounds,
+            "max_overdraw": self.max_overdraw,
+        }
+
+
+class LayoutAnalyzer:
+    """Layouts do projeto por nome ('activity_main', 'activity_main[land]') e o custo de cada um"""
+
+    def __init__(self):
+        self.layouts = {}  # nome -> (arquivo, qualificador, nós, {índice do pai: [filhos]})
+        self.errors = {}
+
+    def add(self, rel, qualifier, name, facts):
+        if facts["error"]:
+            self.errors[rel] = facts["error"]
+            return
+        key = f"{name}[{qualifier}]" if qualifier else name
+        # O primeiro em ordem de caminho vence (src/main antes de src/release)
+        if key not in self.layouts:
+            children = {}
+            for position, node in enumerate(facts["nodes"]):
+                children.setdefault(node["parent"], []).append(position)
+            self.layouts[key] = (rel, qualifier, facts["nodes"], children)
+
+    def _target(self, name, qualifier):
+        if qualifier and f"{name}[{qualifier}]" in self.layouts:
+            return f"{name}[{qualifier}]"
+        return name if name in self.layouts else None
+
+    def cost(self, key):
+        rel, qualifier, _, _ = self.layouts[key]
+        cost = LayoutCost(key, rel)
+        self._walk(cost, key, qualifier, -1, 0, False, 0, (key,))
+        return cost
+
+    def _walk(self, cost, key, qualifier, parent, depth, under_weight, backgrounds, stack):
+        """Visita os filhos de `parent` no layout `key` (-1 = raiz) como views na profundidade `depth` + 1"""
+        rel, _, nodes, children = self.layouts[key]
+        file_name = rel.rsplit("/", 1)[-1]
+        for index in children.get(parent, ()):
+            node = nodes[index]
+            if node["tag"] == "include":
+                if node["include"] is None:
+                    continue
+                target = self._target(node["include"], qualifier)
+                if target is None:
+                    cost.missing_includes.append(node["include"])
+                    continue
+                if target in stack:
+                    cost.cycles.append(" → ".join(stack[stack.index(target):] + (target,)))
+                    continue
+                cost.includes += 1
+                # O layout incluído ocupa o lugar do <include>; um <merge> entrega os filhos ao pai
+                self._walk(cost, target, qualifier, -1, depth, under_weight, backgrounds, stack + (target,))
+                continue
+            if node["tag"] == "merge" and parent == -1:
+                self._walk(cost, key, qualifier, index, depth, under_weight, backgrounds, stack)
+                continue
+
+            cost.views += 1
+            level = depth + 1
+            cost.depth = max(cost.depth, level)
+            layers = backgrounds
+            if node["background"]:
+                # Fundo em tela cheia sobre outro fundo redesenha a área inteira (botões e cartões são normais)
+                if backgrounds and node["full"]:
+                    cost.stacked_backgrounds += 1
+                layers += 1
+                cost.max_overdraw = max(cost.max_overdraw, layers)
+
+            own_children = children.get(index, ())
+            tag = _simple_tag(node["tag"])
+            if tag == "LinearLayout":
+                weighted_children = any(nodes[child]["weight"] for child in own_children)
+                if weighted_children and under_weight:
+                    cost.nested_weights.append(f"{tag} em {file_name}")
+                child_under_weight = under_weight or weighted_children
+            else:
+                child_under_weight = under_weight
+            if parent != -1 and not node["background"] and not node["id"] and tag in PLAIN_CONTAINERS:
+                # Filho único (um <include> pode ser um <merge>, então não conta) ou contêiner vazio
+                single_child = len(own_children) == 1 and nodes[own_children[0]]["tag"] != "include"
+                if single_child or not own_children:
+                    cost.redundant.append(f"{tag} em {file_name}")
+            self._walk(cost, key, qualifier, index, level, child_under_weight, layers, stack)
+
+    def costs(self):
+        return {key: self.cost(key) for key in sorted(self.layouts)}
+
+
+def build_layout_analyzer(index, cache):
+    analyzer = LayoutAnalyzer()
+    for entry in sorted(index.files("xml"), key=lambda entry: entry.rel):
+        location = res_location(entry.rel)
+        if location is None or location[0] != "layout":
+            continue
+        analyzer.add(entry.rel, location[1], location[2], cache.facts(entry, "layout", index))
+    return analyzer
+
+
+_analyzers = {}
+_analyzers_lock = threading.Lock()
+
+
+def get_layout_analyzer(index, cache):
+    """Layouts compartilhados pelas etapas (refeitos quando o índice de arquivos muda)"""
+    root = str(index.project_root)
+    with _analyzers_lock:
+        generation, analyzer = _analyzers.get(root, (None, None))
+        if analyzer is None or generation != index.generation:
+            analyzer = build_layout_analyzer(index, cache)
+            _analyzers[root] = (index.generation, analyzer)
+        return analyzer
+
+
+def parse_budget(data):
+    """Limites de layout-budget.json sobre os padrões"""
+    budget = json.loads(data)
+    known = set(DEFAULT_THRESHOLDS) | {"layouts"}
+    unknown = set(budget) - known
+    for overrides in budget.get("layouts", {}).values():
+        unknown |= set(overrides) - set(DEFAULT_THRESHOLDS)
+    if unknown:
+        raise ValueError(f"Chaves desconhecidas no orçamento de layouts: {', '.join(sorted(unknown))}")
+    return budget
+
+
+def load_budget(path):
+    with open(path, "rb") as f:
+        return parse_budget(f.read())
+
+
+def thresholds_for(name, budget):
+    limits = dict(DEFAULT_THRESHOLDS)
+    limits.update({key: value for key, value in budget.items() if key in DEFAULT_THRESHOLDS})
+    limits.update(budget.get("layouts", {}).get(name.split("[", 1)[0], {}))
+    limits.update(budget.get("layouts", {}).get(name, {}))
+    return limits
+
+
+def check_thresholds(costs, budget):
+    """Layouts acima dos limites (e ciclos de <include>): [mensagem]"""
+    violations = []
+    cycles = set()
+    for name, cost in costs.items():
+        limits = thresholds_for(name, budget)
+        if cost.depth > limits["max_depth"]:
+            violations.append(f"{name}: profundidade {cost.depth} > {limits['max_depth']}")
+        if cost.views > limits["max_views"]:
+            violations.append(f"{name}: {cost.views} views > {limits['max_views']}")
+        if cost.score > limits["max_score"]:
+            violations.append(f"{name}: custo {cost.score} > {limits['max_score']}")
+        # O mesmo ciclo aparece em todo layout que o inclui: acusar uma vez
+        for cycle in cost.cycles:
+            if cycle not in cycles:
+                cycles.add(cycle)
+                violations.append(f"<include> circular: {cycle}")
+    return violations
+
+
+def describe_warnings(costs, limit=5):
+    """Avisos que não falham o build: pesos aninhados, aninhamento inútil e fundos empilhados"""
+    items = []
+    for name, cost in costs.items():
+        found = []
+        if cost.nested_weights:
+            found.append(f"{len(cost.nested_weights)} peso(s) aninhado(s)")
+        if cost.redundant:
+            found.append(f"{len(cost.redundant)} contêiner(es) inútil(eis)")
+        if cost.stacked_backgrounds:
+            found.append(f"{cost.stacked_backgrounds} fundo(s) empilhado(s) em tela cheia")
+        if found:
+            items.append(f"{name} ({', '.join(found)})")
+    shown = items[:limit]
+    if len(items) > limit:
+        shown.append(f"e mais {len(items) - limit}")
+    return ", ".join(shown)
+
+
+def main():
+    import argparse
+
+    from check_cache import get_check_cache
+    from project_index import DEFAULT_PROJECT_ROOT, get_project_index
+
+    parser = argparse.ArgumentParser(description="Custo de inflar e desenhar os layouts do projeto")
+    parser.add_argument("--root", default=str(DEFAULT_PROJECT_ROOT), help="Raiz do projeto Android")
+    parser.add_argument("--budget", help=f"Limites em JSON (padrão: {BUDGET_FILE} na raiz, se existir)")
+    parser.add_argument("--top", type=int, default=20, help="Quantos layouts mostrar, do mais caro ao mais barato")
+    parser.add_argument("--no-cache", action="store_true", help="Não usa nem grava o cache de verificações")
+    parser.add_argument("--json", action="store_true", help="Imprime as métricas de todos os layouts em JSON")
+    args = parser.parse_args()
+
+    budget_file = Path(args.budget) if args.budget else Path(args.root) / BUDGET_FILE
+    try:
+        budget = load_budget(budget_file) if args.budget or budget_file.exists() else {}
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 2
+
+    index = get_project_index(args.root)
+    cache = get_check_cache(args.root, enabled=not args.no_cache)
+    analyzer = get_layout_analyzer(index, cache)
+    cache.save()
+    costs = analyzer.costs()
+    violations = check_thresholds(costs, budget)
+
+    if args.json:
+        report = {name: cost.to_dict() for name, cost in costs.items()}
+        json.dump({"layouts": report, "violations": violations, "errors": analyzer.errors},
+                  sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        ranked = sorted(costs.values(), key=lambda cost: (-cost.score, cost.name))
+        print(f"📐 {len(costs)} layouts")
+        print(f"  {'layout':<36} {'custo':>6} {'views':>6} {'nível':>6} {'includes':>9} {'pesos':>6} "
+              f"{'inúteis':>8} {'fundos':>7}")
+        for cost in ranked[:args.top]:
+            print(f"  {cost.name:<36} {cost.score:>6} {cost.views:>6} {cost.depth:>6} {cost.includes:>9} "
+                  f"{len(cost.nested_weights):>6} {len(cost.redundant):>8} {cost.max_overdraw:>7}")
+        if len(ranked) > args.top:
+            print(f"  ... e mais {len(ranked) - args.top}")
+        warnings = describe_warnings(costs, limit=args.top)
+        if warnings:
+            print(f"⚠️  {warnings}")
+        for violation in violations:
+            print(f"❌ {violation}")
+        for rel, error in sorted(analyzer.errors.items()):
+            print(f"❌ {rel}: {error}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
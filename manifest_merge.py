@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Merge do AndroidManifest do app com os manifests das bibliotecas (AARs do cache local do Gradle)
+Aplica as regras do merger do Android (tools:node, tools:replace, tools:remove, placeholders) e
+memoriza o manifest analisado de cada AAR pelo hash do artefato
+"""
+
+import json
+import re
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from parse_cache import get_parse_cache
+from zip_reader import MappedZip
+
+ANDROID_NS = "http://schemas.android.com/apk/res/android"
+TOOLS_NS = "http://schemas.android.com/tools"
+
+# Componentes de <application>, na ordem do relatório
+COMPONENT_TAGS = ("activity", "activity-alias", "service", "receiver", "provider")
+
+COMPONENT_LABELS = {
+    "activity": "atividades",
+    "activity-alias": "aliases",
+    "service": "serviços",
+    "receiver": "receivers",
+    "provider": "providers",
+}
+
+PERMISSION_TAGS = ("uses-permission", "uses-permission-sdk-23")
+
+# Elementos que aparecem uma vez só e têm os filhos unidos
+SINGLE_TAGS = ("application", "queries", "supports-screens")
+
+# Atributos android:name que são nomes de classe (relativos ao pacote quando começam com ".")
+_CLASS_NAME_TAGS = set(COMPONENT_TAGS) | {"application", "instrumentation"}
+
+_PLACEHOLDER = re.compile(r"\$\{([\w.]+)\}")
+_PLACEHOLDER_ENTRY = re.compile(r'''["']?([\w.]+)["']?\s*(?::|to)\s*["']([^"']*)["']''')
+
+# Tipo no cache de artefatos (incrementar quando o formato do manifest analisado mudar)
+MANIFEST_CACHE_KIND = "manifest-1"
+
+# Manifests de variante (src/<variante>/) têm prioridade sobre src/main
+DEFAULT_VARIANT = "debug"
+
+
+class ManifestError(ValueError):
+    pass
+
+
+def _attr_name(key):
+    if key.startswith(f"{{{ANDROID_NS}}}"):
+        return "android:" + key[len(ANDROID_NS) + 2:]
+    if key.startswith("{"):
+        return key.rsplit("}", 1)[1]
+    return key
+
+
+def _tools(element):
+    prefix = f"{{{TOOLS_NS}}}"
+    return {key[len(prefix):]: value for key, value in element.attrib.items() if key.startswith(prefix)}
+
+
+def _attrs(element):
+    return {
+        _attr_name(key): value for key, value in element.attrib.items() if not key.startswith(f"{{{TOOLS_NS}}}")
+    }
+
+
+def _canonical(element):
+    """Forma textual estável de um filho (intent-filter, meta-data...) para comparar e unir"""
+    children = sorted(_canonical(child) for child in element if isinstance(child.tag, str))
+    return json.dumps([element.tag, sorted(_attrs(element).items()), children], separators=(",", ":"))
+
+
+def _child_key(canonical):
+    # Filhos são identificados por tag e android:name (ex.: meta-data de um provider)
+    tag, attrs, _ = json.loads(canonical)
+    return f"{tag}:{dict(attrs).get('android:name', '')}"
+
+
+def _qualify(name, package):
+    if package and name.startswith("."):
+        return package + name
+    if package and "." not in name and "$" not in name:
+        return f"{package}.{name}"
+    return name
+
+
+def _split_list(value):
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+def _element_record(element, parent, package):
+    attrs = _attrs(element)
+    tools = _tools(element)
+    tag = element.tag
+    if tag in _CLASS_NAME_TAGS and "android:name" in attrs:
+        attrs["android:name"] = _qualify(attrs["android:name"], package)
+    if tag in SINGLE_TAGS:
+        key = tag
+    elif "android:name" in attrs:
+        key = attrs["android:name"]
+    elif tag == "uses-feature" and "android:glEsVersion" in attrs:
+        key = "glEsVersion"
+    else:
+        key = _canonical(element)
+    children = []
+    removed_children = []
+    if tag != "application":
+        for child in element:
+            if not isinstance(child.tag, str):
+                continue
+            if _tools(child).get("node") == "remove":
+                removed_children.append(_child_key(_canonical(child)))
+            else:
+                children.append(_canonical(child))
+        children.sort()
+    return {
+        "parent": parent,
+        "tag": tag,
+        "key": key,
+        "attrs": attrs,
+        "node": tools.get("node", "merge"),
+        "replace": _split_list(tools.get("replace")),
+        "remove": _split_list(tools.get("remove")),
+        "children": children,
+        "removed_children": removed_children,
+    }
+
+
+def parse_manifest(data, package=None):
+    """Elementos de um AndroidManifest.xml em forma serializável (sem placeholders substituídos)
+
+    `package` (o namespace do Gradle) tem prioridade sobre o atributo package do manifest.
+    """
+    try:
+        root = ET.fromstring(data)
+    except ET.ParseError as e:
+        raise ManifestError(f"XML inválido: {e}") from None
+    if root.tag != "manifest":
+        raise ManifestError(f"Raiz <{root.tag}> em vez de <manifest>")
+    package = package or root.get("package")
+
+    elements = []
+    uses_sdk = {}
+    has_application = False
+    for child in root:
+        if not isinstance(child.tag, str):
+            continue
+        if child.tag == "uses-sdk":
+            uses_sdk = {"attrs": _attrs(child), "tools": _tools(child)}
+            continue
+        elements.append(_element_record(child, "manifest", package))
+        if child.tag == "application":
+            has_application = True
+            elements.extend(
+                _element_record(component, "application", package)
+                for component in child if isinstance(component.tag, str)
+            )
+    return {"package": package, "elements": elements, "uses_sdk": uses_sdk, "has_application": has_application}
+
+
+def read_aar_manifest(path):
+    """Manifest analisado de um AAR (manifest vazio para jars e AARs sem AndroidManifest.xml)"""
+    path = Path(path)
+    if path.suffix != ".aar":
+        return {"package": None, "elements": [], "uses_sdk": {}, "has_application": False}
+    with MappedZip(path) as view:
+        info = next((entry for entry in view.entries if entry.name == "AndroidManifest.xml"), None)
+        data = bytes(view.read(info)) if info is not None else None
+    if data is None:
+        return {"package": None, "elements": [], "uses_sdk": {}, "has_application": False}
+    return parse_manifest(data)
+
+
+def parse_placeholders(value):
+    """manifestPlaceholders do Gradle: '[a: "x", b: "y"]' ou 'mapOf("a" to "x")' -> dict"""
+    if not value:
+        return {}
+    return dict(_PLACEHOLDER_ENTRY.findall(value))
+
+
+def _substitute(value, placeholders, unresolved):
+    def replace(m):
+        if m.group(1) in placeholders:
+            return placeholders[m.group(1)]
+        unresolved.add(m.group(1))
+        return m.group(0)
+
+    return _PLACEHOLDER.sub(replace, value) if "${" in value else value
+
+
+def _apply_placeholders(record, placeholders, unresolved):
+    record = dict(record)
+    record["attrs"] = {name: _substitute(value, placeholders, unresolved) for name, value in record["attrs"].items()}
+    record["children"] = [_substitute(child, placeholders, unresolved) for child in record["children"]]
+    if record["key"] != record["tag"]:
+        record["key"] = _substitute(record["key"], placeholders, unresolved)
+    return record
+
+
+def merge_manifests(manifests, placeholders=None, min_sdk=None, app_count=1):
+    """Mescla manifests em ordem de prioridade (os `app_count` primeiros são do app)
+
+    `manifests` é uma lista de (origem, manifest analisado). Retorna o manifest mesclado com
+    permissões, componentes, origem de cada elemento e os erros que o merger do Android acusaria.
+    """
+    placeholders = dict(placeholders or {})
+    merged = {}
+    sources = {}
+    removed = {}
+    removed_tags = {}
+    errors = []
+    unresolved = {}
+    override_library = set()
+
+    for position, (source, manifest) in enumerate(manifests):
+        missing = set()
+        for record in manifest["elements"]:
+            record = _apply_placeholders(record, placeholders, missing)
+            slot = (record["parent"], record["tag"], record["key"])
+            node = record["node"]
+            # Marcadores de remoção valem para os manifests de prioridade menor
+            if node == "remove":
+                removed.setdefault(slot, source)
+                continue
+            if node == "removeAll":
+                removed_tags.setdefault((record["parent"], record["tag"]), source)
+                continue
+            if slot in removed or (record["parent"], record["tag"]) in removed_tags:
+                continue
+            existing = merged.get(slot)
+            if existing is None:
+                merged[slot] = record
+                sources[slot] = [source]
+                continue
+            sources[slot].append(source)
+            if existing["node"] == "replace":
+                continue
+            for name, value in record["attrs"].items():
+                if name in existing["remove"] or name in existing["replace"]:
+                    continue
+                current = existing["attrs"].get(name)
+                if current is None:
+                    existing["attrs"][name] = value
+                elif current != value:
+                    errors.append(
+                        f"<{record['tag']}> {record['key']}: {name}={current!r} ({sources[slot][0]}) "
+                        f"conflita com {value!r} ({source}); use tools:replace=\"{name}\""
+                    )
+            if existing["node"] == "strict" and record["children"] != existing["children"]:
+                errors.append(f"<{record['tag']}> {record['key']}: filhos diferentes em {source} (tools:node=\"strict\")")
+            elif existing["node"] != "merge-only-attributes":
+                removed_children = set(existing["removed_children"])
+                children = set(existing["children"])
+                children.update(
+                    child for child in record["children"]
+                    if not removed_children or _child_key(child) not in removed_children
+                )
+                existing["children"] = sorted(children)
+        if missing:
+            unresolved[source] = sorted(missing)
+
+        uses_sdk = manifest.get("uses_sdk") or {}
+        if position < app_count:
+            override_library.update(_split_list(uses_sdk.get("tools", {}).get("overrideLibrary")))
+            continue
+        library_min = uses_sdk.get("attrs", {}).get("android:minSdkVersion")
+        if min_sdk and library_min and library_min.isdigit() and str(min_sdk).isdigit() \
+                and int(library_min) > int(min_sdk) and manifest.get("package") not in override_library:
+            errors.append(f"minSdk {min_sdk} menor que o minSdk {library_min} exigido por {source}")
+
+    for source, keys in unresolved.items():
+        errors.append(f"Placeholders sem valor em {source}: {', '.join('${' + key + '}' for key in keys)}")
+
+    for record in merged.values():
+        for name in record["remove"]:
+            record["attrs"].pop(name, None)
+
+    app_sources = {source for source, _ in manifests[:app_count]}
+
+    def names(parent, tag):
+        return sorted(key for (p, t, key) in merged if p == parent and t == tag)
+
+    permissions = sorted({key for (parent, tag, key) in merged if parent == "manifest" and tag in PERMISSION_TAGS})
+    return {
+        "permissions": permissions,
+        "library_permissions": sorted(
+            key for (parent, tag, key) in merged
+            if parent == "manifest" and tag in PERMISSION_TAGS and app_sources.isdisjoint(sources[(parent, tag, key)])
+        ),
+        "declared_permissions": names("manifest", "permission"),
+        "features": names("manifest", "uses-feature"),
+        "components": {tag: names("application", tag) for tag in COMPONENT_TAGS},
+        "library_components": sum(
+            1 for (parent, tag, key), origin in sources.items()
+            if parent == "application" and tag in COMPONENT_TAGS and app_sources.isdisjoint(origin)
+        ),
+        "sources": {f"{tag}:{key}": origin for (parent, tag, key), origin in sources.items() if tag not in SINGLE_TAGS},
+        "removed": sorted(f"{tag}:{key}" for (_, tag, key) in removed),
+        "elements": [
+            {"parent": record["parent"], "tag": record["tag"], "attrs": record["attrs"], "children": record["children"]}
+            for record in merged.values()
+        ],
+        "errors": errors,
+    }
+
+
+def read_app_manifest(index, entry_or_rel, package=None):
+    """Manifest do projeto analisado uma vez por execução (compartilhado entre etapas e suítes)"""
+    return get_parse_cache().parsed(
+        index, entry_or_rel, f"manifest:{package or ''}", lambda data: parse_manifest(data, package)
+    )
+
+
+def app_manifests(index, variant=DEFAULT_VARIANT, package=None):
+    """Manifests do módulo app em ordem de prioridade: src/<variante> e src/main"""
+    found = []
+    for source_set in (variant, "main"):
+        if not source_set:
+            continue
+        entry = index.get(f"app/src/{source_set}/AndroidManifest.xml")
+        if entry is not None:
+            found.append((f"app ({source_set})", read_app_manifest(index, entry, package)))
+    return found
+
+
+def library_manifests(model, repository, cache=None):
+    """[(módulo, manifest)] das dependências empacotadas, na ordem de declaração
+
+    Retorna (manifests, dependências fora do cache local, {caminho: erro}).
+    """
+    from dex_count import packaged_dependencies
+
+    manifests = []
+    missing = []
+    errors = {}
+    for dep in packaged_dependencies(model):
+        path = repository.find_artifact(dep.group, dep.name, dep.version)
+        if path is None:
+            missing.append(f"{dep.module}:{dep.version}")
+            continue
+        try:
+            if cache is not None:
+                manifest = cache.lookup(path, MANIFEST_CACHE_KIND, read_aar_manifest)
+            else:
+                manifest = read_aar_manifest(path)
+        except (OSError, ValueError) as e:
+            errors[str(path)] = str(e)
+            continue
+        if manifest["elements"] or manifest["uses_sdk"]:
+            manifests.append((f"{dep.module}:{dep.version}", manifest))
+    return manifests, missing, errors
+
+
+def merge_project_manifest(index, model, repository, cache=None, variant=DEFAULT_VARIANT):
+    """Manifest mesclado do módulo app com as bibliotecas encontradas no cache local"""
+    namespace = model.android_field("namespace") if model is not None else None
+    manifests = app_manifests(index, variant, namespace)
+    if not manifests:
+        raise ManifestError("AndroidManifest.xml não encontrado")
+    if not any(manifest["has_application"] for _, manifest in manifests):
+        raise ManifestError("Elemento <application> não encontrado")
+
+    libraries, missing, errors = ([], [], {})
+    placeholders = {}
+    min_sdk = None
+    if model is not None:
+        libraries, missing, errors = library_manifests(model, repository, cache)
+        placeholders = parse_placeholders(model.android_field("manifestPlaceholders"))
+        min_sdk = model.android_field("minSdk")
+    package = model.android_field("applicationId") if model is not None else None
+    package = package or namespace or manifests[-1][1]["package"]
+    if package:
+        placeholders.setdefault("applicationId", package)
+        placeholders.setdefault("packageName", package)
+
+    merged = merge_manifests(manifests + libraries, placeholders, min_sdk, app_count=len(manifests))
+    merged["package"] = package
+    merged["libraries"] = len(libraries)
+    merged["missing"] = missing
+    merged["artifact_errors"] = errors
+    return merged
+
+
+def describe_components(merged):
+    parts = [
+        f"{len(merged['components'][tag])} {COMPONENT_LABELS[tag]}"
+        for tag in COMPONENT_TAGS if merged["components"][tag] or tag == "activity"
+    ]
+    parts.append(f"{len(merged['permissions'])} permissões")
+    return ", ".join(parts)
+
+
+def main():
+    import argparse
+
+    from gradle_cache import LocalArtifactRepository
+    from gradle_model import load_project_models
+    from project_index import DEFAULT_PROJECT_ROOT, get_project_index
+
+    parser = argparse.ArgumentParser(description="Manifest mesclado do app com as bibliotecas do cache local")
+    parser.add_argument("--root", default=str(DEFAULT_PROJECT_ROOT), help="Raiz do projeto Android")
+    parser.add_argument("--variant", default=DEFAULT_VARIANT, help="Variante cujo source set tem prioridade")
+    parser.add_argument("--no-cache", action="store_true", help="Não usa nem grava o cache de artefatos")
+    parser.add_argument("--json", action="store_true", help="Imprime o manifest mesclado em JSON")
+    args = parser.parse_args()
+
+    from artifact_cache import get_artifact_cache
+
+    index = get_project_index(args.root)
+    cache = get_artifact_cache(args.root, enabled=not args.no_cache)
+    _, model = load_project_models(index)
+    try:
+        merged = merge_project_manifest(index, model, LocalArtifactRepository(), cache, args.variant)
+    except ManifestError as e:
+        print(f"❌ {e}")
+        return 2
+    cache.save()
+
+    if args.json:
+        json.dump(merged, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        print(f"📄 Manifest mesclado de {merged['package']} ({merged['libraries']} bibliotecas com manifest)")
+        print(f"  Permissões ({len(merged['permissions'])}):")
+        for name in merged["permissions"]:
+            origin = merged["sources"].get(f"uses-permission:{name}") or \
+                merged["sources"].get(f"uses-permission-sdk-23:{name}", [])
+            print(f"    • {name}  ← {', '.join(origin)}")
+        for tag in COMPONENT_TAGS:
+            if merged["components"][tag]:
+                print(f"  {COMPONENT_LABELS[tag].capitalize()} ({len(merged['components'][tag])}):")
+                for name in merged["components"][tag]:
+                    print(f"    • {name}  ← {', '.join(merged['sources'][f'{tag}:{name}'])}")
+        if merged["removed"]:
+            print(f"  Removidos por tools:node: {', '.join(merged['removed'])}")
+        if merged["missing"]:
+            print(f"  ⚠️  {len(merged['missing'])} dependências fora do cache local")
+    if merged["errors"] and not args.json:
+        print("❌ ERROS DE MERGE:")
+        for error in merged["errors"]:
+            print(f"  • {error}")
+    return 1 if merged["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
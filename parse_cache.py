@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Cache em memória dos artefatos já analisados nesta execução (manifests, modelos do Gradle e, sem o cache
+de verificações em disco, os fatos por arquivo)
+Compartilhado por todas as etapas do processo e limitado em bytes: os menos usados recentemente saem primeiro
+"""
+
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+# Quanto cada análise ocupa em relação aos bytes do arquivo (medido com tracemalloc; arquivos pequenos
+# pesam mais, daí o custo fixo por item)
+SIZE_FACTORS = {
+    "manifest": 6,
+    "gradle": 8,
+    "facts": 6,
+    # Só o cabeçalho da imagem é analisado: o resultado não cresce com o arquivo
+    "facts:image": 0,
+}
+ITEM_OVERHEAD = 512
+
+
+def _kind_family(kind):
+    return kind.split(":", 1)[0]
+
+
+class ParseCache:
+    """LRU de (arquivo, análise) -> resultado, limitado pelo tamanho estimado dos resultados
+
+    A chave inclui tamanho, mtime e blob do arquivo, então uma alteração (modo --watch, árvores git)
+    nunca devolve uma análise antiga. Os resultados são compartilhados: quem os recebe não deve alterá-los.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.peak_bytes = 0
+        self.evictions = 0
+        self.stats = {}  # família -> [acertos, faltas]
+        self._items = OrderedDict()  # chave -> (resultado, bytes)
+        self._loading = {}  # chave -> Lock de quem está analisando
+        self._lock = threading.Lock()
+
+    def _count(self, kind, hit):
+        counters = self.stats.setdefault(_kind_family(kind), [0, 0])
+        counters[0 if hit else 1] += 1
+
+    def get(self, key, kind, load):
+        """Resultado em cache para `key`, ou `load()` -> (resultado, bytes) uma única vez mesmo entre threads"""
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+                self._count(kind, True)
+                return item[0]
+            loading = self._loading.get(key)
+            if loading is None:
+                loading = self._loading[key] = threading.Lock()
+        with loading:
+            with self._lock:
+                item = self._items.get(key)
+                if item is not None:
+                    # Outra thread analisou enquanto esta esperava
+                    self._items.move_to_end(key)
+                    self._count(kind, True)
+                    return item[0]
+                self._count(kind, False)
+            try:
+                value, size = load()
+                self._store(key, value, size)
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+        return value
+
+    def _store(self, key, value, size):
+        with self._lock:
+            if size > self.max_bytes:
+                return  # maior que o limite inteiro: usado e descartado
+            self._items[key] = (value, size)
+            self.bytes += size
+            self._evict()
+            self.peak_bytes = max(self.peak_bytes, self.bytes)
+
+    def _evict(self):
+        # Chamado com o lock: descarta os menos usados recentemente até caber no limite
+        while self.bytes > self.max_bytes and self._items:
+            _, (_, evicted) = self._items.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+
+    def resize(self, max_bytes):
+        """Troca o limite de memória; itens além do novo limite são descartados na hora"""
+        if max_bytes <= 0:
+            raise ValueError("O limite de memória do cache deve ser positivo")
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def parsed(self, index, entry_or_rel, kind, parse):
+        """`parse(bytes)` do arquivo indexado, feito uma vez por conteúdo
+
+        `kind` identifica a análise (ex.: "xml", "manifest:com.app"); a família antes de ':' define a
+        estimativa de memória.
+        """
+        entry = entry_or_rel
+        if isinstance(entry, str):
+            entry = index.get(entry)
+            if entry is None:
+                raise FileNotFoundError(index.project_root / entry_or_rel)
+        key = (str(index.project_root), entry.rel, entry.size, entry.mtime_ns, entry.oid, kind)
+
+        def load():
+            data = index.read_bytes(entry)
+            return parse(data), ITEM_OVERHEAD + len(data) * SIZE_FACTORS.get(kind, SIZE_FACTORS.get(_kind_family(kind), 8))
+
+        return self.get(key, kind, load)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.bytes = 0
+
+    def summary(self):
+        """Acertos, faltas e memória, no total e por família de análise"""
+        with self._lock:
+            hits = sum(counters[0] for counters in self.stats.values())
+            misses = sum(counters[1] for counters in self.stats.values())
+            return {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": 100.0 * hits / (hits + misses) if hits + misses else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._items),
+                "bytes": self.bytes,
+                "peak_bytes": self.peak_bytes,
+                "max_bytes": self.max_bytes,
+                "kinds": {kind: {"hits": counters[0], "misses": counters[1]}
+                          for kind, counters in sorted(self.stats.items())},
+            }
+
+
+def format_summary(summary):
+    """Linhas de texto com as estatísticas do cache"""
+    lines = [
+        f"🧠 Cache de análises: {summary['hits']} acertos, {summary['misses']} faltas "
+        f"({summary['hit_rate']:.1f}%), {summary['evictions']} descartes; "
+        f"{summary['entries']} itens, pico {summary['peak_bytes'] / 1024 / 1024:.1f} MB "
+        f"de {summary['max_bytes'] / 1024 / 1024:.0f} MB"
+    ]
+    for kind, counters in summary["kinds"].items():
+        lines.append(f"   {kind:<10} {counters['hits']:>6} acertos  {counters['misses']:>6} faltas")
+    return lines
+
+
+_parse_cache = ParseCache()
+
+
+def get_parse_cache():
+    """Cache de análises do processo (um só para todas as raízes e suítes)"""
+    return _parse_cache
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Índice de arquivos do projeto para os scripts de teste do Email Assistant
+Percorre a árvore uma única vez com os.scandir e é compartilhado por todas as etapas
+"""
+
+import os
+import threading
+from pathlib import Path
+
+# Raiz usada quando nenhuma é informada (--root)
+DEFAULT_PROJECT_ROOT = Path("/home/ubuntu/EmailAssistantApp")
+
+# Diretórios de ferramentas que nunca devem ser percorridos, em qualquer nível
+SKIPPED_DIRS = {".gradle", ".git"}
+# Saída do Gradle: ignorada só quando fica na raiz de um módulo (um pacote Kotlin ou diretório de
+# recursos chamado "build" é código do projeto)
+BUILD_DIR = "build"
+MODULE_MARKERS = ("build.gradle", "build.gradle.kts", "settings.gradle", "settings.gradle.kts")
+
+# Agrupamento das extensões usadas pelas etapas de verificação
+EXTENSION_BUCKETS = {
+    ".kt": "kotlin",
+    ".xml": "xml",
+    ".gradle": "gradle",
+    ".kts": "gradle",
+    ".png": "image",
+    ".jpg": "image",
+    ".jpeg": "image",
+    ".webp": "image",
+    ".gif": "image",
+}
+
+
+def is_skipped_path(parts, is_module_dir):
+    """Se o caminho (lista de componentes) passa por um diretório ignorado
+
+    `is_module_dir(componentes)` diz se o diretório com aqueles componentes é raiz de um módulo Gradle.
+    """
+    for position, part in enumerate(parts):
+        if part in SKIPPED_DIRS:
+            return True
+        if part == BUILD_DIR and is_module_dir(parts[:position]):
+            return True
+    return False
+
+
+def module_dir_on_disk(root):
+    """is_module_dir para uma árvore em disco: procura build.gradle/settings.gradle no diretório"""
+    root = str(root)
+
+    def is_module_dir(parts):
+        directory = os.path.join(root, *parts)
+        return any(os.path.isfile(os.path.join(directory, marker)) for marker in MODULE_MARKERS)
+
+    return is_module_dir
+
+
+class FileEntry:
+    """Metadados de um arquivo indexado"""
+
+    __slots__ = ("abspath", "rel", "size", "mtime_ns", "bucket", "oid")
+
+    def __init__(self, abspath, rel, size, mtime_ns, bucket, oid=None):
+        self.abspath = abspath
+        self.rel = rel
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.bucket = bucket
+        # Id do blob quando o arquivo vem de um objeto git (identifica o conteúdo sem lê-lo)
+        self.oid = oid
+
+    @property
+    def path(self):
+        return Path(self.abspath)
+
+    @property
+    def name(self):
+        return self.rel.rpartition("/")[2]
+
+    @property
+    def mtime(self):
+        return self.mtime_ns / 1e9
+
+    def __repr__(self):
+        return f"FileEntry({self.rel!r}, size={self.size}, bucket={self.bucket!r})"
+
+
+def bucket_for(name):
+    """Retorna o grupo de extensão de um nome de arquivo"""
+    return EXTENSION_BUCKETS.get(os.path.splitext(name)[1].lower(), "other")
+
+
+class ProjectIndex:
+    """Índice único (caminho, tamanho, mtime, grupo) de todos os arquivos do projeto"""
+
+    # Os arquivos existem em disco em `abspath` (falso para fontes como objetos git)
+    on_disk = True
+
+    def __init__(self, project_root):
+        self.project_root = Path(project_root)
+        self._entries = None
+        self._by_rel = {}
+        self._by_bucket = {}
+        self._dirs = set()
+        self._lock = threading.Lock()
+        # Incrementado a cada mudança no índice (invalida estruturas derivadas)
+        self.generation = 0
+        # Caminhos alterados quando só a diferença deve ser verificada (None: todos)
+        self.changed = None
+        # Consultas pontuais respondidas com stat antes do percurso completo
+        self._probed = {}
+        # (K, N) quando as verificações por arquivo são divididas entre máquinas (--shard K/N)
+        self.shard = None
+        self._shard_memo = {}
+
+    def build(self):
+        """Percorre a árvore do projeto uma única vez"""
+        entries = []
+        dirs = {""}
+        root = str(self.project_root)
+        stack = [(root, "")]
+
+        while stack:
+            dir_path, dir_rel = stack.pop()
+            try:
+                with os.scandir(dir_path) as it:
+                    items = list(it)
+                # build/ só é saída do Gradle ao lado de um build.gradle (ou settings.gradle)
+                module_dir = any(item.name in MODULE_MARKERS for item in items)
+                for item in items:
+                    rel = f"{dir_rel}/{item.name}" if dir_rel else item.name
+                    try:
+                        if item.is_dir(follow_symlinks=False):
+                            if item.name not in SKIPPED_DIRS and not (module_dir and item.name == BUILD_DIR):
+                                dirs.add(rel)
+                                stack.append((item.path, rel))
+                        elif item.is_file():
+                            st = item.stat()
+                            entries.append(FileEntry(
+                                item.path, rel, st.st_size, st.st_mtime_ns, bucket_for(item.name)
+                            ))
+                    except OSError:
+                        continue
+            except OSError:
+                continue
+
+        entries.sort(key=lambda entry: entry.rel)
+        by_bucket = {}
+        for entry in entries:
+            by_bucket.setdefault(entry.bucket, []).append(entry)
+
+        self._by_rel = {entry.rel: entry for entry in entries}
+        self._by_bucket = by_bucket
+        self._dirs = dirs
+        self._entries = entries
+        self._probed = {}
+        self.generation += 1
+
+    @property
+    def is_built(self):
+        """Verdadeiro depois que a árvore foi percorrida (consultas pontuais não percorrem)"""
+        return self._entries is not None
+
+    def _probe(self, rel):
+        # Sem percurso: um stat responde get/exists/is_dir de um caminho (verificações pontuais)
+        rel = rel.strip("/")
+        probed = self._probed.get(rel)
+        if probed is not None:
+            return probed
+        parts = rel.split("/") if rel else []
+        if is_skipped_path(parts, module_dir_on_disk(self.project_root)):
+            result = (None, False)
+        else:
+            path = os.path.join(str(self.project_root), *parts)
+            try:
+                st = os.stat(path)
+            except OSError:
+                result = (None, False)
+            else:
+                if os.path.isdir(path):
+                    result = (None, True)
+                else:
+                    result = (FileEntry(path, rel, st.st_size, st.st_mtime_ns, bucket_for(parts[-1])), False)
+        self._probed[rel] = result
+        return result
+
+    def _ensure_built(self):
+        if self._entries is None:
+            with self._lock:
+                if self._entries is None:
+                    self.build()
+
+    def refresh(self):
+        """Descarta o índice atual e percorre a árvore novamente"""
+        with self._lock:
+            self.build()
+
+    def update(self, rels):
+        """Atualiza o índice apenas para os caminhos alterados; retorna os que mudaram de fato"""
+        self._ensure_built()
+        changed = []
+        with self._lock:
+            by_rel = dict(self._by_rel)
+            dirs = set(self._dirs)
+            is_module_dir = module_dir_on_disk(self.project_root)
+            for rel in rels:
+                rel = rel.strip("/")
+                if not rel or is_skipped_path(rel.split("/"), is_module_dir):
+                    continue
+                path = self.project_root / rel
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    st = None
+
+                if st is None:
+                    # Arquivo ou diretório removido (inclusive tudo o que estava dentro)
+                    prefix = rel + "/"
+                    removed = [r for r in by_rel if r == rel or r.startswith(prefix)]
+                    for r in removed:
+                        del by_rel[r]
+                    dirs = {d for d in dirs if d != rel and not d.startswith(prefix)}
+                    changed.extend(removed)
+                elif os.path.isdir(path):
+                    # Diretório novo: indexar o conteúdo com um percurso limitado a ele
+                    sub_index = ProjectIndex(path)
+                    sub_index.build()
+                    parts = rel.split("/")
+                    dirs.update("/".join(parts[:i]) for i in range(1, len(parts) + 1))
+                    dirs.update(f"{rel}/{d}" for d in sub_index._dirs if d)
+                    for entry in sub_index._entries:
+                        entry.rel = f"{rel}/{entry.rel}"
+                        by_rel[entry.rel] = entry
+                        changed.append(entry.rel)
+                else:
+                    old = by_rel.get(rel)
+                    if old is not None and old.size == st.st_size and old.mtime_ns == st.st_mtime_ns:
+                        continue
+                    parts = rel.split("/")
+                    dirs.update("/".join(parts[:i]) for i in range(1, len(parts)))
+                    by_rel[rel] = FileEntry(str(path), rel, st.st_size, st.st_mtime_ns, bucket_for(parts[-1]))
+                    changed.append(rel)
+
+            if changed:
+                entries = sorted(by_rel.values(), key=lambda entry: entry.rel)
+                by_bucket = {}
+                for entry in entries:
+                    by_bucket.setdefault(entry.bucket, []).append(entry)
+                self._by_rel = by_rel
+                self._by_bucket = by_bucket
+                self._dirs = dirs
+                self._entries = entries
+                self.generation += 1
+        return changed
+
+    def files(self, bucket=None):
+        """Lista os arquivos indexados, opcionalmente filtrados por grupo"""
+        self._ensure_built()
+        if bucket is None:
+            return list(self._entries)
+        return list(self._by_bucket.get(bucket, ()))
+
+    def shard_files(self, bucket=None):
+        """Arquivos do grupo que cabem a este shard (todos quando não há divisão)"""
+        if self.shard is None:
+            return self.files(bucket)
+        from sharding import filter_shard
+
+        # A divisão de um grupo é calculada uma vez por geração do índice
+        key = (bucket, self.shard, self.generation)
+        files = self._shard_memo.get(key)
+        if files is None:
+            files = filter_shard(self.files(bucket), self.shard)
+            with self._lock:
+                self._shard_memo = {k: v for k, v in self._shard_memo.items() if k[2] == self.generation}
+                self._shard_memo[key] = files
+        return list(files)
+
+    def checked_files(self, bucket=None):
+        """Arquivos que as verificações por arquivo devem ler (só os alterados e os do shard, se houver restrição)"""
+        if self.changed is None:
+            return self.shard_files(bucket)
+        files = [entry for entry in self.files(bucket) if entry.rel in self.changed]
+        if self.shard is None:
+            return files
+        from sharding import filter_shard
+
+        return filter_shard(files, self.shard)
+
+    def files_under(self, rel_dir, bucket=None, recursive=True):
+        """Lista os arquivos dentro de um diretório relativo à raiz"""
+        prefix = rel_dir.strip("/") + "/"
+        result = []
+        for entry in self.files(bucket):
+            if entry.rel.startswith(prefix):
+                if recursive or "/" not in entry.rel[len(prefix):]:
+                    result.append(entry)
+        return result
+
+    def count(self, bucket=None):
+        """Quantidade de arquivos indexados no grupo"""
+        self._ensure_built()
+        if bucket is None:
+            return len(self._entries)
+        return len(self._by_bucket.get(bucket, ()))
+
+    def get(self, rel):
+        """Retorna a entrada de um caminho relativo, ou None"""
+        if self._entries is None and self.on_disk:
+            return self._probe(rel)[0]
+        self._ensure_built()
+        return self._by_rel.get(rel)
+
+    def exists(self, rel):
+        """Verifica se um arquivo ou diretório relativo existe no índice"""
+        if self._entries is None and self.on_disk:
+            entry, is_dir = self._probe(rel)
+            return entry is not None or is_dir
+        self._ensure_built()
+        rel = rel.strip("/")
+        return rel in self._by_rel or rel in self._dirs
+
+    def directories(self):
+        """Diretórios indexados (relativos à raiz; "" é a própria raiz)"""
+        self._ensure_built()
+        return set(self._dirs)
+
+    def is_dir(self, rel):
+        if self._entries is None and self.on_disk:
+            return self._probe(rel)[1]
+        self._ensure_built()
+        return rel.strip("/") in self._dirs
+
+    def _resolve(self, entry_or_rel):
+        if isinstance(entry_or_rel, FileEntry):
+            return entry_or_rel
+        entry = self.get(entry_or_rel)
+        if entry is None:
+            raise FileNotFoundError(self.project_root / entry_or_rel)
+        return entry
+
+    def read_bytes(self, entry_or_rel):
+        """Lê o conteúdo bruto de um arquivo indexado"""
+        entry = self._resolve(entry_or_rel)
+        with open(entry.abspath, 'rb') as f:
+            return f.read()
+
+    def read_text(self, entry_or_rel, encoding='utf-8'):
+        """Lê o conteúdo de um arquivo indexado como texto"""
+        return self.read_bytes(entry_or_rel).decode(encoding)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_project_index(project_root):
+    """Retorna o índice compartilhado da raiz informada (um percurso por execução)"""
+    key = str(Path(project_root))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = ProjectIndex(project_root)
+            _indexes[key] = index
+        return index
+
+
+def set_project_index(project_root, index):
+    """Troca o índice da raiz por outra fonte de arquivos (ex.: uma árvore git)"""
+    with _indexes_lock:
+        _indexes[str(Path(project_root))] = index
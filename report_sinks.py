@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Destinos de relatório dos scripts de teste do Email Assistant
+Cada resultado é gravado assim que a etapa termina (JSON Lines, JUnit XML ou o JSON de resumo)
+"""
+
+import json
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+
+# Formatos aceitos por --report e a extensão padrão de cada um
+REPORT_FORMATS = {"summary": ".json", "jsonl": ".jsonl", "junit": ".xml"}
+
+# Espaço reservado na tag <testsuite> para os totais, preenchido ao fechar
+_JUNIT_TOTALS_WIDTH = 96
+
+
+def report_timestamp(now=None):
+    """Data no mesmo formato do comando `date` usado pelos relatórios antigos"""
+    now = (now or datetime.now()).astimezone()
+    return f"{now:%a %b} {now.day:>2} {now:%H:%M:%S} {now.tzname()} {now.year}"
+
+
+class ReportSchema:
+    """Nomes dos campos de cada suíte (o relatório de build usa step/success, o de testes test/passed)"""
+
+    def __init__(self, suite, results_key, name_key, status_key):
+        self.suite = suite
+        self.results_key = results_key
+        self.name_key = name_key
+        self.status_key = status_key
+
+
+class ReportSink(ABC):
+    """Recebe os resultados na ordem do relatório; close() recebe os totais"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def open(self, schema, timestamp):
+        self.schema = schema
+        self.timestamp = timestamp
+
+    @abstractmethod
+    def write(self, result):
+        """Grava um resultado assim que a etapa termina"""
+
+    def close(self, summary):
+        pass
+
+
+class JsonLinesSink(ReportSink):
+    """Uma linha JSON por evento (início, cada resultado, resumo), com flush imediato"""
+
+    def open(self, schema, timestamp):
+        super().open(schema, timestamp)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._emit({"type": "start", "suite": schema.suite, "timestamp": timestamp})
+
+    def _emit(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def write(self, result):
+        self._emit(dict(result, type="result"))
+
+    def close(self, summary):
+        self._emit(dict(summary, type="summary", finished=report_timestamp()))
+        self._file.close()
+
+
+class JUnitSink(ReportSink):
+    """JUnit XML: cada resultado vira um <testcase> gravado na hora; os totais entram ao fechar"""
+
+    def open(self, schema, timestamp):
+        from xml.sax.saxutils import quoteattr
+
+        super().open(schema, timestamp)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._tests = 0
+        self._failures = 0
+        self._time = 0.0
+        self._file.write('<?xml version="1.0" encoding="UTF-8"?>\n<testsuites>\n')
+        self._file.write(f"  <testsuite name={quoteattr(schema.suite)} timestamp={quoteattr(timestamp)}")
+        self._file.flush()
+        self._totals_offset = self._file.tell()
+        self._file.write(" " * _JUNIT_TOTALS_WIDTH + ">\n")
+        self._file.flush()
+
+    def write(self, result):
+        # xml.sax importa urllib: carregado só quando o formato junit é pedido
+        from xml.sax.saxutils import escape, quoteattr
+
+        name = result[self.schema.name_key]
+        seconds = (result.get("metrics") or {}).get("wall_time_s", 0.0)
+        self._tests += 1
+        self._time += seconds
+        case = f"    <testcase classname={quoteattr(self.schema.suite)} name={quoteattr(name)} time=\"{seconds:.3f}\""
+        if result[self.schema.status_key]:
+            self._file.write(case + " />\n")
+        else:
+            self._failures += 1
+            message = result.get("message", "")
+            self._file.write(
+                f"{case}>\n      <failure message={quoteattr(message)}>{escape(message)}</failure>\n    </testcase>\n"
+            )
+        self._file.flush()
+
+    def close(self, summary):
+        self._file.write("  </testsuite>\n</testsuites>\n")
+        totals = f' tests="{self._tests}" failures="{self._failures}" errors="0" time="{self._time:.3f}"'
+        self._file.seek(self._totals_offset)
+        self._file.write(totals.ljust(_JUNIT_TOTALS_WIDTH))
+        self._file.close()
+
+
+class SummaryJsonSink(ReportSink):
+    """O relatório JSON de sempre; os resultados vão para um arquivo temporário até o fechamento"""
+
+    def open(self, schema, timestamp):
+        super().open(schema, timestamp)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._spool_path = self.path.with_name(self.path.name + ".partial")
+        self._spool = open(self._spool_path, "w+", encoding="utf-8")
+
+    def write(self, result):
+        self._spool.write(json.dumps(result) + "\n")
+        self._spool.flush()
+
+    def close(self, summary):
+        # Mesmo layout de json.dump(indent=2): totais primeiro, depois a lista de resultados
+        header = json.dumps(dict({"timestamp": self.timestamp}, **summary), indent=2)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w") as out:
+            out.write(header[:-2])
+            out.write(f',\n  "{self.schema.results_key}": [')
+            self._spool.seek(0)
+            first = True
+            for line in self._spool:
+                item = json.dumps(json.loads(line), indent=2).replace("\n", "\n    ")
+                out.write(("\n    " if first else ",\n    ") + item)
+                first = False
+            out.write("]\n}" if first else "\n  ]\n}")
+        self._spool.close()
+        os.replace(tmp_path, self.path)
+        os.unlink(self._spool_path)
+
+
+_SINKS = {"summary": SummaryJsonSink, "jsonl": JsonLinesSink, "junit": JUnitSink}
+
+
+def parse_report_spec(spec):
+    """Separa 'formato' ou 'formato:caminho' (--report) em (formato, caminho); valida o formato"""
+    kind, _, path = spec.partition(":")
+    if kind not in REPORT_FORMATS:
+        raise ValueError(f"Formato de relatório desconhecido: {kind} (use {', '.join(REPORT_FORMATS)})")
+    return kind, path
+
+
+def make_sink(spec, default_stem):
+    """Cria um destino a partir de 'formato' ou 'formato:caminho' (--report)"""
+    kind, path = parse_report_spec(spec)
+    return _SINKS[kind](path or f"{default_stem}{REPORT_FORMATS[kind]}")
+
+
+def make_sinks(specs, default_stem):
+    """Destinos pedidos em --report; o JSON de resumo é sempre gravado (no caminho padrão se não indicado)"""
+    sinks = [make_sink(spec, default_stem) for spec in specs or ()]
+    if not any(isinstance(sink, SummaryJsonSink) for sink in sinks):
+        sinks.insert(0, SummaryJsonSink(f"{default_stem}.json"))
+    return sinks
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Índice de referências cruzadas dos recursos Android do Email Assistant
+Uma passada registra cada recurso definido em res/ e cada referência de XMLs, manifest e fontes Kotlin
+"""
+
+import io
+import re
+import threading
+import xml.etree.ElementTree as ET
+
+# Diretórios de res/ cujos arquivos definem um recurso pelo nome do arquivo
+FILE_RESOURCE_TYPES = {
+    "anim", "animator", "color", "drawable", "font", "interpolator", "layout",
+    "menu", "mipmap", "navigation", "raw", "transition", "xml",
+}
+
+# Tags de values/ e o tipo de recurso que definem
+VALUES_TAGS = {
+    "string": "string", "plurals": "plurals", "color": "color", "dimen": "dimen",
+    "style": "style", "integer": "integer", "bool": "bool", "fraction": "fraction",
+    "drawable": "drawable", "array": "array", "string-array": "array", "integer-array": "array",
+    "attr": "attr", "declare-styleable": "styleable",
+}
+
+# Tipos considerados na busca por recursos não usados (ids e atributos são ruído)
+UNUSED_CHECK_TYPES = {
+    "anim", "animator", "array", "color", "dimen", "drawable", "font", "layout", "menu",
+    "mipmap", "navigation", "plurals", "raw", "string", "style", "xml",
+}
+
+# Prefixos de recursos que vêm de bibliotecas (AppCompat, Material, Play Services...)
+LIBRARY_RESOURCE_PREFIXES = (
+    "abc_", "design_", "material_", "mtrl_", "m3_", "common_google_", "exo_",
+    "Theme_AppCompat", "Theme_Design", "Theme_Material", "Theme_MaterialComponents",
+    "ThemeOverlay_", "Widget_", "TextAppearance_", "ShapeAppearance", "Base_", "Platform_", "Animation_",
+)
+
+# @tipo/nome, @+id/nome e @pacote:tipo/nome (o pacote "android" é do framework)
+_XML_REFERENCE = re.compile(r'@(\+)?(?:([\w.]+):)?([a-z-]+)/([\w.]+)')
+# R.tipo.nome (começando pelo literal para o motor de regex usar o prefixo; a borda é conferida à parte)
+_KOTLIN_REFERENCE = re.compile(r'R\.(\w+)\.(\w+)')
+# Classes de ViewBinding são geradas no pacote <app>.databinding
+_BINDING_CLASS = re.compile(r'databinding\.(\w+)Binding\b')
+_CAMEL_BOUNDARY = re.compile(r'(?<!^)(?=[A-Z])')
+
+
+def resource_key(resource_type, name):
+    """Chave normalizada: o aapt troca '.' por '_' (Theme.App vira R.style.Theme_App)"""
+    return resource_type, name.replace(".", "_")
+
+
+def res_location(rel):
+    """(tipo_do_diretório, qualificador, nome) para arquivos em src/<set>/res/, senão None"""
+    parts = rel.split("/")
+    if len(parts) < 3 or parts[-3] != "res":
+        return None
+    if len(parts) >= 5 and parts[-5] != "src":
+        return None
+    directory = parts[-2]
+    resource_type, _, qualifier = directory.partition("-")
+    name = parts[-1].split(".", 1)[0]
+    return resource_type, qualifier, name
+
+
+def source_set_of(rel):
+    """(módulo, source set) de um arquivo em <módulo>/src/<set>/...; fora de src/ -> ("", "")"""
+    parts = rel.split("/")
+    for position in range(len(parts) - 2, -1, -1):
+        if parts[position] == "src":
+            return "/".join(parts[:position]), parts[position + 1]
+    return "", ""
+
+
+def is_manifest(rel):
+    return rel.rsplit("/", 1)[-1] == "AndroidManifest.xml"
+
+
+def _add_references(text, refs, defines):
+    for m in _XML_REFERENCE.finditer(text):
+        plus, package, resource_type, name = m.groups()
+        if package == "android":
+            continue
+        key = resource_key(resource_type, name)
+        if plus and resource_type == "id":
+            defines.add(key)
+        refs.add(key)
+
+
+def scan_resource_xml(data):
+    """Definições e referências de um XML de recursos ou manifest (uma passada em streaming)"""
+    defines = set()
+    refs = set()
+    soft = set()
+    tags = []
+    error = None
+    try:
+        for event, elem in ET.iterparse(io.BytesIO(data), events=("start", "end")):
+            if event == "start":
+                tags.append(elem.tag)
+                continue
+            tags.pop()
+            depth = len(tags)
+            for attr_value in elem.attrib.values():
+                _add_references(attr_value, refs, defines)
+            if elem.text and "@" in elem.text:
+                _add_references(elem.text, refs, defines)
+
+            if depth and tags[0] == "resources":
+                name = elem.get("name")
+                resource_type = elem.get("type") if elem.tag == "item" else VALUES_TAGS.get(elem.tag)
+                if name and resource_type and (depth == 1 or elem.tag == "attr"):
+                    defines.add(resource_key(resource_type, name))
+                if elem.tag == "style" and name:
+                    # Pai explícito (sem @) ou implícito pelo prefixo do nome: pode vir de biblioteca
+                    parent = elem.get("parent")
+                    if parent is None and "." in name:
+                        parent = name.rsplit(".", 1)[0]
+                    if parent and not parent.startswith(("@", "android:")):
+                        soft.add(resource_key("style", parent))
+            elem.clear()
+    except ET.ParseError as e:
+        error = str(e)
+    return {
+        "defines": sorted(defines),
+        "refs": sorted(refs),
+        "soft": sorted(soft),
+        "error": error,
+    }
+
+
+def scan_kotlin_references(code):
+    """Referências R.tipo.nome e classes de ViewBinding em código Kotlin já sem strings/comentários"""
+    refs = set()
+    for m in _KOTLIN_REFERENCE.finditer(code):
+        start = m.start()
+        if start and (code[start - 1].isalnum() or code[start - 1] in "_$"):
+            continue
+        # android.R.* é do framework (com.emailassistant.R.* continua valendo)
+        if start >= 8 and code.startswith("android.", start - 8) and (start == 8 or code[start - 9] not in "._$" and not code[start - 9].isalnum()):
+            continue
+        refs.add(resource_key(m.group(1), m.group(2)))
+    # ActivityMainBinding -> layout activity_main (só marca uso; não conta como referência faltando)
+    bindings = {_CAMEL_BOUNDARY.sub("_", m.group(1)).lower() for m in _BINDING_CLASS.finditer(code)}
+    return sorted(refs), sorted(bindings)
+
+
+class ResourceIndex:
+    """Definições e referências de recursos; as verificações são buscas em conjuntos"""
+
+    def __init__(self):
+        self.definitions = {}  # (tipo, nome) -> [(arquivo, qualificador)]
+        self.references = {}  # (tipo, nome) -> [arquivos que referenciam]
+        self.soft_references = set()  # usos que não exigem definição local (bibliotecas, bindings)
+        self.errors = {}
+
+    def define(self, key, rel, qualifier):
+        self.definitions.setdefault(key, []).append((rel, qualifier))
+
+    def reference(self, key, rel):
+        self.references.setdefault(key, []).append(rel)
+
+    def has(self, resource_type, name):
+        return resource_key(resource_type, name) in self.definitions
+
+    def count(self, resource_type=None):
+        if resource_type is None:
+            return len(self.definitions)
+        return sum(1 for key in self.definitions if key[0] == resource_type)
+
+    def _is_library(self, key):
+        return key[1].startswith(LIBRARY_RESOURCE_PREFIXES)
+
+    def _styleable_defined(self, name):
+        # R.styleable.Nome_atributo aponta para o declare-styleable "Nome"
+        prefix = name
+        while "_" in prefix:
+            prefix = prefix.rsplit("_", 1)[0]
+            if ("styleable", prefix) in self.definitions:
+                return True
+        return False
+
+    def missing(self):
+        """Referências sem definição no projeto: [((tipo, nome), [arquivos])]"""
+        result = []
+        for key in sorted(self.references.keys() - self.definitions.keys()):
+            if self._is_library(key):
+                continue
+            if key[0] == "styleable" and self._styleable_defined(key[1]):
+                continue
+            result.append((key, sorted(set(self.references[key]))))
+        return result
+
+    def unused(self):
+        """Recursos definidos que nada referencia: [(tipo, nome)]"""
+        used = self.references.keys() | self.soft_references
+        return sorted(key for key in self.definitions.keys() - used if key[0] in UNUSED_CHECK_TYPES)
+
+    def duplicates(self):
+        """Mesmo recurso definido mais de uma vez no mesmo qualificador do mesmo source set e módulo
+
+        Retorna [((tipo, nome, qualificador), [arquivos])]. Um source set (debug, um flavor) ou o app
+        redefinindo um recurso de outro módulo é sobrescrita legítima, não duplicata.
+        """
+        result = []
+        for key, places in self.definitions.items():
+            if key[0] == "id" or len(places) < 2:
+                continue
+            by_qualifier = {}
+            for rel, qualifier in places:
+                by_qualifier.setdefault((qualifier,) + source_set_of(rel), []).append(rel)
+            for (qualifier, _, _), rels in by_qualifier.items():
+                if len(rels) > 1:
+                    result.append((key + (qualifier,), sorted(rels)))
+        return sorted(result)
+
+
+def build_resource_index(index, cache):
+    """Percorre o índice de arquivos uma vez; o conteúdo vem do cache de verificações"""
+    resources = ResourceIndex()
+    for entry in index.files():
+        rel = entry.rel
+        if entry.bucket == "kotlin":
+            facts = cache.facts(entry, "kotlin", index)
+            for key in facts["resource_refs"]:
+                resources.reference(tuple(key), rel)
+            resources.soft_references.update(("layout", name) for name in facts["binding_refs"])
+            continue
+
+        location = res_location(rel)
+        if location is not None:
+            resource_type, qualifier, name = location
+            if resource_type in FILE_RESOURCE_TYPES:
+                resources.define(resource_key(resource_type, name), rel, qualifier)
+        elif not (entry.bucket == "xml" and is_manifest(rel)):
+            continue
+
+        if entry.bucket != "xml":
+            continue
+        facts = cache.facts(entry, "resources", index)
+        if facts["error"]:
+            resources.errors[rel] = facts["error"]
+        qualifier = location[1] if location else ""
+        for key in facts["defines"]:
+            resources.define(tuple(key), rel, qualifier)
+        for key in facts["refs"]:
+            resources.reference(tuple(key), rel)
+        resources.soft_references.update(tuple(key) for key in facts["soft"])
+    return resources
+
+
+_resource_indexes = {}
+_resource_lock = threading.Lock()
+
+
+def get_resource_index(index, cache):
+    """Índice de recursos compartilhado pelas etapas (refeito quando o índice de arquivos muda)"""
+    root = str(index.project_root)
+    with _resource_lock:
+        generation, resources = _resource_indexes.get(root, (None, None))
+        if resources is None or generation != index.generation:
+            resources = build_resource_index(index, cache)
+            _resource_indexes[root] = (index.generation, resources)
+        return resources
+
+
+def format_resource(key):
+    return f"@{key[0]}/{key[1]}"
+
+
+def describe_missing(missing, limit=5):
+    """'@tipo/nome (arquivo)' para as primeiras referências sem recurso"""
+    items = [f"{format_resource(key)} ({rels[0].rsplit('/', 1)[-1]})" for key, rels in missing[:limit]]
+    if len(missing) > limit:
+        items.append(f"e mais {len(missing) - limit}")
+    return ", ".join(items)
+
+
+def describe_duplicates(duplicates, limit=5):
+    """'@tipo/nome [qualificador]' para os primeiros recursos duplicados"""
+    items = [f"{format_resource(key)} [{key[2] or 'padrão'}]" for key, _ in duplicates[:limit]]
+    if len(duplicates) > limit:
+        items.append(f"e mais {len(duplicates) - limit}")
+    return ", ".join(items)
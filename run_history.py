@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Histórico das execuções dos scripts de teste do Email Assistant em SQLite
+Cada execução acrescenta resultados, durações por etapa e estatísticas do projeto; a comparação
+aponta etapas e estatísticas que pioraram em relação à mediana das execuções anteriores
+"""
+
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+HISTORY_FILE = Path("build") / "run-history.sqlite"
+
+# Execuções anteriores que formam a linha de base
+DEFAULT_WINDOW = 10
+# Piora tolerada em relação à linha de base (%)
+DEFAULT_THRESHOLD_PERCENT = 25.0
+# Diferenças de duração menores que isso são ruído (etapas de milissegundos variam muito em %)
+DEFAULT_MIN_DELTA_S = 0.05
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    suite TEXT NOT NULL,
+    project TEXT NOT NULL,
+    source TEXT,
+    selection TEXT,
+    cache_mode TEXT,
+    started_at REAL NOT NULL,
+    total INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    step_time_s REAL
+);
+CREATE INDEX IF NOT EXISTS runs_by_suite ON runs (suite, project, id);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    wall_time_s REAL,
+    cpu_time_s REAL,
+    files_opened INTEGER,
+    bytes_read INTEGER,
+    message TEXT,
+    PRIMARY KEY (run_id, name)
+);
+CREATE INDEX IF NOT EXISTS steps_by_name ON steps (name, run_id);
+CREATE TABLE IF NOT EXISTS stats (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (run_id, name)
+);
+CREATE INDEX IF NOT EXISTS stats_by_name ON stats (name, run_id);
+"""
+
+
+# Colunas acrescentadas depois da primeira versão do banco (bancos antigos ganham as colunas ao abrir)
+ADDED_RUN_COLUMNS = {"selection": "TEXT", "cache_mode": "TEXT"}
+
+# Seleção gravada para execuções com todas as verificações
+FULL_SELECTION = "all"
+
+
+def history_path(project_root):
+    return Path(project_root) / HISTORY_FILE
+
+
+def connect(path):
+    """Abre (e cria, se preciso) o banco de histórico"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(str(path), timeout=10)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA foreign_keys=ON")
+    connection.executescript(SCHEMA)
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(runs)")}
+    for column, column_type in ADDED_RUN_COLUMNS.items():
+        if column not in columns:
+            connection.execute(f"ALTER TABLE runs ADD COLUMN {column} {column_type}")
+    return connection
+
+
+def record_run(project_root, suite, step_results, step_metrics, statistics=None, status_key="success",
+               source=None, selection=FULL_SELECTION, cache_mode=None, path=None):
+    """Acrescenta uma execução ao histórico; retorna o id da execução
+
+    `step_results` é {etapa: [resultados]} e `step_metrics` é {etapa: métricas}, como nos testers.
+    `selection` (verificações executadas) e `cache_mode` separam as execuções comparáveis entre si.
+    """
+    rows = []
+    for name, records in step_results.items():
+        metrics = step_metrics.get(name, {})
+        failed = [record for record in records if not record[status_key]]
+        message = (failed or records or [{}])[0].get("message", "")
+        rows.append((
+            name, 0 if failed else 1, metrics.get("wall_time_s"), metrics.get("cpu_time_s"),
+            metrics.get("files_opened"), metrics.get("bytes_read"), message,
+        ))
+    # Soma das durações das etapas (com etapas em paralelo, maior que o tempo de parede)
+    step_time = sum(row[2] or 0.0 for row in rows)
+    failed_total = sum(1 for row in rows if not row[1])
+
+    connection = connect(path or history_path(project_root))
+    try:
+        with connection:
+            cursor = connection.execute(
+                "INSERT INTO runs (suite, project, source, selection, cache_mode, started_at, total, failed, step_time_s) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (suite, str(Path(project_root).resolve()), source, selection, cache_mode, time.time(), len(rows),
+                 failed_total, step_time),
+            )
+            run_id = cursor.lastrowid
+            connection.executemany(
+                "INSERT INTO steps (run_id, name, success, wall_time_s, cpu_time_s, files_opened, bytes_read, message) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, *row) for row in rows],
+            )
+            connection.executemany(
+                "INSERT INTO stats (run_id, name, value) VALUES (?, ?, ?)",
+                [(run_id, name, value) for name, value in sorted((statistics or {}).items()) if value is not None],
+            )
+    finally:
+        connection.close()
+    return run_id
+
+
+def save_tester_run(tester, suite, status_key):
+    """Grava a execução de um tester no histórico de sua raiz (avisa e segue se não for possível)"""
+    index = tester.index
+    source = None if index.on_disk else f"git:{getattr(index, 'tree', '')}"
+    # --only/--skip e o modo --watch executam parte das verificações: só comparáveis com a mesma parte
+    ran = sorted(tester._step_results)
+    selection = FULL_SELECTION if set(ran) >= {check.name for check in tester.CHECKS} else ",".join(ran)
+    cache_mode = "cache" if tester.use_cache else "no-cache"
+    try:
+        return record_run(
+            tester.project_root, suite, tester._step_results, tester._step_metrics,
+            tester.statistics, status_key=status_key, source=source, selection=selection, cache_mode=cache_mode,
+        )
+    except (OSError, sqlite3.Error) as e:
+        print(f"⚠️  Não foi possível gravar o histórico de execuções: {e}")
+        return None
+
+
+def _median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+
+def latest_run(connection, suite, project=None):
+    query = "SELECT id FROM runs WHERE suite = ?"
+    params = [suite]
+    if project is not None:
+        query += " AND project = ?"
+        params.append(project)
+    row = connection.execute(query + " ORDER BY id DESC LIMIT 1", params).fetchone()
+    return row[0] if row else None
+
+
+def _baseline_runs(connection, run_id, window):
+    # Só execuções nas mesmas condições: mesma origem (disco ou --git), mesmas verificações e mesmo cache
+    suite, project, source, selection, cache_mode = connection.execute(
+        "SELECT suite, project, source, selection, cache_mode FROM runs WHERE id = ?", (run_id,)
+    ).fetchone()
+    # A origem --git grava a árvore do commit: qualquer commit serve de base, mas não o disco
+    source_filter = "source LIKE 'git:%'" if source and source.startswith("git:") else "source IS NULL"
+    return [row[0] for row in connection.execute(
+        f"SELECT id FROM runs WHERE suite = ? AND project = ? AND id < ? AND {source_filter} "
+        "AND selection IS ? AND cache_mode IS ? ORDER BY id DESC LIMIT ?",
+        (suite, project, run_id, selection, cache_mode, window),
+    )]
+
+
+def compare_run(connection, run_id, window=DEFAULT_WINDOW, threshold_percent=DEFAULT_THRESHOLD_PERCENT,
+                min_delta_s=DEFAULT_MIN_DELTA_S):
+    """Compara a execução com a mediana das `window` anteriores do mesmo projeto e suíte, feitas nas mesmas
+    condições (origem, verificações selecionadas e modo de cache)
+
+    Retorna {"baseline_runs", "steps": [...], "stats": [...], "regressions": [mensagem]}.
+    """
+    baseline_ids = _baseline_runs(connection, run_id, window)
+    placeholders = ",".join("?" * len(baseline_ids))
+    limit = 1 + threshold_percent / 100
+    report = {"run_id": run_id, "baseline_runs": len(baseline_ids), "steps": [], "stats": [], "regressions": []}
+
+    previous_steps = {}
+    previous_stats = {}
+    if baseline_ids:
+        for name, success, wall_time in connection.execute(
+                f"SELECT name, success, wall_time_s FROM steps WHERE run_id IN ({placeholders})", baseline_ids):
+            previous_steps.setdefault(name, []).append((success, wall_time))
+        for name, value in connection.execute(
+                f"SELECT name, value FROM stats WHERE run_id IN ({placeholders})", baseline_ids):
+            previous_stats.setdefault(name, []).append(value)
+
+    for name, success, wall_time in connection.execute(
+            "SELECT name, success, wall_time_s FROM steps WHERE run_id = ? ORDER BY rowid", (run_id,)):
+        history = previous_steps.get(name, [])
+        times = [value for _, value in history if value is not None]
+        baseline = _median(times) if times else None
+        row = {"name": name, "success": bool(success), "wall_time_s": wall_time, "baseline_s": baseline}
+        report["steps"].append(row)
+        if not success and history and all(ok for ok, _ in history):
+            report["regressions"].append(f"{name}: passou nas {len(history)} execuções anteriores e agora falhou")
+        if baseline is not None and wall_time is not None \
+                and wall_time - baseline >= min_delta_s and wall_time > baseline * limit:
+            report["regressions"].append(
+                f"{name}: {wall_time:.3f}s contra mediana de {baseline:.3f}s "
+                f"(+{(wall_time / baseline - 1) * 100 if baseline else float('inf'):.0f}%)"
+            )
+
+    for name, value in connection.execute("SELECT name, value FROM stats WHERE run_id = ? ORDER BY name", (run_id,)):
+        values = previous_stats.get(name, [])
+        baseline = _median(values) if values else None
+        report["stats"].append({"name": name, "value": value, "baseline": baseline})
+        if baseline is not None and value > baseline * limit and value > baseline:
+            growth = f"+{(value / baseline - 1) * 100:.0f}%" if baseline else "antes 0"
+            report["regressions"].append(f"{name}: {value:g} contra mediana de {baseline:g} ({growth})")
+    return report
+
+
+def series(connection, name, suite, project=None, limit=20):
+    """Valores de uma etapa (duração) ou estatística nas últimas execuções: [(id, started_at, valor, sucesso)]"""
+    params = [name, suite]
+    project_filter = ""
+    if project is not None:
+        project_filter = " AND runs.project = ?"
+        params.append(project)
+    params.append(limit)
+    rows = connection.execute(
+        "SELECT runs.id, runs.started_at, steps.wall_time_s, steps.success FROM steps "
+        "JOIN runs ON runs.id = steps.run_id WHERE steps.name = ? AND runs.suite = ?"
+        f"{project_filter} ORDER BY runs.id DESC LIMIT ?", params,
+    ).fetchall()
+    if not rows:
+        rows = connection.execute(
+            "SELECT runs.id, runs.started_at, stats.value, 1 FROM stats "
+            "JOIN runs ON runs.id = stats.run_id WHERE stats.name = ? AND runs.suite = ?"
+            f"{project_filter} ORDER BY runs.id DESC LIMIT ?", params,
+        ).fetchall()
+    return list(reversed(rows))
+
+
+def first_crossing(rows, limit):
+    """Primeira execução em que o valor passou de `limit` (depois de estar abaixo ou igual)"""
+    below = False
+    for row in rows:
+        if row[2] is None:
+            continue
+        if row[2] <= limit:
+            below = True
+        elif below:
+            return row
+    return None
+
+
+def _format_time(timestamp):
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(timestamp))
+
+
+def main():
+    import argparse
+
+    from project_index import DEFAULT_PROJECT_ROOT
+
+    parser = argparse.ArgumentParser(description="Histórico de execuções e detecção de regressões por etapa")
+    parser.add_argument("--root", default=str(DEFAULT_PROJECT_ROOT), help="Raiz do projeto (o histórico fica em build/)")
+    parser.add_argument("--db", help=f"Banco de histórico (padrão: <raiz>/{HISTORY_FILE})")
+    parser.add_argument("--suite", default="build", choices=("build", "integration"), help="Suíte consultada")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    runs_parser = commands.add_parser("runs", help="Lista as últimas execuções")
+    runs_parser.add_argument("--limit", type=int, default=20)
+
+    trend_parser = commands.add_parser("trend", help="Duração de uma etapa ou valor de uma estatística ao longo das execuções")
+    trend_parser.add_argument("name", help="Etapa (ex.: simulate_kotlin_compilation) ou estatística (ex.: dex_methods)")
+    trend_parser.add_argument("--limit", type=int, default=20)
+    trend_parser.add_argument("--above", type=float, help="Mostra a execução em que o valor passou deste limite")
+
+    compare_parser = commands.add_parser("compare", help="Compara uma execução com a linha de base das anteriores")
+    compare_parser.add_argument("--run", type=int, help="Execução comparada (padrão: a última)")
+    compare_parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="Execuções anteriores na linha de base")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD_PERCENT,
+                                help="Piora tolerada em %% (duração e estatísticas)")
+    compare_parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA_S,
+                                help="Diferença mínima de duração, em segundos, para contar como regressão")
+    args = parser.parse_args()
+
+    path = Path(args.db) if args.db else history_path(args.root)
+    if not path.exists():
+        print(f"❌ Histórico não encontrado: {path}")
+        return 2
+    connection = connect(path)
+    project = None if args.db else str(Path(args.root).resolve())
+
+    try:
+        if args.command == "runs":
+            query = "SELECT id, started_at, source, total, failed, step_time_s FROM runs WHERE suite = ?"
+            params = [args.suite]
+            if project is not None:
+                query += " AND project = ?"
+                params.append(project)
+            rows = connection.execute(query + " ORDER BY id DESC LIMIT ?", params + [args.limit]).fetchall()
+            print(f"  {'id':>5}  {'quando':<16} {'etapas':>6} {'falhas':>6} {'tempo':>9}  origem")
+            for run_id, started_at, source, total, failed, step_time in reversed(rows):
+                print(f"  {run_id:>5}  {_format_time(started_at):<16} {total:>6} {failed:>6} "
+                      f"{step_time or 0:>8.3f}s  {source or 'disco'}")
+            return 0
+
+        if args.command == "trend":
+            rows = series(connection, args.name, args.suite, project, args.limit)
+            if not rows:
+                print(f"❌ Nenhum registro de {args.name} na suíte {args.suite}")
+                return 2
+            for run_id, started_at, value, success in rows:
+                status = "✅" if success else "❌"
+                print(f"  {status} {run_id:>5}  {_format_time(started_at):<16} {'-' if value is None else f'{value:g}'}")
+            if args.above is not None:
+                crossing = first_crossing(rows, args.above)
+                if crossing is not None:
+                    print(f"📈 {args.name} passou de {args.above:g} na execução {crossing[0]} ({_format_time(crossing[1])})")
+                elif all(row[2] is not None and row[2] > args.above for row in rows):
+                    print(f"  {args.name} já estava acima de {args.above:g} em todas as execuções mostradas")
+                else:
+                    print(f"  {args.name} não passou de {args.above:g} nas execuções mostradas")
+            return 0
+
+        run_id = args.run or latest_run(connection, args.suite, project)
+        if run_id is None:
+            print(f"❌ Nenhuma execução da suíte {args.suite}")
+            return 2
+        report = compare_run(connection, run_id, args.window, args.threshold, args.min_delta)
+        print(f"📊 Execução {run_id} contra a mediana de {report['baseline_runs']} execução(ões) anterior(es)")
+        print(f"  {'etapa':<36} {'agora':>9} {'base':>9}")
+        for row in report["steps"]:
+            baseline = "-" if row["baseline_s"] is None else f"{row['baseline_s']:.3f}s"
+            now = "-" if row["wall_time_s"] is None else f"{row['wall_time_s']:.3f}s"
+            print(f"  {row['name'][:36]:<36} {now:>9} {baseline:>9}")
+        for row in report["stats"]:
+            baseline = "-" if row["baseline"] is None else f"{row['baseline']:g}"
+            print(f"  {row['name'][:36]:<36} {row['value']:>9g} {baseline:>9}")
+        if report["regressions"]:
+            print(f"❌ REGRESSÕES (limite +{args.threshold:g}%):")
+            for regression in report["regressions"]:
+                print(f"  • {regression}")
+            return 1
+        print("✅ Nenhuma regressão em relação à linha de base")
+        return 0
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Divisão das verificações por arquivo entre várias máquinas de CI (--shard K/N) e junção dos relatórios
+Cada arquivo vai para um shard de forma determinística (hash estável do caminho) e os shards ficam
+equilibrados em bytes; o shard 1 também executa as verificações que não são por arquivo
+"""
+
+import hashlib
+import heapq
+import json
+import sys
+from pathlib import Path
+
+from report_sinks import report_timestamp
+
+# Estatísticas que cada shard conta só para os seus arquivos (somadas na junção)
+SHARDED_STATISTICS = ("app_methods", "library_methods", "dex_methods")
+
+# Relatório de cada suíte: campo da lista de resultados, nome, status e os totais do resumo
+REPORT_LAYOUTS = {
+    "build": {
+        "results_key": "build_steps", "name_key": "step", "status_key": "success",
+        "totals": ("total_steps", "successful_steps", "failed_steps"),
+        "output": "build_test_report.json",
+    },
+    "integration": {
+        "results_key": "results", "name_key": "test", "status_key": "passed",
+        "totals": ("total_tests", "passed_tests", "failed_tests"),
+        "output": "integration_test_report.json",
+    },
+}
+
+
+def parse_shard(value):
+    """'2/4' -> (2, 4); shards numerados a partir de 1"""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard inválido: {value!r} (use K/N, ex.: 2/4)") from None
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Shard inválido: {value!r} (K deve estar entre 1 e N)")
+    return index, count
+
+
+def shard_suffix(shard):
+    return f"shard-{shard[0]}-of-{shard[1]}"
+
+
+def _stable_hash(rel):
+    # hash() do Python muda a cada processo; blake2b é igual em todas as máquinas
+    return int.from_bytes(hashlib.blake2b(rel.encode("utf-8", "surrogateescape"), digest_size=8).digest(), "big")
+
+
+def assign_shards(entries, count):
+    """{caminho: shard} equilibrando bytes: maiores primeiro, cada um no shard menos carregado
+
+    A ordem (tamanho, hash do caminho) e o desempate pelo número do shard tornam a divisão idêntica
+    em todas as máquinas que veem a mesma árvore.
+    """
+    ordered = sorted(entries, key=lambda entry: (-entry.size, _stable_hash(entry.rel), entry.rel))
+    loads = [(0, shard) for shard in range(1, count + 1)]
+    assignment = {}
+    for entry in ordered:
+        load, shard = heapq.heappop(loads)
+        assignment[entry.rel] = shard
+        # Arquivos vazios também contam, para que muitos arquivos pequenos não caiam no mesmo shard
+        heapq.heappush(loads, (load + max(entry.size, 1), shard))
+    return assignment
+
+
+def filter_shard(entries, shard):
+    """Entradas que cabem ao shard (todas quando `shard` é None)"""
+    if shard is None or shard[1] == 1:
+        return list(entries)
+    entries = list(entries)
+    assignment = assign_shards(entries, shard[1])
+    return [entry for entry in entries if assignment[entry.rel] == shard[0]]
+
+
+def shard_checks(checks, names, shard):
+    """Verificações do shard: o shard 1 executa a seleção inteira, os outros só as verificações por arquivo"""
+    if shard is None or shard[0] == 1:
+        return names
+    return [check.name for check in checks if check.sharded and (names is None or check.name in names)]
+
+
+def _merge_metrics(records):
+    merged = {}
+    for record in records:
+        for key, value in (record.get("metrics") or {}).items():
+            if isinstance(value, (int, float)):
+                merged[key] = merged.get(key, 0) + value
+            else:
+                merged.setdefault(key, value)
+    return {key: round(value, 6) if isinstance(value, float) else value for key, value in merged.items()}
+
+
+def _merge_statistics(reports):
+    merged = {}
+    for report in reports:
+        for name, value in (report.get("statistics") or {}).items():
+            if name in SHARDED_STATISTICS:
+                merged[name] = merged.get(name, 0) + value
+            else:
+                merged.setdefault(name, value)
+    return merged
+
+
+# Etapa de build cujo veredito depende do total somado dos shards
+DEX_STEP = "Geração de DEX"
+
+
+def _dex_verdict(results, statistics, name_key):
+    """Escreve no registro do DEX juntado se o total de métodos dos shards exige MultiDex"""
+    from dex_count import DEX_METHOD_LIMIT
+
+    total = statistics.get("dex_methods")
+    if total is None:
+        return
+    for record in results:
+        if record[name_key] != DEX_STEP:
+            continue
+        if total > DEX_METHOD_LIMIT:
+            verdict = f"MultiDex necessário ({total} métodos somando os shards)"
+        else:
+            verdict = f"DEX único suficiente ({total} métodos somando os shards)"
+        record["message"] = f"{verdict}; {record['message']}" if record["message"] else verdict
+
+
+def load_report(path):
+    with open(path, "r") as f:
+        report = json.load(f)
+    for suite, layout in REPORT_LAYOUTS.items():
+        if layout["results_key"] in report and layout["totals"][0] in report:
+            return suite, report
+    raise ValueError(f"{path}: não é um relatório de build nem de integração")
+
+
+def merge_reports(reports, allow_partial=False):
+    """Junta os relatórios JSON dos shards [(caminho, relatório)] em um relatório com os totais corretos"""
+    suites = set()
+    by_shard = {}
+    count = None
+    for path, (suite, report) in reports:
+        suites.add(suite)
+        shard = report.get("shard") or {"index": 1, "count": 1}
+        if count is not None and shard["count"] != count:
+            raise ValueError(f"{path}: shard {shard['index']}/{shard['count']} de outra divisão (esperado N={count})")
+        count = shard["count"]
+        if shard["index"] in by_shard:
+            raise ValueError(f"{path}: shard {shard['index']}/{count} repetido")
+        by_shard[shard["index"]] = report
+    if len(suites) != 1:
+        raise ValueError(f"Relatórios de suítes diferentes: {', '.join(sorted(suites))}")
+    suite = suites.pop()
+    missing = sorted(set(range(1, count + 1)) - set(by_shard))
+    if missing and not allow_partial:
+        raise ValueError(f"Faltam os shards {', '.join(f'{index}/{count}' for index in missing)}")
+
+    layout = REPORT_LAYOUTS[suite]
+    name_key, status_key = layout["name_key"], layout["status_key"]
+    grouped = {}
+    for index in sorted(by_shard):
+        for record in by_shard[index][layout["results_key"]]:
+            grouped.setdefault(record[name_key], []).append((index, record))
+
+    results = []
+    for name, items in grouped.items():
+        records = [record for _, record in items]
+        messages = [record.get("message", "") for record in records]
+        if len(records) == 1 or len(set(messages)) == 1:
+            message = messages[0]
+        else:
+            message = "; ".join(f"[{index}/{count}] {record.get('message', '')}" for index, record in items)
+        merged = {name_key: name, status_key: all(record[status_key] for record in records), "message": message}
+        metrics = _merge_metrics(records)
+        if metrics:
+            merged["metrics"] = metrics
+        results.append(merged)
+
+    total = len(results)
+    passed = sum(1 for result in results if result[status_key])
+    total_key, passed_key, failed_key = layout["totals"]
+    first = by_shard[min(by_shard)]
+    summary = {
+        "timestamp": report_timestamp(),
+        total_key: total,
+        passed_key: passed,
+        failed_key: total - passed,
+        "success_rate": (passed / total) * 100 if total else 0.0,
+    }
+    for key in ("project_info", "layouts", "drawables"):
+        if key in first:
+            summary[key] = first[key]
+    statistics = _merge_statistics(by_shard[index] for index in sorted(by_shard))
+    if statistics:
+        summary["statistics"] = statistics
+    if suite == "build":
+        _dex_verdict(results, statistics, name_key)
+    summary["shards"] = {"count": count, "merged": sorted(by_shard), "missing": missing}
+    summary[layout["results_key"]] = results
+    return suite, summary
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Junta os relatórios dos shards (--shard K/N) em um relatório")
+    commands = parser.add_subparsers(dest="command", required=True)
+    merge_parser = commands.add_parser("merge-reports", help="Junta relatórios JSON parciais de uma mesma suíte")
+    merge_parser.add_argument("reports", nargs="+", help="Relatórios JSON dos shards")
+    merge_parser.add_argument("--output", "-o",
+                              help="Relatório combinado (padrão: build_test_report.json ou "
+                                   "integration_test_report.json ao lado do primeiro relatório)")
+    merge_parser.add_argument("--allow-partial", action="store_true", help="Junta mesmo se faltar algum shard")
+    args = parser.parse_args()
+
+    try:
+        suite, merged = merge_reports([(path, load_report(path)) for path in args.reports], args.allow_partial)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 2
+
+    layout = REPORT_LAYOUTS[suite]
+    output = Path(args.output) if args.output else Path(args.reports[0]).parent / layout["output"]
+    tmp_output = output.with_name(output.name + ".tmp")
+    with open(tmp_output, "w") as f:
+        json.dump(merged, f, indent=2)
+    tmp_output.replace(output)
+
+    total_key, passed_key, failed_key = layout["totals"]
+    shards = merged["shards"]
+    print(f"📄 {len(shards['merged'])}/{shards['count']} shard(s) juntados em: {output}")
+    print(f"   {merged[total_key]} resultados, {merged[failed_key]} falha(s), "
+          f"{merged['success_rate']:.1f}% de sucesso")
+    return 0 if merged[failed_key] == 0 and not shards["missing"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Instrumentação das etapas dos scripts de teste do Email Assistant
+Tempo de parede e de CPU, arquivos abertos, bytes lidos, variação do pico de memória e perfis opcionais
+"""
+
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from pathlib import Path
+
+_active = threading.local()
+_hook_lock = threading.Lock()
+_hook_installed = False
+
+# Formatos aceitos por --profile
+PROFILE_FORMATS = ("pstats", "trace")
+
+# Limite de eventos por etapa no trace do Chrome (o arquivo cresce rápido)
+MAX_TRACE_EVENTS = 500000
+
+
+def _audit_hook(event, args):
+    # Chamado para todo open() do processo; só conta o que acontece dentro de uma etapa medida
+    if event == "open":
+        metrics = getattr(_active, "metrics", None)
+        if metrics is not None:
+            metrics.files_opened += 1
+
+
+def _install_audit_hook():
+    # Ganchos de auditoria não podem ser removidos: instalar uma única vez
+    global _hook_installed
+    if not _hook_installed:
+        with _hook_lock:
+            if not _hook_installed:
+                sys.addaudithook(_audit_hook)
+                _hook_installed = True
+
+
+def _thread_bytes_read(include_probe=False):
+    """Bytes lidos pela thread atual (rchar de /proc/thread-self/io; None fora do Linux)
+
+    O arquivo é gerado antes da própria leitura, cujos bytes só entram na leitura seguinte;
+    `include_probe` os soma, para a leitura inicial de uma etapa não ser contada como E/S dela.
+    Um único os.read: o open() com buffer leria o arquivo mais de uma vez.
+    """
+    try:
+        fd = os.open("/proc/thread-self/io", os.O_RDONLY)
+        try:
+            data = os.read(fd, 4096)
+        finally:
+            os.close(fd)
+    except OSError:
+        return None
+    for line in data.splitlines():
+        if line.startswith(b"rchar:"):
+            return int(line.split()[1]) + (len(data) if include_probe else 0)
+    return None
+
+
+def _peak_rss_kb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class StepMetrics:
+    """Contadores de uma etapa; a etapa inteira roda na thread que chamou start()"""
+
+    def __init__(self):
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.files_opened = 0
+        self.bytes_read = None
+        self.peak_memory_delta_kb = 0
+
+    def start(self):
+        _install_audit_hook()
+        self._io_start = _thread_bytes_read(include_probe=True)
+        self._rss_start = _peak_rss_kb()
+        self._cpu_start = time.thread_time()
+        self._wall_start = time.perf_counter()
+        _active.metrics = self
+
+    def stop(self):
+        _active.metrics = None
+        self.wall_time = time.perf_counter() - self._wall_start
+        self.cpu_time = time.thread_time() - self._cpu_start
+        # Com etapas em paralelo o pico de RSS é do processo: a variação pode vir de outra etapa
+        self.peak_memory_delta_kb = _peak_rss_kb() - self._rss_start
+        io_end = _thread_bytes_read()
+        if io_end is not None and self._io_start is not None:
+            self.bytes_read = io_end - self._io_start
+
+    def to_dict(self):
+        return {
+            "wall_time_s": round(self.wall_time, 6),
+            "cpu_time_s": round(self.cpu_time, 6),
+            "files_opened": self.files_opened,
+            "bytes_read": self.bytes_read,
+            "peak_memory_delta_kb": self.peak_memory_delta_kb,
+        }
+
+
+def _format_bytes(value):
+    if value is None:
+        return "-"
+    for unit in ("B", "KB", "MB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GB"
+
+
+def format_metrics_table(rows):
+    """Linhas da tabela de resumo a partir de [(etapa, metrics.to_dict())]"""
+    lines = [f"  {'Etapa':<32} {'Parede':>9} {'CPU':>9} {'Abertos':>8} {'Lidos':>10} {'Δ pico':>10}"]
+    for name, metrics in rows:
+        lines.append(
+            f"  {name[:32]:<32} {metrics['wall_time_s']:>8.3f}s {metrics['cpu_time_s']:>8.3f}s "
+            f"{metrics['files_opened']:>8} {_format_bytes(metrics['bytes_read']):>10} "
+            f"{_format_bytes(metrics['peak_memory_delta_kb'] * 1024):>10}"
+        )
+    return lines
+
+
+class PstatsProfiler:
+    """Grava um dump do cProfile por etapa (<etapa>.prof, legível com pstats ou snakeviz)"""
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+
+    def run(self, name, func):
+        import cProfile
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(func)
+        finally:
+            profiler.dump_stats(str(self.output_dir / f"{name}.prof"))
+
+
+class ChromeTraceProfiler:
+    """Grava um trace no formato do Chrome (<etapa>.trace.json) com cada chamada de função"""
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+
+    def run(self, name, func):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        events = []
+        stack = []
+        tid = threading.get_ident()
+        clock = time.perf_counter
+        origin = clock()
+
+        def tracer(frame, event, arg):
+            if event == "call" or event == "c_call":
+                if event == "call":
+                    code = frame.f_code
+                    label = f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+                else:
+                    label = getattr(arg, "__qualname__", repr(arg))
+                stack.append((label, clock()))
+            elif stack and event in ("return", "c_return", "c_exception"):
+                label, begin = stack.pop()
+                if len(events) < MAX_TRACE_EVENTS:
+                    events.append({
+                        "name": label, "ph": "X", "pid": 0, "tid": tid,
+                        "ts": (begin - origin) * 1e6, "dur": (clock() - begin) * 1e6,
+                    })
+
+        sys.setprofile(tracer)
+        try:
+            return func()
+        finally:
+            sys.setprofile(None)
+            path = self.output_dir / f"{name}.trace.json"
+            with open(path, "w") as f:
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+def make_profiler(kind, output_dir):
+    """Perfilador para --profile (None desliga)"""
+    if not kind:
+        return None
+    if kind == "pstats":
+        return PstatsProfiler(output_dir)
+    if kind == "trace":
+        return ChromeTraceProfiler(output_dir)
+    raise ValueError(f"Formato de perfil desconhecido: {kind} (use {', '.join(PROFILE_FORMATS)})")
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Agendador de etapas para os scripts de teste do Email Assistant
+Executa etapas independentes em paralelo e publica a saída na ordem declarada
+"""
+
+import io
+import os
+import sys
+import threading
+import traceback
+
+from step_metrics import StepMetrics
+
+_context = threading.local()
+
+
+def current_step():
+    """Etapa em execução na thread atual (None fora do agendador)"""
+    return getattr(_context, "step", None)
+
+
+def default_jobs():
+    return os.cpu_count() or 1
+
+
+class StepRun:
+    """Estado de uma etapa: saída capturada, registros, métricas e erro"""
+
+    def __init__(self, name, func, after):
+        self.name = name
+        self.func = func
+        self.after = tuple(after)
+        self.output = io.StringIO()
+        self.records = []
+        self.metrics = StepMetrics()
+        self.error = None
+        self.error_traceback = None
+
+    def execute(self, on_error=None, profiler=None):
+        _context.step = self
+        self.metrics.start()
+        try:
+            if profiler is not None:
+                profiler.run(self.name, self.func)
+            else:
+                self.func()
+        except Exception as e:
+            self.error = e
+            self.error_traceback = traceback.format_exc()
+            # Ainda no contexto da etapa: o que o callback registrar fica com ela
+            if on_error:
+                on_error(self, e)
+        finally:
+            self.metrics.stop()
+            _context.step = None
+        return self
+
+
+class _RoutedStdout:
+    """Envia o que cada thread imprime para o buffer da sua etapa"""
+
+    def __init__(self, target):
+        self._target = target
+
+    def write(self, text):
+        step = current_step()
+        if step is not None:
+            return step.output.write(text)
+        return self._target.write(text)
+
+    def flush(self):
+        if current_step() is None:
+            self._target.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+
+class StepScheduler:
+    """Executa etapas respeitando dependências em um pool de threads"""
+
+    def __init__(self, jobs=None, on_error=None, profiler=None):
+        # Perfis são por thread (e o cProfile não aceita duas instâncias ativas): etapas em série
+        self.jobs = 1 if profiler is not None else max(1, jobs or default_jobs())
+        self.on_error = on_error
+        self.profiler = profiler
+        self._steps = []
+        self._by_name = {}
+
+    def add(self, name, func, after=()):
+        """Declara uma etapa; `after` lista as etapas que precisam terminar antes"""
+        if name in self._by_name:
+            raise ValueError(f"Etapa duplicada: {name}")
+        step = StepRun(name, func, after)
+        self._steps.append(step)
+        self._by_name[name] = step
+        return step
+
+    def _validate(self):
+        for step in self._steps:
+            for dep in step.after:
+                if dep not in self._by_name:
+                    raise ValueError(f"Etapa {step.name} depende de etapa desconhecida: {dep}")
+
+        # Detectar ciclos (DFS com três estados)
+        state = {}
+
+        def visit(name, path):
+            if state.get(name) == 1:
+                raise ValueError(f"Dependência circular entre etapas: {' -> '.join(path + [name])}")
+            if state.get(name) == 2:
+                return
+            state[name] = 1
+            for dep in self._by_name[name].after:
+                visit(dep, path + [name])
+            state[name] = 2
+
+        for step in self._steps:
+            visit(step.name, [])
+
+    def run(self, on_complete=None):
+        """Executa todas as etapas; `on_complete` é chamado na ordem de declaração"""
+        self._validate()
+
+        real_stdout = sys.stdout
+        sys.stdout = _RoutedStdout(real_stdout)
+        done = set()
+        flushed = 0
+
+        def publish_ready():
+            # Publicar, em ordem, o prefixo de etapas já concluídas
+            nonlocal flushed
+            while flushed < len(self._steps) and self._steps[flushed].name in done:
+                self._publish(self._steps[flushed], real_stdout, on_complete)
+                flushed += 1
+
+        try:
+            if self.jobs == 1:
+                for step in self._topological_order():
+                    step.execute(self.on_error, self.profiler)
+                    done.add(step.name)
+                    publish_ready()
+            else:
+                self._run_pool(done, publish_ready)
+        finally:
+            sys.stdout = real_stdout
+
+        return self._steps
+
+    def _run_pool(self, done, publish_ready):
+        from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+        pending = {}
+        waiting = list(self._steps)
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            while waiting or pending:
+                ready = [s for s in waiting if all(dep in done for dep in s.after)]
+                for step in ready:
+                    waiting.remove(step)
+                    pending[pool.submit(step.execute, self.on_error, self.profiler)] = step
+
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done.add(pending.pop(future).name)
+                publish_ready()
+
+    def _topological_order(self):
+        order = []
+        seen = set()
+
+        def visit(step):
+            if step.name in seen:
+                return
+            seen.add(step.name)
+            for dep in step.after:
+                visit(self._by_name[dep])
+            order.append(step)
+
+        for step in self._steps:
+            visit(step)
+        return order
+
+    @staticmethod
+    def _publish(step, stream, on_complete):
+        stream.write(step.output.getvalue())
+        stream.flush()
+        if on_complete:
+            on_complete(step)
@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+Índice de símbolos Kotlin do Email Assistant: classes, supertipos, anotações e imports de cada .kt
+Os símbolos de cada arquivo ficam no cache de verificações (atualizado só para arquivos alterados);
+as regras de arquitetura são consultas em dicionários, sem depender de onde os arquivos estão
+"""
+
+import bisect
+import re
+import sys
+import threading
+
+_MODIFIERS = (
+    "public|private|internal|protected|abstract|open|final|sealed|data|enum|annotation|inner|value|"
+    "inline|companion|fun|expect|actual|external|override|suspend|operator|infix|tailrec"
+)
+_ANNOTATION = r'@[\w.:]+(?:\s*\((?:[^()]|\([^()]*\))*\))?'
+# Anotações e modificadores seguidos de class/interface/object e do nome (a borda evita Foo::class)
+_DECLARATION = re.compile(
+    r'(?<![\w$.:])((?:' + _ANNOTATION + r'\s*|(?:' + _MODIFIERS + r')\s+)*)(class|interface|object)\s+(\w+)'
+)
+# Funções anotadas (@Binds, @Provides, @Composable...); funções sem anotação não entram no índice
+_ANNOTATED_FUN = re.compile(
+    r'(?<![\w$.:])((?:' + _ANNOTATION + r'\s*)+)(?:(?:' + _MODIFIERS + r')\s+)*fun\s+(?:<[^>]*>\s*)?'
+    r'(?:[\w.]+\.)?(\w+)\s*\('
+)
+_ANNOTATION_NAME = re.compile(r'@(?:\w+:)?([\w.]+)')
+_PACKAGE = re.compile(r'^[ \t]*package\s+([\w.]+)', re.MULTILINE)
+_IMPORT = re.compile(r'^[ \t]*import\s+([\w.]+?)(\.\*)?(?:[ \t]+as[ \t]+(\w+))?[ \t]*;?[ \t]*$', re.MULTILINE)
+_HEADER_PREFIX = re.compile(
+    r'\s*(?:<(?:[^<>]|<(?:[^<>]|<[^<>]*>)*>)*>)?\s*(?:(?:' + _ANNOTATION +
+    r'|private|internal|protected|public)\s*)*(?:constructor\s*)?'
+)
+_TYPE_NAME = re.compile(r'\s*(?:' + _ANNOTATION + r'\s*)*([\w.]+)')
+_BRACE = re.compile(r'[{}]')
+_KEYWORDS = {"fun", "val", "var", "constructor", "init", "class", "interface", "object", "companion"}
+
+# Anotações usadas pelas regras de arquitetura
+HILT_ENTRY_ANNOTATIONS = ("HiltAndroidApp", "AndroidEntryPoint", "HiltViewModel")
+BINDING_ANNOTATIONS = ("Binds", "Provides")
+VIEWMODEL_BASES = ("ViewModel", "AndroidViewModel")
+
+
+def _brace_pairs(code):
+    """{posição de '{': posição logo após a '}' correspondente} numa passada"""
+    pairs = {}
+    stack = []
+    for m in _BRACE.finditer(code):
+        if m.group() == "{":
+            stack.append(m.start())
+        elif stack:
+            pairs[stack.pop()] = m.end()
+    return pairs
+
+
+def _closing(code, pos, opening, closing):
+    """Posição logo após o fechamento do par que abre em `pos`"""
+    depth = 0
+    for index in range(pos, len(code)):
+        char = code[index]
+        if char == opening:
+            depth += 1
+        elif char == closing:
+            depth -= 1
+            if not depth:
+                return index + 1
+    return len(code)
+
+
+def _split_top_level(text):
+    """Divide por vírgulas fora de parênteses e <>"""
+    parts = []
+    depth = 0
+    start = 0
+    for index, char in enumerate(text):
+        if char in "(<[":
+            depth += 1
+        elif char in ")>]" and text[index - 1:index + 1] != "->":
+            depth -= 1
+        elif char == "," and not depth:
+            parts.append(text[start:index])
+            start = index + 1
+    parts.append(text[start:])
+    return [part for part in (part.strip() for part in parts) if part]
+
+
+def _type_name(text):
+    """'@A Foo.Bar<Int>?' -> 'Foo.Bar' (o tipo sem anotações, argumentos e nulabilidade)"""
+    m = _TYPE_NAME.match(text)
+    return m.group(1) if m else None
+
+
+def _supertype_list(code, pos):
+    """Supertipos a partir de ':' até '{' ou o fim da declaração; retorna (nomes, posição da '{' ou None)"""
+    depth = 0
+    index = pos
+    last = ":"
+    while index < len(code):
+        char = code[index]
+        if char in "(<[":
+            depth += 1
+        elif char in ")>]" and code[index - 1:index + 1] != "->":
+            depth -= 1
+        elif not depth:
+            if char == "{":
+                break
+            if char in "}=;":
+                return _supertypes(code[pos:index]), None
+            if char == "\n" and last not in ",:":
+                # Declaração sem corpo termina na quebra de linha, a não ser que a lista continue na próxima
+                rest = code[index:].lstrip()
+                if not rest.startswith((",", "{", "where")):
+                    return _supertypes(code[pos:index]), None
+        if not char.isspace():
+            last = char
+        index += 1
+    return _supertypes(code[pos:index]), (index if index < len(code) else None)
+
+
+def _supertypes(text):
+    text = text.split(" where ", 1)[0]
+    names = []
+    for item in _split_top_level(text):
+        item = re.split(r'\s+by\s+', item, maxsplit=1)[0]
+        name = _type_name(item)
+        if name:
+            names.append(name)
+    return names
+
+
+def _annotations(prefix):
+    return [m.group(1).rsplit(".", 1)[-1] for m in _ANNOTATION_NAME.finditer(prefix)]
+
+
+def _modifiers(prefix):
+    without_annotations = re.sub(_ANNOTATION, " ", prefix)
+    return [word for word in without_annotations.split() if word]
+
+
+def scan_kotlin_symbols(code):
+    """Package, imports, classes (com supertipos e anotações) e funções anotadas de um código sem strings/comentários"""
+    newlines = [m.start() for m in re.finditer(r'\n', code)]
+
+    def line(pos):
+        return bisect.bisect_right(newlines, pos - 1) + 1
+
+    package = _PACKAGE.search(code)
+    imports = []
+    for m in _IMPORT.finditer(code):
+        name, star, alias = m.groups()
+        imports.append([name + ".*" if star else name, alias])
+
+    pairs = _brace_pairs(code)
+    classes = []
+    bodies = []  # (início, fim, nome qualificado no arquivo)
+    for m in _DECLARATION.finditer(code):
+        prefix, kind, name = m.groups()
+        if name in _KEYWORDS:
+            continue
+        pos = _HEADER_PREFIX.match(code, m.end()).end()
+        if pos < len(code) and code[pos] == "(":
+            pos = _closing(code, pos, "(", ")")
+        while pos < len(code) and code[pos] in " \t\n":
+            pos += 1
+        supertypes = []
+        brace = None
+        if pos < len(code) and code[pos] == ":":
+            supertypes, brace = _supertype_list(code, pos + 1)
+        elif code.startswith("where", pos):
+            # Restrições de tipo sem supertipos: só interessa onde começa o corpo
+            _, brace = _supertype_list(code, pos + len("where"))
+        elif pos < len(code) and code[pos] == "{":
+            brace = pos
+        record = {
+            "name": name,
+            "kind": kind,
+            "modifiers": _modifiers(prefix),
+            "annotations": _annotations(prefix),
+            "supertypes": supertypes,
+            "outer": None,
+            "line": line(m.start(2)),
+        }
+        start = m.start(2)
+        for body_start, body_end, owner in reversed(bodies):
+            if body_start < start < body_end:
+                record["outer"] = owner
+                break
+        qualified = f"{record['outer']}.{name}" if record["outer"] else name
+        if brace is not None:
+            bodies.append((brace, pairs.get(brace, len(code)), qualified))
+        classes.append(record)
+
+    functions = []
+    for m in _ANNOTATED_FUN.finditer(code):
+        prefix, name = m.groups()
+        params_end = _closing(code, m.end() - 1, "(", ")")
+        params = []
+        for param in _split_top_level(code[m.end():params_end - 1]):
+            _, _, declared = param.partition(":")
+            param_type = _type_name(declared.split("=", 1)[0])
+            if param_type:
+                params.append(param_type)
+        returns = None
+        rest = code[params_end:params_end + 200].lstrip(" \t")
+        if rest.startswith(":"):
+            returns = _type_name(rest[1:])
+        owner = None
+        for body_start, body_end, qualified in reversed(bodies):
+            if body_start < m.start(2) < body_end:
+                owner = qualified
+                break
+        functions.append({
+            "name": name,
+            "annotations": _annotations(prefix),
+            "params": params,
+            "returns": returns,
+            "owner": owner,
+            "line": line(m.start(2)),
+        })
+
+    return {
+        "package": package.group(1) if package else "",
+        "imports": imports,
+        "classes": classes,
+        "functions": functions,
+    }
+
+
+def _simple(name):
+    return name.rsplit(".", 1)[-1]
+
+
+class SymbolIndex:
+    """Símbolos declarados no projeto, indexados por nome, anotação, supertipo e import"""
+
+    def __init__(self):
+        self.classes = {}  # nome completo -> registro da classe (+ "fqn" e "file")
+        self.functions = []  # funções anotadas (+ "owner" completo e "file")
+        self.by_name = {}  # nome simples -> [nomes completos]
+        self.by_annotation = {}  # anotação -> [nomes completos]
+        self.importers = {}  # nome importado -> [arquivos]
+        self.files = {}  # arquivo -> (package, imports)
+        self._descendants = None
+
+    def add_file(self, rel, symbols):
+        package = symbols["package"]
+        self.files[rel] = (package, symbols["imports"])
+        for name, _ in symbols["imports"]:
+            self.importers.setdefault(name, []).append(rel)
+        prefix = f"{package}." if package else ""
+        for record in symbols["classes"]:
+            qualified = f"{record['outer']}.{record['name']}" if record["outer"] else record["name"]
+            fqn = prefix + qualified
+            self.classes[fqn] = dict(record, fqn=fqn, file=rel)
+            self.by_name.setdefault(record["name"], []).append(fqn)
+            for annotation in record["annotations"]:
+                self.by_annotation.setdefault(annotation, []).append(fqn)
+        for record in symbols["functions"]:
+            owner = prefix + record["owner"] if record["owner"] else None
+            self.functions.append(dict(record, owner=owner, file=rel))
+
+    def resolve(self, name, rel):
+        """Nome completo de um tipo visto em `rel` (imports, mesmo package, imports com *, nome único); senão o próprio nome"""
+        package, imports = self.files.get(rel, ("", []))
+        head, _, tail = name.partition(".")
+        for imported, alias in imports:
+            if imported.endswith(".*"):
+                continue
+            if (alias or _simple(imported)) == head:
+                return imported + ("." + tail if tail else "")
+        if name in self.classes:
+            return name
+        candidate = f"{package}.{name}" if package else name
+        if candidate in self.classes:
+            return candidate
+        for imported, _ in imports:
+            if imported.endswith(".*") and f"{imported[:-2]}.{name}" in self.classes:
+                return f"{imported[:-2]}.{name}"
+        # Sem import que o explique: se só uma classe do projeto tem esse nome, é ela
+        declared = self.by_name.get(name)
+        if declared is not None and len(declared) == 1:
+            return declared[0]
+        return name
+
+    def find(self, name):
+        """Classes pelo nome simples ou completo"""
+        if name in self.classes:
+            return [self.classes[name]]
+        return [self.classes[fqn] for fqn in self.by_name.get(name, ())]
+
+    def annotated(self, annotation):
+        return [self.classes[fqn] for fqn in self.by_annotation.get(annotation, ())]
+
+    def supertypes(self, fqn):
+        record = self.classes[fqn]
+        return [self.resolve(name, record["file"]) for name in record["supertypes"]]
+
+    def _build_descendants(self):
+        # Ancestrais de cada classe (transitivos) invertidos uma vez: consultas de subtipos viram um get()
+        ancestors = {}
+
+        def collect(fqn, visiting):
+            if fqn in ancestors:
+                return ancestors[fqn]
+            found = set()
+            visiting.add(fqn)
+            for parent in self.supertypes(fqn):
+                found.add(parent)
+                found.add(_simple(parent))
+                if parent in self.classes and parent not in visiting:
+                    found |= collect(parent, visiting)
+            visiting.discard(fqn)
+            ancestors[fqn] = found
+            return found
+
+        descendants = {}
+        for fqn in self.classes:
+            for name in collect(fqn, set()):
+                descendants.setdefault(name, []).append(fqn)
+        return descendants
+
+    def subtypes(self, base):
+        """Classes que herdam (direta ou indiretamente) de `base`, nome simples ou completo"""
+        if self._descendants is None:
+            self._descendants = self._build_descendants()
+        return [self.classes[fqn] for fqn in self._descendants.get(base, ())]
+
+    def bindings(self):
+        """{tipo ligado: [(módulo, função, implementação)]} das funções @Binds/@Provides em classes @Module"""
+        modules = set(self.by_annotation.get("Module", ()))
+        result = {}
+        for record in self.functions:
+            owner = record["owner"]
+            # Funções em companion object nomeado dentro do módulo também contam
+            if owner not in modules and (owner is None or owner.rsplit(".", 1)[0] not in modules):
+                continue
+            if not any(annotation in BINDING_ANNOTATIONS for annotation in record["annotations"]):
+                continue
+            if not record["returns"]:
+                continue
+            bound = self.resolve(record["returns"], record["file"])
+            implementation = None
+            if "Binds" in record["annotations"] and record["params"]:
+                implementation = self.resolve(record["params"][0], record["file"])
+            result.setdefault(bound, []).append((record["owner"], record["name"], implementation))
+        return result
+
+
+def build_symbol_index(index, cache):
+    """Percorre os .kt do índice de arquivos; os símbolos vêm dos fatos do cache de verificações"""
+    symbols = SymbolIndex()
+    for entry in index.files("kotlin"):
+        symbols.add_file(entry.rel, cache.facts(entry, "kotlin", index)["symbols"])
+    return symbols
+
+
+_symbol_indexes = {}
+_symbol_lock = threading.Lock()
+
+
+def get_symbol_index(index, cache):
+    """Índice de símbolos compartilhado pelas etapas (refeito quando o índice de arquivos muda)"""
+    root = str(index.project_root)
+    with _symbol_lock:
+        generation, symbols = _symbol_indexes.get(root, (None, None))
+        if symbols is None or generation != index.generation:
+            symbols = build_symbol_index(index, cache)
+            _symbol_indexes[root] = (index.generation, symbols)
+        return symbols
+
+
+def check_architecture(symbols, activities):
+    """Regras MVVM/Hilt como consultas ao índice; retorna (problemas, resumo)
+
+    `activities` são os nomes completos das Activities declaradas no manifest.
+    """
+    problems = []
+    viewmodels = {record["fqn"]: record for base in VIEWMODEL_BASES for record in symbols.subtypes(base)}
+    uses_hilt = any(symbols.by_annotation.get(annotation) for annotation in HILT_ENTRY_ANNOTATIONS)
+
+    # Cada Activity do manifest existe no código e tem um <Nome>ViewModel que herda de ViewModel
+    paired = 0
+    for activity in activities:
+        declared = symbols.classes.get(activity) or next(iter(symbols.find(_simple(activity))), None)
+        if declared is None:
+            problems.append(f"Activity {_simple(activity)} do manifest não declarada no código")
+            continue
+        base = declared["name"][:-len("Activity")] if declared["name"].endswith("Activity") else declared["name"]
+        candidates = symbols.find(f"{base}ViewModel")
+        viewmodel = next((record for record in candidates if record["fqn"] in viewmodels), None)
+        if viewmodel is None:
+            if candidates:
+                problems.append(f"{base}ViewModel não herda de ViewModel")
+            else:
+                problems.append(f"{declared['name']} sem {base}ViewModel")
+            continue
+        paired += 1
+        if "HiltViewModel" in viewmodel["annotations"] and "AndroidEntryPoint" not in declared["annotations"]:
+            problems.append(f"{declared['name']} usa @HiltViewModel {viewmodel['name']} sem @AndroidEntryPoint")
+
+    for record in symbols.annotated("HiltViewModel"):
+        if record["fqn"] not in viewmodels:
+            problems.append(f"@HiltViewModel {record['name']} não herda de ViewModel")
+
+    # Cada interface de repositório tem implementação concreta e um @Binds/@Provides num @Module
+    bindings = symbols.bindings()
+    bound_names = {_simple(name) for name in bindings}
+    repositories = [
+        record for record in symbols.classes.values()
+        if record["kind"] == "interface" and record["name"].endswith("Repository")
+    ]
+    for record in repositories:
+        # Pelo nome simples: implementações em outro package nem sempre importam a interface explicitamente
+        implementations = [
+            impl for impl in symbols.subtypes(record["name"])
+            if impl["kind"] != "interface" and "abstract" not in impl["modifiers"]
+        ]
+        if not implementations:
+            problems.append(f"{record['name']} sem implementação")
+        if record["fqn"] not in bindings and record["name"] not in bound_names:
+            problems.append(f"{record['name']} sem @Binds/@Provides em um @Module")
+
+    # Módulos do Hilt precisam de @InstallIn
+    modules = symbols.annotated("Module")
+    if uses_hilt:
+        if not modules:
+            problems.append("Hilt em uso sem nenhum @Module")
+        for record in modules:
+            if "InstallIn" not in record["annotations"] and "DisableInstallInCheck" not in record["annotations"]:
+                problems.append(f"@Module {record['name']} sem @InstallIn")
+
+    summary = {
+        "activities": len(activities),
+        "paired_viewmodels": paired,
+        "repositories": len(repositories),
+        "modules": len(modules),
+    }
+    return problems, summary
+
+
+def manifest_activities(index, model=None):
+    """Nomes completos das Activities dos manifests do app"""
+    from manifest_merge import ManifestError, app_manifests
+
+    namespace = model.android_field("namespace") if model is not None else None
+    activities = []
+    try:
+        manifests = app_manifests(index, package=namespace)
+    except ManifestError:
+        return activities
+    for _, manifest in manifests:
+        for element in manifest["elements"]:
+            # Nomes com placeholder sem valor já são acusados pelo merge do manifest
+            if element["tag"] != "activity" or element.get("node") == "remove" or "${" in element["key"]:
+                continue
+            if element["key"] not in activities:
+                activities.append(element["key"])
+    return activities
+
+
+def _describe(record):
+    annotations = "".join(f"@{name} " for name in record["annotations"])
+    supertypes = f" : {', '.join(record['supertypes'])}" if record["supertypes"] else ""
+    return f"{annotations}{record['kind']} {record['fqn']}{supertypes}  ({record['file']}:{record['line']})"
+
+
+def main():
+    import argparse
+    import time
+
+    from check_cache import get_check_cache
+    from gradle_model import load_project_models
+    from project_index import DEFAULT_PROJECT_ROOT, get_project_index
+
+    parser = argparse.ArgumentParser(description="Consultas ao índice de símbolos Kotlin do projeto")
+    parser.add_argument("--root", default=str(DEFAULT_PROJECT_ROOT), help="Raiz do projeto Android")
+    parser.add_argument("--no-cache", action="store_true", help="Não usa nem grava o cache de verificações")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("find", help="Classes pelo nome simples ou completo").add_argument("name")
+    commands.add_parser("annotated", help="Classes com a anotação (sem @)").add_argument("annotation")
+    commands.add_parser("subtypes", help="Classes que herdam do tipo, direta ou indiretamente").add_argument("name")
+    commands.add_parser("importers", help="Arquivos que importam o nome completo").add_argument("name")
+    commands.add_parser("bindings", help="Tipos ligados por @Binds/@Provides em módulos")
+    commands.add_parser("check", help="Regras de arquitetura (Activity/ViewModel, repositórios, módulos)")
+    args = parser.parse_args()
+
+    index = get_project_index(args.root)
+    cache = get_check_cache(args.root, enabled=not args.no_cache)
+    started = time.perf_counter()
+    symbols = get_symbol_index(index, cache)
+    built = time.perf_counter()
+    cache.save()
+
+    status = 0
+    queried = time.perf_counter()
+    if args.command == "find":
+        results = [_describe(record) for record in symbols.find(args.name)]
+    elif args.command == "annotated":
+        results = [_describe(record) for record in symbols.annotated(args.annotation.lstrip("@"))]
+    elif args.command == "subtypes":
+        results = [_describe(record) for record in symbols.subtypes(args.name)]
+    elif args.command == "importers":
+        results = sorted(symbols.importers.get(args.name, ()))
+    elif args.command == "bindings":
+        results = [
+            f"{bound}  ← {owner}.{function}" + (f" ({implementation})" if implementation else "")
+            for bound, items in sorted(symbols.bindings().items()) for owner, function, implementation in items
+        ]
+    else:
+        _, model = load_project_models(index)
+        problems, summary = check_architecture(symbols, manifest_activities(index, model))
+        results = [f"❌ {problem}" for problem in problems] or [
+            f"✅ {summary['paired_viewmodels']}/{summary['activities']} Activities com ViewModel, "
+            f"{summary['repositories']} repositórios, {summary['modules']} módulos"
+        ]
+        status = 1 if problems else 0
+    finished = time.perf_counter()
+
+    for line in results:
+        print(line)
+    print(f"🔎 {len(results)} resultado(s); {len(symbols.classes)} classes em {len(symbols.files)} arquivos "
+          f"(índice {(built - started) * 1000:.1f} ms, consulta {(finished - queried) * 1000:.2f} ms)")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,26 +6,136 @@ Verifica se todos os componentes estão corretamente integrados
 
 import os
 import sys
-import subprocess
-import json
+import threading
 from pathlib import Path
 
+from check_cache import content_hash, get_check_cache
+from check_registry import CheckSpec, format_checks, select_checks
+from project_index import DEFAULT_PROJECT_ROOT, get_project_index
+from report_sinks import REPORT_FORMATS, ReportSchema, make_sinks, parse_report_spec, report_timestamp
+from step_metrics import PROFILE_FORMATS, format_metrics_table, make_profiler
+from step_scheduler import StepScheduler, current_step
+
 class EmailAssistantTester:
-    def __init__(self):
-        self.project_root = Path("/home/ubuntu/EmailAssistantApp")
+    # Registro dos testes na ordem do relatório: dependências, tipos de arquivo lidos
+    # (o modo --watch reexecuta só o necessário) e tags para --only/--skip
+    CHECKS = [
+        CheckSpec("test_project_structure", inputs=("tree",), tags=("structure",)),
+        CheckSpec("test_kotlin_syntax", inputs=("kotlin",), tags=("kotlin",), sharded=True),
+        CheckSpec("test_xml_syntax", inputs=("xml",), tags=("xml",), sharded=True),
+        CheckSpec("test_dependencies", inputs=("gradle",), tags=("gradle",)),
+        CheckSpec("test_manifest_configuration", inputs=("manifest",), tags=("manifest", "xml")),
+        CheckSpec(
+            "test_resource_integrity",
+            inputs=("resources", "kotlin", "manifest", "tree"),
+            tags=("resources", "xml", "kotlin"),
+        ),
+        CheckSpec("test_architecture_integrity", inputs=("kotlin", "manifest"), tags=("structure", "kotlin")),
+    ]
+    TESTS = [(check.name, check.after) for check in CHECKS]
+    STEP_INPUTS = {check.name: check.inputs for check in CHECKS}
+    
+    # Campos do relatório de integração
+    REPORT_SCHEMA = ReportSchema("integration", "results", "test", "passed")
+    
+    def __init__(self, project_root=None, use_cache=True, jobs=None, profile=None, reports=None, history=True, shard=None):
+        self.project_root = Path(project_root) if project_root is not None else DEFAULT_PROJECT_ROOT
+        self.use_cache = use_cache
+        self.jobs = jobs
+        self.profile = profile
+        self.reports = reports
+        self.history = history
+        self.shard = shard
+        self.statistics = {}
+        self._sinks = []
         self.test_results = []
+        self._step_results = {}
+        self._step_metrics = {}
+        self._log_lock = threading.Lock()
+    
+    @property
+    def index(self):
+        """Índice de arquivos compartilhado (a árvore é percorrida uma vez por execução)"""
+        return get_project_index(self.project_root)
+    
+    @property
+    def profile_dir(self):
+        """Onde --profile grava um arquivo por teste"""
+        return self.project_root / "build" / "profile"
+    
+    @property
+    def cache(self):
+        """Cache incremental dos resultados por arquivo (desligado com --no-cache)"""
+        return get_check_cache(self.project_root, enabled=self.use_cache)
         
     def log_test(self, test_name, passed, message=""):
-        """Registra resultado de um teste"""
+        """Registra resultado de um teste (seguro entre threads)"""
         status = "✅ PASS" if passed else "❌ FAIL"
-        self.test_results.append({
+        result = {
             "test": test_name,
             "passed": passed,
             "message": message
-        })
-        print(f"{status}: {test_name}")
-        if message:
-            print(f"    {message}")
+        }
+        step = current_step()
+        with self._log_lock:
+            # Dentro do agendador o resultado fica com o teste até ser publicado em ordem
+            if step is not None:
+                step.records.append(result)
+            else:
+                self.test_results.append(result)
+            print(f"{status}: {test_name}")
+            if message:
+                print(f"    {message}")
+    
+    def _log_step_error(self, step, error):
+        """Registra como falha um teste que levantou exceção"""
+        self.log_test(step.name, False, f"Erro inesperado: {error}")
+    
+    def _collect_step(self, step):
+        """Guarda os resultados e as métricas de um teste concluído"""
+        metrics = step.metrics.to_dict()
+        with self._log_lock:
+            for result in step.records:
+                result["metrics"] = metrics
+            self._step_results[step.name] = list(step.records)
+            self._step_metrics[step.name] = metrics
+        # Gravar na hora: o relatório acompanha a execução e sobrevive a uma interrupção
+        for sink in self._sinks:
+            for result in step.records:
+                sink.write(result)
+    
+    def run_steps(self, names=None):
+        """Executa os testes indicados (todos por padrão) e atualiza os resultados na ordem do relatório"""
+        selected = set(names) if names is not None else None
+        profiler = make_profiler(self.profile, self.profile_dir)
+        scheduler = StepScheduler(jobs=self.jobs, on_error=self._log_step_error, profiler=profiler)
+        for name, after in self.TESTS:
+            if selected is None or name in selected:
+                # Dependências fora da seleção já têm resultado da execução anterior
+                deps = [dep for dep in after if selected is None or dep in selected]
+                scheduler.add(name, getattr(self, name), deps)
+        scheduler.run(on_complete=self._collect_step)
+        
+        with self._log_lock:
+            self.test_results = [
+                result for name, _ in self.TESTS for result in self._step_results.get(name, ())
+            ]
+        return self.test_results
+    
+    def open_reports(self):
+        """Abre os destinos de relatório (--report) antes de executar os testes"""
+        stem = self.project_root / "integration_test_report"
+        if self.shard is not None:
+            from sharding import shard_suffix
+            stem = stem.with_name(f"{stem.name}.{shard_suffix(self.shard)}")
+        self._sinks = make_sinks(self.reports, stem)
+        timestamp = report_timestamp()
+        for sink in self._sinks:
+            sink.open(self.REPORT_SCHEMA, timestamp)
+    
+    def metrics_rows(self):
+        """Métricas dos testes executados, na ordem do relatório"""
+        return [(name, self._step_metrics[name]) for name, _ in self.TESTS if name in self._step_metrics]
     
     def test_project_structure(self):
         """Testa se a estrutura do projeto está correta"""
@@ -48,8 +158,7 @@ class EmailAssistantTester:
         
         missing_files = []
         for file_path in required_files:
-            full_path = self.project_root / file_path
-            if not full_path.exists():
+            if not self.index.exists(file_path):
                 missing_files.append(file_path)
         
         if missing_files:
@@ -65,28 +174,31 @@ class EmailAssistantTester:
         """Testa se os arquivos Kotlin têm sintaxe válida"""
         print("\n🔍 Testando sintaxe dos arquivos Kotlin...")
         
-        kotlin_files = list(self.project_root.rglob("*.kt"))
+        # No modo diff (--git-diff) só os arquivos alterados são lidos
+        kotlin_files = self.index.checked_files("kotlin")
         syntax_errors = []
         
         for kt_file in kotlin_files:
             try:
-                with open(kt_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
+                facts = self.cache.facts(kt_file, "kotlin", self.index)
                     
                 # Verificações básicas de sintaxe
-                if not content.strip():
+                if facts["empty"]:
                     syntax_errors.append(f"{kt_file.name}: Arquivo vazio")
                     continue
                     
                 # Verificar se tem package declaration
-                if not content.startswith("package "):
+                if not facts["package_first"]:
                     syntax_errors.append(f"{kt_file.name}: Falta declaração de package")
                 
                 # Verificar balanceamento de chaves
-                open_braces = content.count('{')
-                close_braces = content.count('}')
+                open_braces = facts["open_braces"]
+                close_braces = facts["close_braces"]
                 if open_braces != close_braces:
-                    syntax_errors.append(f"{kt_file.name}: Chaves desbalanceadas ({open_braces} abrir, {close_braces} fechar)")
+                    syntax_errors.append(
+                        f"{kt_file.name}: Chaves desbalanceadas ({open_braces} abrir, {close_braces} fechar, "
+                        f"linha {facts['imbalance_line']})"
+                    )
                 
             except Exception as e:
                 syntax_errors.append(f"{kt_file.name}: Erro ao ler arquivo - {str(e)}")
@@ -102,42 +214,61 @@ class EmailAssistantTester:
     
     def test_xml_syntax(self):
         """Testa se os arquivos XML têm sintaxe válida"""
+        from xml_validator import format_xml_error, validate_xml_bytes, validate_xml_files
+        
         print("\n🔍 Testando sintaxe dos arquivos XML...")
         
-        xml_files = list(self.project_root.rglob("*.xml"))
-        xml_errors = []
+        xml_files = self.index.checked_files("xml")
+        results = {}
+        pending = []
         
         for xml_file in xml_files:
-            try:
-                import xml.etree.ElementTree as ET
-                ET.parse(xml_file)
-            except ET.ParseError as e:
-                xml_errors.append(f"{xml_file.name}: {str(e)}")
-            except Exception as e:
-                xml_errors.append(f"{xml_file.name}: Erro ao ler - {str(e)}")
+            facts = self.cache.cached(xml_file, "xml")
+            if facts is None:
+                pending.append(xml_file)
+            else:
+                results[xml_file.rel] = facts
+        
+        # Arquivos novos ou alterados são validados em streaming, em lotes por processo
+        if self.index.on_disk:
+            validated = validate_xml_files([xml_file.abspath for xml_file in pending], workers=self.jobs)
+        else:
+            # Conteúdo fora do disco (blobs git): validar a partir dos bytes
+            validated = []
+            for xml_file in pending:
+                data = self.index.read_bytes(xml_file)
+                validated.append((content_hash(data), validate_xml_bytes(data)))
+        for xml_file, (digest, facts) in zip(pending, validated):
+            self.cache.store(xml_file, "xml", facts, digest)
+            results[xml_file.rel] = facts
+        
+        xml_errors = [
+            format_xml_error(xml_file.rel, results[xml_file.rel])
+            for xml_file in xml_files
+            if not results[xml_file.rel]["valid"]
+        ]
         
         if xml_errors:
             self.log_test(
                 "Sintaxe XML",
                 False,
-                f"Erros encontrados: {'; '.join(xml_errors[:3])}"
+                f"{len(xml_errors)} arquivo(s) com erro: {'; '.join(xml_errors)}"
             )
         else:
             self.log_test("Sintaxe XML", True, f"Todos os {len(xml_files)} arquivos XML estão válidos")
     
     def test_dependencies(self):
         """Testa se as dependências estão corretamente configuradas"""
-        print("\n🔍 Testando configuração de dependências...")
-        
-        build_gradle = self.project_root / "app" / "build.gradle"
+        from gradle_model import load_project_models
         
-        if not build_gradle.exists():
-            self.log_test("Dependências", False, "Arquivo build.gradle não encontrado")
-            return
+        print("\n🔍 Testando configuração de dependências...")
         
         try:
-            with open(build_gradle, 'r') as f:
-                content = f.read()
+            _, app_model = load_project_models(self.index)
+            
+            if app_model is None:
+                self.log_test("Dependências", False, "Arquivo build.gradle não encontrado")
+                return
             
             required_deps = [
                 "hilt-android",
@@ -149,10 +280,7 @@ class EmailAssistantTester:
                 "material"
             ]
             
-            missing_deps = []
-            for dep in required_deps:
-                if dep not in content:
-                    missing_deps.append(dep)
+            missing_deps = app_model.missing_dependencies(required_deps)
             
             if missing_deps:
                 self.log_test(
@@ -168,17 +296,28 @@ class EmailAssistantTester:
     
     def test_manifest_configuration(self):
         """Testa se o AndroidManifest.xml está corretamente configurado"""
+        from gradle_model import load_project_models
+        from manifest_merge import PERMISSION_TAGS, read_app_manifest
+        
         print("\n🔍 Testando configuração do AndroidManifest...")
         
-        manifest_file = self.project_root / "app" / "src" / "main" / "AndroidManifest.xml"
+        manifest_file = "app/src/main/AndroidManifest.xml"
         
-        if not manifest_file.exists():
+        if not self.index.exists(manifest_file):
             self.log_test("AndroidManifest", False, "AndroidManifest.xml não encontrado")
             return
         
         try:
-            with open(manifest_file, 'r') as f:
-                content = f.read()
+            # Mesmo manifest analisado que o merge do build usa (cache de análises da execução)
+            _, app_model = load_project_models(self.index)
+            namespace = app_model.android_field("namespace") if app_model is not None else None
+            manifest = read_app_manifest(self.index, manifest_file, namespace)
+            permissions = {
+                element["key"].rsplit(".", 1)[-1] for element in manifest["elements"] if element["tag"] in PERMISSION_TAGS
+            }
+            activities = {
+                element["key"].rsplit(".", 1)[-1] for element in manifest["elements"] if element["tag"] == "activity"
+            }
             
             required_permissions = [
                 "RECORD_AUDIO",
@@ -192,8 +331,8 @@ class EmailAssistantTester:
                 "AuthActivity"
             ]
             
-            missing_permissions = [p for p in required_permissions if p not in content]
-            missing_activities = [a for a in required_activities if a not in content]
+            missing_permissions = [p for p in required_permissions if p not in permissions]
+            missing_activities = [a for a in required_activities if a not in activities]
             
             issues = []
             if missing_permissions:
@@ -211,77 +350,71 @@ class EmailAssistantTester:
     
     def test_resource_integrity(self):
         """Testa se os recursos estão corretamente referenciados"""
+        from resource_index import describe_duplicates, describe_missing, format_resource, get_resource_index
+        from translation_coverage import describe_locales, get_translation_matrix
+        
         print("\n🔍 Testando integridade dos recursos...")
         
-        # Verificar se strings referenciadas existem
-        strings_file = self.project_root / "app" / "src" / "main" / "res" / "values" / "strings.xml"
-        colors_file = self.project_root / "app" / "src" / "main" / "res" / "values" / "colors.xml"
+        # Referências cruzadas de layouts, manifest e Kotlin contra os recursos definidos em res/
+        resources = get_resource_index(self.index, self.cache)
+        missing = resources.missing()
+        duplicates = resources.duplicates()
+        unused = resources.unused()
         
         issues = []
-        
-        if not strings_file.exists():
-            issues.append("strings.xml não encontrado")
-        if not colors_file.exists():
-            issues.append("colors.xml não encontrado")
-        
-        # Verificar se drawables referenciados existem
-        drawable_dir = self.project_root / "app" / "src" / "main" / "res" / "drawable"
-        required_drawables = [
-            "ic_settings.xml",
-            "ic_mic_active.xml",
-            "ic_arrow_back.xml",
-            "voice_button_background.xml"
-        ]
-        
-        missing_drawables = []
-        for drawable in required_drawables:
-            if not (drawable_dir / drawable).exists():
-                missing_drawables.append(drawable)
-        
-        if missing_drawables:
-            issues.append(f"Drawables faltando: {', '.join(missing_drawables)}")
-        
+        if missing:
+            issues.append(f"{len(missing)} referência(s) sem recurso: {describe_missing(missing)}")
+        if duplicates:
+            issues.append(f"{len(duplicates)} recurso(s) duplicado(s): {describe_duplicates(duplicates)}")
+        
+        # Cada idioma precisa de todas as chaves traduzíveis do padrão e de nenhuma chave a mais
+        translations = get_translation_matrix(self.index, self.cache)
+        totals = translations.totals()
+        if totals["missing"]:
+            issues.append(f"{totals['missing']} tradução(ões) faltando ({describe_locales(translations, 'missing')})")
+        if totals["extra"]:
+            issues.append(f"{totals['extra']} tradução(ões) sem string padrão ({describe_locales(translations, 'extra')})")
+        
+        # Recursos não usados e strings não traduzíveis traduzidas são apenas avisados (não impedem o build)
+        notes = []
+        if unused:
+            names = ", ".join(format_resource(key) for key in unused[:5])
+            notes.append(f"{len(unused)} não usado(s): {names}{', ...' if len(unused) > 5 else ''}")
+        if totals["untranslatable"]:
+            notes.append(f"{totals['untranslatable']} tradução(ões) de strings não traduzíveis: "
+                         f"{describe_locales(translations, 'untranslatable')}")
+        
+        locales_note = f", {totals['locales']} idioma(s)" if totals["locales"] else ""
         if issues:
-            self.log_test("Recursos", False, "; ".join(issues))
+            notes_text = f" ({'; '.join(notes)})" if notes else ""
+            self.log_test("Recursos", False, "; ".join(issues) + notes_text)
         else:
-            self.log_test("Recursos", True, "Todos os recursos necessários estão presentes")
+            notes_text = "".join(f"; {note}" for note in notes)
+            self.log_test("Recursos", True, f"Todas as referências a recursos são válidas ({resources.count()} recursos{locales_note}{notes_text})")
     
     def test_architecture_integrity(self):
         """Testa se a arquitetura MVVM está corretamente implementada"""
-        print("\n🔍 Testando integridade da arquitetura...")
-        
-        # Verificar se ViewModels existem para cada Activity
-        viewmodels = [
-            "app/src/main/java/com/emailassistant/ui/main/MainViewModel.kt",
-            "app/src/main/java/com/emailassistant/ui/setup/SetupViewModel.kt",
-            "app/src/main/java/com/emailassistant/ui/auth/AuthViewModel.kt"
-        ]
-        
-        # Verificar se repositórios estão implementados
-        repositories = [
-            "app/src/main/java/com/emailassistant/data/repository/impl/EmailRepositoryImpl.kt",
-            "app/src/main/java/com/emailassistant/data/repository/impl/SpeechRepositoryImpl.kt",
-            "app/src/main/java/com/emailassistant/data/repository/impl/AIAnalysisRepositoryImpl.kt"
-        ]
-        
-        # Verificar se módulos de DI existem
-        di_modules = [
-            "app/src/main/java/com/emailassistant/di/NetworkModule.kt",
-            "app/src/main/java/com/emailassistant/di/DatabaseModule.kt",
-            "app/src/main/java/com/emailassistant/di/RepositoryModule.kt"
-        ]
+        from gradle_model import load_project_models
+        from symbol_index import check_architecture, get_symbol_index, manifest_activities
         
-        missing_components = []
+        print("\n🔍 Testando integridade da arquitetura...")
         
-        for component_list, name in [(viewmodels, "ViewModels"), (repositories, "Repositories"), (di_modules, "DI Modules")]:
-            for component in component_list:
-                if not (self.project_root / component).exists():
-                    missing_components.append(f"{name}: {Path(component).name}")
+        # Componentes encontrados pela declaração (classe, supertipos, anotações), não pelo caminho do arquivo
+        symbols = get_symbol_index(self.index, self.cache)
+        _, app_model = load_project_models(self.index)
+        problems, summary = check_architecture(symbols, manifest_activities(self.index, app_model))
         
-        if missing_components:
-            self.log_test("Arquitetura", False, f"Componentes faltando: {', '.join(missing_components)}")
+        if problems:
+            shown = "; ".join(problems[:8])
+            more = f"; e mais {len(problems) - 8}" if len(problems) > 8 else ""
+            self.log_test("Arquitetura", False, f"{len(problems)} problema(s): {shown}{more}")
         else:
-            self.log_test("Arquitetura", True, "Arquitetura MVVM corretamente implementada")
+            self.log_test(
+                "Arquitetura",
+                True,
+                f"Arquitetura MVVM corretamente implementada ({summary['paired_viewmodels']} Activities com ViewModel, "
+                f"{summary['repositories']} repositórios ligados, {summary['modules']} módulos de DI)"
+            )
     
     def generate_report(self):
         """Gera relatório final dos testes"""
@@ -304,37 +437,56 @@ class EmailAssistantTester:
                 if not result["passed"]:
                     print(f"  • {result['test']}: {result['message']}")
         
-        print("\n" + "="*60)
+        print("\n⏱️  TEMPO POR TESTE:")
+        for line in format_metrics_table(self.metrics_rows()):
+            print(line)
+        if self.profile:
+            print(f"\n🔬 Perfis ({self.profile}) salvos em: {self.profile_dir}")
         
-        # Salvar relatório em arquivo
-        report_file = self.project_root / "integration_test_report.json"
-        with open(report_file, 'w') as f:
-            json.dump({
-                "timestamp": str(subprocess.check_output(['date'], text=True).strip()),
-                "total_tests": total_tests,
-                "passed_tests": passed_tests,
-                "failed_tests": failed_tests,
-                "success_rate": (passed_tests/total_tests)*100,
-                "results": self.test_results
-            }, f, indent=2)
+        print("\n" + "="*60)
         
-        print(f"📄 Relatório salvo em: {report_file}")
+        # Fechar os relatórios (os resultados já foram gravados à medida que os testes terminaram)
+        if not self._sinks:
+            self.open_reports()
+            for result in self.test_results:
+                for sink in self._sinks:
+                    sink.write(result)
+        summary = {
+            "total_tests": total_tests,
+            "passed_tests": passed_tests,
+            "failed_tests": failed_tests,
+            "success_rate": (passed_tests/total_tests)*100
+        }
+        if self.index.is_built:
+            self.statistics.update(kotlin_files=self.index.count("kotlin"), xml_files=self.index.count("xml"))
+        if self.statistics:
+            summary["statistics"] = self.statistics
+        if self.shard is not None:
+            summary["shard"] = {"index": self.shard[0], "count": self.shard[1]}
+        for sink in self._sinks:
+            sink.close(summary)
+            print(f"📄 Relatório salvo em: {sink.path}")
+        self._sinks = []
+        
+        # Execuções parciais de um shard não entram no histórico (não são comparáveis com as completas)
+        if self.history and self.shard is None:
+            from run_history import save_tester_run
+            save_tester_run(self, "integration", "passed")
+        self.cache.save(live_paths=[entry.rel for entry in self.index.files()] if self.index.is_built else None)
         
         return failed_tests == 0
     
-    def run_all_tests(self):
-        """Executa todos os testes de integração"""
+    def run_all_tests(self, names=None):
+        """Executa todos os testes de integração (ou só os indicados)"""
         print("🚀 INICIANDO TESTES DE INTEGRAÇÃO DO EMAIL ASSISTANT")
         print("="*60)
         
-        # Executar todos os testes
-        self.test_project_structure()
-        self.test_kotlin_syntax()
-        self.test_xml_syntax()
-        self.test_dependencies()
-        self.test_manifest_configuration()
-        self.test_resource_integrity()
-        self.test_architecture_integrity()
+        # Com --shard, as verificações por arquivo só leem os arquivos deste shard
+        self.index.shard = self.shard
+        
+        # Executar todos os testes (independentes em paralelo)
+        self.open_reports()
+        self.run_steps(names)
         
         # Gerar relatório final
         success = self.generate_report()
@@ -347,7 +499,68 @@ class EmailAssistantTester:
         return success
 
 if __name__ == "__main__":
-    tester = EmailAssistantTester()
-    success = tester.run_all_tests()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Testes de integração do Email Assistant")
+    parser.add_argument("--root", help=f"Raiz do projeto a verificar (padrão: {DEFAULT_PROJECT_ROOT})")
+    parser.add_argument("--no-cache", action="store_true", help="Ignora o cache incremental de verificações por arquivo")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Testes executados em paralelo (padrão: número de CPUs)")
+    parser.add_argument("--profile", choices=PROFILE_FORMATS, help="Grava um perfil por teste (pstats ou trace do Chrome); executa os testes em série")
+    parser.add_argument("--report", action="append", metavar="FORMATO[:CAMINHO]", help=f"Relatório adicional gravado durante a execução ({', '.join(REPORT_FORMATS)}); pode repetir")
+    parser.add_argument("--only", action="append", metavar="NOME|TAG", help="Executa só as verificações com o nome ou a tag (separados por vírgula; pode repetir)")
+    parser.add_argument("--skip", action="append", metavar="NOME|TAG", help="Não executa as verificações com o nome ou a tag")
+    parser.add_argument("--list-checks", action="store_true", help="Lista as verificações, suas tags e entradas")
+    parser.add_argument("--git", metavar="REV[:SUBDIR]", help="Verifica a árvore de um commit direto do repositório em --root, sem checkout")
+    parser.add_argument("--git-diff", metavar="BASE", help="Com --git, verifica só o que mudou desde BASE (arquivos alterados e etapas afetadas)")
+    parser.add_argument("--shard", metavar="K/N", help="Executa só a parte K de N das verificações por arquivo (o shard 1 executa também as demais)")
+    parser.add_argument("--no-history", action="store_true", help="Não grava a execução no histórico (build/run-history.sqlite)")
+    parser.add_argument("--watch", action="store_true", help="Observa o projeto e reexecuta apenas o que for afetado por cada alteração")
+    args = parser.parse_args()
+    for spec in args.report or ():
+        try:
+            parse_report_spec(spec)
+        except ValueError as e:
+            parser.error(str(e))
+    
+    tester = EmailAssistantTester(args.root, use_cache=not args.no_cache, jobs=args.jobs, profile=args.profile, reports=args.report,
+                                  history=not args.no_history)
+    if args.list_checks:
+        print("\n".join(format_checks(tester.CHECKS)))
+        sys.exit(0)
+    if args.watch:
+        if args.shard:
+            parser.error("--shard não pode ser usado com --watch")
+        from watch_mode import watch
+        watch([tester])
+        sys.exit(0)
+    try:
+        names = select_checks(tester.CHECKS, only=args.only, skip=args.skip)
+    except ValueError as e:
+        parser.error(str(e))
+    if names == []:
+        parser.error("nenhuma verificação selecionada")
+    if args.shard:
+        from sharding import parse_shard, shard_checks
+        try:
+            tester.shard = parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+        names = shard_checks(tester.CHECKS, names, tester.shard)
+    if args.git:
+        from git_source import GitError, attach_git_source, select_steps
+        try:
+            git_index = attach_git_source(tester.project_root, args.git, base=args.git_diff)
+        except GitError as e:
+            print(f"❌ Erro ao ler o repositório: {e}")
+            sys.exit(2)
+        affected = select_steps(tester, git_index)
+        if affected is not None:
+            names = [name for name in affected if names is None or name in names]
+        if names == []:
+            print("✅ Nenhuma etapa afetada pela diferença")
+            sys.exit(0)
+    elif args.git_diff:
+        parser.error("--git-diff exige --git")
+    success = tester.run_all_tests(names)
     sys.exit(0 if success else 1)
 
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Cobertura de traduções das strings do Email Assistant entre os diretórios values-<idioma>
+Cada XML de values* é lido uma vez; a matriz chave × idioma guarda um bitmap (int) por idioma e as
+faltas, sobras e traduções indevidas saem de operações de bits sobre os bitmaps inteiros
+"""
+
+import io
+import re
+import sys
+import threading
+from itertools import filterfalse, repeat
+import xml.etree.ElementTree as ET
+
+from resource_index import format_resource, res_location
+
+TOOLS_NS = "http://schemas.android.com/tools"
+
+# Tags de values/ que são traduzíveis e o tipo de recurso que definem
+STRING_TAGS = {"string": "string", "plurals": "plurals", "string-array": "array"}
+
+# Arquivos donottranslate*.xml só têm strings que não devem ser traduzidas (convenção do lint)
+UNTRANSLATABLE_FILE_PREFIX = "donottranslate"
+
+# Qualificadores de idioma: en, fil, pt-rBR, es-r419 e a forma BCP 47 b+sr+Latn
+_LANGUAGE = re.compile(r'[a-z]{2,3}$')
+_REGION = re.compile(r'r(?:[A-Z]{2}|\d{3})$')
+# Qualificadores de 2-3 letras minúsculas que não são idiomas (modo de UI car, faixa dinâmica hdr,
+# gama de cores wcg)
+_NON_LOCALE_QUALIFIERS = {"car", "dpi", "hdr", "key", "nav", "wcg"}
+
+
+def locale_of(qualifier):
+    """Idioma de um qualificador de values ('pt-rBR-night' -> 'pt-rBR'); '' é o idioma padrão"""
+    if not qualifier:
+        return ""
+    tokens = qualifier.split("-")
+    position = 0
+    # MCC e MNC vêm antes do idioma na ordem de qualificadores do Android
+    while position < len(tokens) and tokens[position].startswith(("mcc", "mnc")):
+        position += 1
+    if position == len(tokens):
+        return ""
+    token = tokens[position]
+    if token.startswith("b+"):
+        return token
+    if not _LANGUAGE.match(token) or token in _NON_LOCALE_QUALIFIERS:
+        return ""
+    if position + 1 < len(tokens) and _REGION.match(tokens[position + 1]):
+        return f"{token}-{tokens[position + 1]}"
+    return token
+
+
+def _ignores(elem, issue):
+    ignore = elem.get(f"{{{TOOLS_NS}}}ignore")
+    return bool(ignore) and any(part.strip() in (issue, "all") for part in ignore.split(","))
+
+
+def scan_string_resources(data):
+    """Strings, plurals e arrays de strings de um XML de values
+
+    Os nomes de cada tipo ficam numa única string separada por '\\n': com dezenas de idiomas e milhares
+    de chaves, listas de nomes deixariam o cache de verificações várias vezes mais lento para carregar.
+    """
+    names = {resource_type: [] for resource_type in STRING_TAGS.values()}
+    untranslatable = []
+    ignore_missing = []
+    ignore_all = False
+    error = None
+    try:
+        depth = 0
+        for event, elem in ET.iterparse(io.BytesIO(data), events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if depth == 1:
+                    ignore_all = elem.tag == "resources" and _ignores(elem, "MissingTranslation")
+                continue
+            depth -= 1
+            if depth == 1:
+                resource_type = STRING_TAGS.get(elem.tag)
+                name = elem.get("name")
+                if resource_type and name:
+                    name = name.replace(".", "_")
+                    names[resource_type].append(name)
+                    if elem.get("translatable") == "false":
+                        untranslatable.append([resource_type, name])
+                    if _ignores(elem, "MissingTranslation"):
+                        ignore_missing.append([resource_type, name])
+                elem.clear()
+    except ET.ParseError as e:
+        error = str(e)
+    return {
+        "names": {resource_type: "\n".join(items) for resource_type, items in names.items() if items},
+        "untranslatable": untranslatable,
+        "ignore_missing": ignore_missing,
+        "ignore_all": ignore_all,
+        "error": error,
+    }
+
+
+def _bitmap(positions, size):
+    """int com os bits das posições ligados
+
+    Os dígitos binários são marcados por map() (sem laço em Python) e convertidos de uma vez; ligar bit a
+    bit num int grande recriaria o número inteiro a cada chave.
+    """
+    if not size:
+        return 0
+    digits = bytearray(b"0") * size
+    any(map(digits.__setitem__, positions, repeat(ord("1"))))
+    digits.reverse()
+    return int(digits, 2)
+
+
+def _positions(bitmap):
+    """Posições dos bits ligados, em ordem crescente"""
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+    positions = []
+    for offset, byte in enumerate(data):
+        if byte:
+            base = offset << 3
+            positions.extend(base + bit for bit in range(8) if byte >> bit & 1)
+    return positions
+
+
+class TranslationMatrix:
+    """Presença de cada chave (tipo, nome) em cada idioma; '' é o idioma padrão (values/)"""
+
+    def __init__(self, keys, locales, untranslatable, ignore_missing, files=None, errors=None):
+        self.keys = keys  # posição do bit -> (tipo, nome)
+        self.locales = locales  # idioma -> bitmap das chaves presentes
+        self.untranslatable = untranslatable  # bitmap
+        self.ignore_missing = ignore_missing  # bitmap
+        self.files = files or {}  # idioma -> [arquivos]
+        self.errors = errors or {}
+
+    @property
+    def default(self):
+        return self.locales.get("", 0)
+
+    @property
+    def translatable(self):
+        """Chaves do idioma padrão que precisam de tradução"""
+        return self.default & ~self.untranslatable & ~self.ignore_missing
+
+    def translations(self):
+        return sorted(locale for locale in self.locales if locale)
+
+    def keys_of(self, bitmap):
+        return [self.keys[position] for position in _positions(bitmap)]
+
+    def missing(self, locale):
+        return self.translatable & ~self.locales.get(locale, 0)
+
+    def extra(self, locale):
+        """Chaves traduzidas que não existem no idioma padrão (sobras de chaves removidas)"""
+        return self.locales.get(locale, 0) & ~self.default
+
+    def untranslatable_translated(self, locale):
+        return self.locales.get(locale, 0) & self.untranslatable
+
+    def coverage(self):
+        """{idioma: {"missing", "extra", "untranslatable", "percent"}} com as contagens por idioma"""
+        translatable = self.translatable
+        total = translatable.bit_count()
+        default = self.default
+        result = {}
+        for locale in self.translations():
+            present = self.locales[locale]
+            missing = (translatable & ~present).bit_count()
+            result[locale] = {
+                "missing": missing,
+                "extra": (present & ~default).bit_count(),
+                "untranslatable": (present & self.untranslatable).bit_count(),
+                "percent": 100.0 * (total - missing) / total if total else 100.0,
+            }
+        return result
+
+    def totals(self):
+        coverage = self.coverage()
+        return {
+            "locales": len(coverage),
+            "keys": self.default.bit_count(),
+            "translatable": self.translatable.bit_count(),
+            "missing": sum(item["missing"] for item in coverage.values()),
+            "extra": sum(item["extra"] for item in coverage.values()),
+            "untranslatable": sum(item["untranslatable"] for item in coverage.values()),
+        }
+
+    def to_dict(self):
+        return {
+            "totals": self.totals(),
+            "locales": {
+                locale: dict(
+                    counts,
+                    missing_keys=[format_resource(key) for key in self.keys_of(self.missing(locale))],
+                    extra_keys=[format_resource(key) for key in self.keys_of(self.extra(locale))],
+                    untranslatable_keys=[format_resource(key)
+                                         for key in self.keys_of(self.untranslatable_translated(locale))],
+                )
+                for locale, counts in self.coverage().items()
+            },
+            "errors": self.errors,
+        }
+
+
+def values_files(index):
+    """[(entrada, idioma)] dos XMLs em res/values*/"""
+    result = []
+    for entry in index.files("xml"):
+        location = res_location(entry.rel)
+        if location is not None and location[0] == "values":
+            result.append((entry, locale_of(location[1])))
+    return result
+
+
+def build_translation_matrix(index, cache):
+    """Matriz a partir dos fatos por arquivo (cada XML é analisado uma vez e fica no cache de verificações)"""
+    positions = {resource_type: {} for resource_type in STRING_TAGS.values()}  # tipo -> nome -> bit
+    keys = []
+    present = {}
+    untranslatable = []
+    ignore_missing = []
+    files = {}
+    errors = {}
+    for entry, locale in values_files(index):
+        facts = cache.facts(entry, "strings", index)
+        if facts["error"]:
+            errors[entry.rel] = facts["error"]
+        if not facts["names"]:
+            continue
+        files.setdefault(locale, []).append(entry.rel)
+        bits = present.setdefault(locale, [])
+        whole_file = entry.rel.rsplit("/", 1)[-1].startswith(UNTRANSLATABLE_FILE_PREFIX)
+        for resource_type, joined in facts["names"].items():
+            names = joined.split("\n")
+            table = positions[resource_type]
+            # Só as chaves novas passam por Python; as demais viram bits com map() sobre o dicionário
+            for name in sorted(set(filterfalse(table.__contains__, names))):
+                table[name] = len(keys)
+                keys.append((resource_type, name))
+            file_bits = list(map(table.__getitem__, names))
+            bits.extend(file_bits)
+            if whole_file:
+                untranslatable.extend(file_bits)
+            if facts["ignore_all"]:
+                ignore_missing.extend(file_bits)
+        untranslatable.extend(positions[key[0]][key[1]] for key in facts["untranslatable"])
+        ignore_missing.extend(positions[key[0]][key[1]] for key in facts["ignore_missing"])
+    size = len(keys)
+    return TranslationMatrix(
+        keys,
+        {locale: _bitmap(bits, size) for locale, bits in present.items()},
+        _bitmap(untranslatable, size),
+        _bitmap(ignore_missing, size),
+        files,
+        errors,
+    )
+
+
+_matrices = {}
+_matrix_lock = threading.Lock()
+
+
+def get_translation_matrix(index, cache):
+    """Matriz compartilhada pelas etapas (refeita quando o índice de arquivos muda)"""
+    root = str(index.project_root)
+    with _matrix_lock:
+        generation, matrix = _matrices.get(root, (None, None))
+        if matrix is None or generation != index.generation:
+            matrix = build_translation_matrix(index, cache)
+            _matrices[root] = (index.generation, matrix)
+        return matrix
+
+
+def describe_keys(keys, limit=5):
+    items = [format_resource(key) for key in keys[:limit]]
+    if len(keys) > limit:
+        items.append(f"e mais {len(keys) - limit}")
+    return ", ".join(items)
+
+
+def describe_locales(matrix, field, limit=5):
+    """'pt-rBR: @string/a, @string/b; es: ...' para os idiomas com chaves no campo informado"""
+    lookup = {"missing": matrix.missing, "extra": matrix.extra, "untranslatable": matrix.untranslatable_translated}[field]
+    affected = [(locale, counts[field]) for locale, counts in matrix.coverage().items() if counts[field]]
+    items = []
+    for locale, _ in affected[:limit]:
+        items.append(f"{locale}: {describe_keys(matrix.keys_of(lookup(locale)), 3)}")
+    if len(affected) > limit:
+        items.append(f"e mais {len(affected) - limit} idioma(s)")
+    return "; ".join(items)
+
+
+def main():
+    import argparse
+    import json
+
+    from check_cache import get_check_cache
+    from project_index import DEFAULT_PROJECT_ROOT, get_project_index
+
+    parser = argparse.ArgumentParser(description="Cobertura das traduções de strings por idioma (values-*)")
+    parser.add_argument("--root", default=str(DEFAULT_PROJECT_ROOT), help="Raiz do projeto Android")
+    parser.add_argument("--locale", action="append", help="Mostra as chaves só destes idiomas (repetível)")
+    parser.add_argument("--no-cache", action="store_true", help="Não usa nem grava o cache de verificações")
+    parser.add_argument("--json", action="store_true", help="Imprime a cobertura completa em JSON")
+    args = parser.parse_args()
+
+    index = get_project_index(args.root)
+    cache = get_check_cache(args.root, enabled=not args.no_cache)
+    matrix = get_translation_matrix(index, cache)
+    cache.save()
+
+    coverage = matrix.coverage()
+    if args.locale:
+        unknown = [locale for locale in args.locale if locale not in coverage]
+        if unknown:
+            print(f"❌ Idioma(s) sem strings traduzidas: {', '.join(unknown)}")
+            return 2
+
+    if args.json:
+        report = matrix.to_dict()
+        if args.locale:
+            report["locales"] = {locale: report["locales"][locale] for locale in args.locale}
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        totals = matrix.totals()
+        print(f"🌐 {totals['locales']} idioma(s), {totals['keys']} chaves no padrão "
+              f"({totals['translatable']} traduzíveis)")
+        for locale in args.locale or sorted(coverage, key=lambda name: (coverage[name]["percent"], name)):
+            counts = coverage[locale]
+            marker = "✅" if not (counts["missing"] or counts["extra"]) else "⚠️ "
+            print(f"  {marker} {locale:<12} {counts['percent']:5.1f}%  faltando {counts['missing']}, "
+                  f"sobrando {counts['extra']}, não traduzíveis {counts['untranslatable']}")
+            if args.locale:
+                for label, bitmap in (("Faltando", matrix.missing(locale)), ("Sobrando", matrix.extra(locale)),
+                                      ("Não traduzíveis", matrix.untranslatable_translated(locale))):
+                    keys = matrix.keys_of(bitmap)
+                    if keys:
+                        print(f"      {label}: {', '.join(format_resource(key) for key in keys)}")
+    if matrix.errors and not args.json:
+        print("❌ XMLs inválidos:")
+        for rel, error in sorted(matrix.errors.items()):
+            print(f"  • {rel}: {error}")
+    totals = matrix.totals()
+    return 1 if totals["missing"] or totals["extra"] or matrix.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
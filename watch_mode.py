@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Modo --watch dos scripts de teste do Email Assistant
+Mantém índice e resultados em memória e reexecuta só as etapas afetadas por cada alteração
+"""
+
+import os
+import select
+import sys
+import time
+
+from project_index import ProjectIndex, bucket_for, is_skipped_path, module_dir_on_disk
+
+# Arquivos que determinam o Gradle Wrapper
+WRAPPER_FILES = {"gradlew", "gradle/wrapper/gradle-wrapper.properties"}
+
+# Arquivos temporários de editores não disparam verificações
+IGNORED_SUFFIXES = ("~", ".swp", ".swx", ".tmp")
+
+# Janela para agrupar rajadas de eventos de um mesmo salvamento
+DEBOUNCE_SECONDS = 0.03
+MAX_DEBOUNCE_SECONDS = 0.2
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+
+# Sinaliza que eventos foram perdidos e é preciso reindexar tudo
+RESCAN = object()
+
+
+def change_kinds(rel, created_or_deleted=False):
+    """Tipos de entrada afetados pela alteração de um arquivo"""
+    name = rel.rsplit("/", 1)[-1]
+    if name.startswith(".") or name.endswith(IGNORED_SUFFIXES):
+        return set()
+
+    kinds = set()
+    if name == "AndroidManifest.xml":
+        # O manifest também passa pela validação de sintaxe XML
+        kinds.update(("manifest", "xml"))
+    elif rel in WRAPPER_FILES:
+        kinds.add("wrapper")
+    else:
+        bucket = bucket_for(name)
+        if bucket in ("kotlin", "xml", "gradle"):
+            kinds.add(bucket)
+        elif name == "gradle.properties" or name.endswith(".versions.toml"):
+            kinds.add("gradle")
+        if "/res/" in f"/{rel}":
+            kinds.add("resources")
+    if created_or_deleted:
+        kinds.add("tree")
+    return kinds
+
+
+def affected_steps(tester, kinds):
+    """Etapas do tester cujas entradas intersectam os tipos alterados, mais as que dependem delas"""
+    affected = {name for name, inputs in tester.STEP_INPUTS.items() if kinds.intersection(inputs)}
+    steps = getattr(tester, "BUILD_STEPS", None) or getattr(tester, "TESTS", ())
+    # A lista já está em ordem topológica: uma passada propaga para as etapas seguintes
+    for name, after in steps:
+        if affected.intersection(after):
+            affected.add(name)
+    return [name for name, _ in steps if name in affected]
+
+
+class InotifySource:
+    """Eventos do kernel via inotify (Linux), com um watch por diretório indexado"""
+
+    def __init__(self, index):
+        import ctypes
+        import ctypes.util
+
+        self.index = index
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+        self._watches = {}
+        self._watched = set()
+        self.sync()
+
+    def sync(self):
+        """Adiciona watches para diretórios novos do índice"""
+        for rel in self.index.directories() - self._watched:
+            path = os.path.join(str(self.index.project_root), rel) if rel else str(self.index.project_root)
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+            if wd >= 0:
+                self._watches[wd] = rel
+                self._watched.add(rel)
+
+    def _read_events(self):
+        import struct
+
+        changed = set()
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset + 16 <= len(data):
+            wd, mask, _cookie, length = struct.unpack_from("iIII", data, offset)
+            name = data[offset + 16:offset + 16 + length].rstrip(b"\0").decode(errors="replace")
+            offset += 16 + length
+
+            if mask & IN_Q_OVERFLOW:
+                return RESCAN
+            if mask & IN_IGNORED:
+                rel = self._watches.pop(wd, None)
+                self._watched.discard(rel)
+                continue
+            base = self._watches.get(wd)
+            if base is None:
+                continue
+            if name:
+                changed.add(f"{base}/{name}" if base else name)
+            elif mask & IN_DELETE_SELF and base:
+                changed.add(base)
+        return changed
+
+    def wait(self, timeout=None):
+        """Bloqueia até haver alterações; retorna os caminhos relativos (ou RESCAN)"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = set()
+        deadline = time.monotonic() + MAX_DEBOUNCE_SECONDS
+        while True:
+            events = self._read_events()
+            if events is RESCAN:
+                return RESCAN
+            changed |= events
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            ready, _, _ = select.select([self.fd], [], [], min(DEBOUNCE_SECONDS, remaining))
+            if not ready:
+                break
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingSource:
+    """Alternativa sem inotify: compara tamanho/mtime de um novo percurso a cada intervalo"""
+
+    def __init__(self, index, interval=0.5):
+        self.index = index
+        self.interval = interval
+        self._snapshot = self._take()
+
+    def _take(self):
+        fresh = ProjectIndex(self.index.project_root)
+        fresh.build()
+        return {entry.rel: (entry.size, entry.mtime_ns) for entry in fresh.files()}
+
+    def sync(self):
+        pass
+
+    def wait(self, timeout=None):
+        time.sleep(self.interval if timeout is None else min(self.interval, timeout))
+        snapshot = self._take()
+        changed = {rel for rel, stat in snapshot.items() if self._snapshot.get(rel) != stat}
+        changed |= set(self._snapshot) - set(snapshot)
+        self._snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+def make_source(index, interval=0.5, use_inotify=True):
+    if use_inotify and sys.platform.startswith("linux"):
+        try:
+            return InotifySource(index)
+        except OSError as e:
+            print(f"⚠️  inotify indisponível ({e}), usando varredura periódica")
+    return PollingSource(index, interval)
+
+
+def _summary(tester):
+    results = tester.build_results if hasattr(tester, "build_results") else tester.test_results
+    passed = sum(1 for result in results if result.get("success", result.get("passed")))
+    return passed, len(results)
+
+
+def _print_summary(testers, elapsed=None):
+    parts = []
+    for tester in testers:
+        passed, total = _summary(tester)
+        parts.append(f"{type(tester).__name__}: {passed}/{total}")
+    timing = f" em {elapsed * 1000:.0f} ms" if elapsed is not None else ""
+    print(f"\n📊 {' | '.join(parts)}{timing}")
+
+
+def watch(testers, interval=0.5, use_inotify=True):
+    """Executa tudo uma vez e depois reexecuta apenas as etapas afetadas por cada alteração"""
+    index = testers[0].index
+
+    start = time.perf_counter()
+    for tester in testers:
+        tester.run_steps()
+    _print_summary(testers, time.perf_counter() - start)
+
+    source = make_source(index, interval, use_inotify)
+    print(f"\n👀 Observando {index.project_root} ({type(source).__name__}). Ctrl+C para sair.")
+
+    try:
+        while True:
+            changed = source.wait()
+            if not changed:
+                continue
+
+            start = time.perf_counter()
+            if changed is RESCAN:
+                index.refresh()
+                kinds = {"kotlin", "xml", "gradle", "manifest", "resources", "wrapper", "tree"}
+                updated = ["(todos)"]
+            else:
+                is_module_dir = module_dir_on_disk(index.project_root)
+                changed = {rel for rel in changed if not is_skipped_path(rel.split("/"), is_module_dir)}
+                known = {rel for rel in changed if index.get(rel) is not None}
+                updated = index.update(changed)
+                kinds = set()
+                for rel in updated:
+                    kinds |= change_kinds(rel, (rel in known) != (index.get(rel) is not None))
+            source.sync()
+
+            plan = [(tester, affected_steps(tester, kinds)) for tester in testers]
+            if not any(names for _, names in plan):
+                continue
+
+            print(f"\n🔄 {len(updated)} arquivo(s) alterado(s): {', '.join(sorted(updated)[:5])}")
+            for tester, names in plan:
+                if names:
+                    tester.run_steps(names)
+            _print_summary(testers, time.perf_counter() - start)
+    except KeyboardInterrupt:
+        print("\n👋 Encerrando modo watch")
+    finally:
+        source.close()
+        testers[0].cache.save(live_paths=[entry.rel for entry in index.files()])
+        for tester in testers:
+            if hasattr(tester, "artifact_cache"):
+                tester.artifact_cache.save()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from build_test import BuildTester
+    from test_integration import EmailAssistantTester
+
+    parser = argparse.ArgumentParser(description="Observa o projeto e reexecuta build e testes afetados")
+    parser.add_argument("--root", help="Raiz do projeto a observar (padrão: a dos scripts de teste)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignora o cache incremental de verificações por arquivo")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Etapas executadas em paralelo (padrão: número de CPUs)")
+    parser.add_argument("--poll", action="store_true", help="Usa varredura periódica em vez de inotify")
+    parser.add_argument("--interval", type=float, default=0.5, help="Intervalo da varredura periódica em segundos")
+    args = parser.parse_args()
+
+    testers = [
+        BuildTester(args.root, use_cache=not args.no_cache, jobs=args.jobs),
+        EmailAssistantTester(args.root, use_cache=not args.no_cache, jobs=args.jobs),
+    ]
+    watch(testers, interval=args.interval, use_inotify=not args.poll)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Validação de XML em streaming para os scripts de teste do Email Assistant
+Usa iterparse liberando os elementos já lidos e distribui os arquivos entre processos
+"""
+
+import hashlib
+import io
+import os
+import re
+import xml.etree.ElementTree as ET
+
+# Abaixo disso o custo de subir processos supera o ganho
+MIN_FILES_FOR_POOL = 64
+MAX_CHUNK_SIZE = 256
+
+_POSITION_SUFFIX = re.compile(r":\s*line \d+, column \d+$")
+
+
+def validate_xml_stream(source):
+    """Valida um XML (caminho ou arquivo binário) sem manter a árvore em memória"""
+    root = None
+    try:
+        for event, elem in ET.iterparse(source, events=("start", "end")):
+            if root is None:
+                root = elem
+            elif event == "end":
+                elem.clear()
+                # Soltar os filhos já processados da raiz
+                root.clear()
+    except ET.ParseError as e:
+        line, column = getattr(e, "position", (0, 0))
+        return {
+            "valid": False,
+            "error": _POSITION_SUFFIX.sub("", str(e)),
+            "line": line,
+            "column": column,
+        }
+    return {"valid": True, "error": None, "line": None, "column": None}
+
+
+def validate_xml_bytes(data):
+    """Valida um XML já carregado em memória"""
+    return validate_xml_stream(io.BytesIO(data))
+
+
+def _validate_chunk(paths):
+    # Executado nos processos do pool: lê, hasheia e valida cada arquivo
+    results = []
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            results.append((None, {"valid": False, "error": f"Erro ao ler - {e}", "line": None, "column": None}))
+            continue
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        results.append((digest, validate_xml_bytes(data)))
+    return results
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def validate_xml_files(paths, workers=None):
+    """Valida vários arquivos; retorna [(hash, resultado)] na mesma ordem de `paths`"""
+    paths = list(paths)
+    workers = max(1, workers or os.cpu_count() or 1)
+
+    if workers == 1 or len(paths) < MIN_FILES_FOR_POOL:
+        return _validate_chunk(paths)
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    # forkserver evita herdar locks das threads do agendador de etapas
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else None)
+
+    chunk_size = max(1, min(MAX_CHUNK_SIZE, len(paths) // (workers * 4)))
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        for chunk_results in pool.map(_validate_chunk, _chunks(paths, chunk_size)):
+            results.extend(chunk_results)
+    return results
+
+
+def format_xml_error(rel, result):
+    """Formata um erro como arquivo:linha:coluna: mensagem"""
+    if result.get("line"):
+        return f"{rel}:{result['line']}:{result['column']}: {result['error']}"
+    return f"{rel}: {result['error']}"
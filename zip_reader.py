@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Leitura de arquivos zip (jar, aar, apk) direto do diretório central, via mmap
+Nada é extraído: entradas armazenadas viram fatias do mapeamento e as comprimidas são lidas sob demanda
+"""
+
+import mmap
+import struct
+import zlib
+
+_EOCD_SIGNATURE = b"PK\x05\x06"
+_ZIP64_LOCATOR_SIGNATURE = b"PK\x06\x07"
+_ZIP64_EOCD_SIGNATURE = b"PK\x06\x06"
+_CENTRAL_SIGNATURE = b"PK\x01\x02"
+_LOCAL_SIGNATURE = b"PK\x03\x04"
+
+# EOCD tem 22 bytes mais até 64 KB de comentário
+_EOCD_SEARCH = 22 + 0xFFFF
+
+STORED = 0
+DEFLATED = 8
+
+
+class BadZipError(ValueError):
+    pass
+
+
+class ZipEntryInfo:
+    """Entrada do diretório central"""
+
+    __slots__ = ("name", "method", "compressed_size", "size", "header_offset", "crc")
+
+    def __init__(self, name, method, compressed_size, size, header_offset, crc):
+        self.name = name
+        self.method = method
+        self.compressed_size = compressed_size
+        self.size = size
+        self.header_offset = header_offset
+        self.crc = crc
+
+    def __repr__(self):
+        return f"ZipEntryInfo({self.name!r}, size={self.size}, compressed={self.compressed_size})"
+
+
+def _zip64_extra(extra, size, compressed_size, header_offset):
+    # Campos com 0xFFFFFFFF estão no extra 0x0001, nesta ordem
+    pos = 0
+    while pos + 4 <= len(extra):
+        tag, length = struct.unpack_from("<HH", extra, pos)
+        if tag == 0x0001:
+            values = extra[pos + 4:pos + 4 + length]
+            offset = 0
+            if size == 0xFFFFFFFF:
+                size = struct.unpack_from("<Q", values, offset)[0]
+                offset += 8
+            if compressed_size == 0xFFFFFFFF:
+                compressed_size = struct.unpack_from("<Q", values, offset)[0]
+                offset += 8
+            if header_offset == 0xFFFFFFFF:
+                header_offset = struct.unpack_from("<Q", values, offset)[0]
+            break
+        pos += 4 + length
+    return size, compressed_size, header_offset
+
+
+def read_central_directory(buf):
+    """Lista as entradas de um zip em memória ou mapeado (lê só o fim do arquivo e o diretório central)"""
+    end = len(buf)
+    start = max(0, end - _EOCD_SEARCH)
+    eocd = bytes(buf[start:end]).rfind(_EOCD_SIGNATURE)
+    if eocd < 0:
+        raise BadZipError("Fim do diretório central não encontrado")
+    eocd += start
+    count, cd_size, cd_offset = struct.unpack_from("<HII", buf, eocd + 10)
+
+    if cd_offset == 0xFFFFFFFF or count == 0xFFFF:
+        locator = eocd - 20
+        if locator >= 0 and bytes(buf[locator:locator + 4]) == _ZIP64_LOCATOR_SIGNATURE:
+            zip64_eocd = struct.unpack_from("<Q", buf, locator + 8)[0]
+            if bytes(buf[zip64_eocd:zip64_eocd + 4]) != _ZIP64_EOCD_SIGNATURE:
+                raise BadZipError("Registro ZIP64 inválido")
+            count, cd_size, cd_offset = struct.unpack_from("<QQQ", buf, zip64_eocd + 32)
+
+    # Dados antes do zip (ex.: stub executável) deslocam todos os offsets
+    prefix = max(0, eocd - cd_size - cd_offset)
+    if cd_offset + prefix + cd_size > end:
+        raise BadZipError("Diretório central fora do arquivo")
+
+    entries = []
+    pos = cd_offset + prefix
+    unpack = struct.Struct("<4s6xHxxxxIIIHHHxxxxxxxxI").unpack_from
+    for _ in range(count):
+        (signature, method, crc, compressed_size, size,
+         name_len, extra_len, comment_len, header_offset) = unpack(buf, pos)
+        if signature != _CENTRAL_SIGNATURE:
+            raise BadZipError("Entrada do diretório central inválida")
+        name_start = pos + 46
+        name = bytes(buf[name_start:name_start + name_len]).decode("utf-8", "replace")
+        if 0xFFFFFFFF in (size, compressed_size, header_offset):
+            extra = bytes(buf[name_start + name_len:name_start + name_len + extra_len])
+            size, compressed_size, header_offset = _zip64_extra(extra, size, compressed_size, header_offset)
+        entries.append(ZipEntryInfo(name, method, compressed_size, size, header_offset + prefix, crc))
+        pos = name_start + name_len + extra_len + comment_len
+    return entries
+
+
+class ZipView:
+    """Zip sobre um buffer (mmap, bytes ou memoryview), sem cópias para entradas armazenadas"""
+
+    def __init__(self, buf):
+        self.buf = memoryview(buf)
+        self._entries = None
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            self._entries = read_central_directory(self.buf)
+        return self._entries
+
+    def _data_offset(self, info):
+        pos = info.header_offset
+        if bytes(self.buf[pos:pos + 4]) != _LOCAL_SIGNATURE:
+            raise BadZipError(f"Cabeçalho local inválido: {info.name}")
+        name_len, extra_len = struct.unpack_from("<HH", self.buf, pos + 26)
+        return pos + 30 + name_len + extra_len
+
+    def read(self, info, max_bytes=None):
+        """Conteúdo da entrada (ou só os primeiros `max_bytes`, descomprimindo apenas o necessário)"""
+        start = self._data_offset(info)
+        raw = self.buf[start:start + info.compressed_size]
+        if info.method == STORED:
+            return raw if max_bytes is None else raw[:max_bytes]
+        if info.method == DEFLATED:
+            decompressor = zlib.decompressobj(-15)
+            if max_bytes is None:
+                return decompressor.decompress(raw)
+            return decompressor.decompress(raw, max_bytes)
+        raise BadZipError(f"Método de compressão não suportado ({info.method}): {info.name}")
+
+    def open_nested(self, info):
+        """Zip dentro do zip (ex.: classes.jar de um AAR); só descomprime se a entrada não estiver armazenada"""
+        return ZipView(self.read(info))
+
+
+class MappedZip(ZipView):
+    """Zip de um arquivo em disco mapeado em memória"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Arquivo vazio não pode ser mapeado
+            self._file.close()
+            raise BadZipError(f"Arquivo vazio: {path}")
+        super().__init__(self._map)
+
+    def close(self):
+        """Fecha o mapeamento; BufferError se ainda houver fatias de entradas armazenadas em uso"""
+        self.buf.release()
+        try:
+            self._map.close()
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.close()
+        except BufferError:
+            # O traceback do erro em curso prende fatias do mapeamento: o erro real é o que interessa,
+            # e o mapeamento é liberado junto com elas
+            if exc_type is None:
+                raise